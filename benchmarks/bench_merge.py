@@ -0,0 +1,57 @@
+"""Micro-benchmark of the merge of many blocks into a single generation.
+
+Run with `python benchmarks/bench_merge.py`. The time per block should stay roughly constant as
+the number of blocks grows, i.e. the merge cost is linear in the number of blocks.
+"""
+
+# ==================================================================================================
+# --- Imports
+# ==================================================================================================
+# Standard library imports
+import os
+import sys
+import timeit
+
+# Run from the repository without installing the package
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Local application imports
+from study_gen import Block, BoundBlock
+from study_gen.merge._merge_blocks import _get_multiple_merge_parameters, get_multiple_merge_str
+
+
+# ==================================================================================================
+# --- Benchmark
+# ==================================================================================================
+def add_function(a: float, b: float) -> float:
+    return a + b
+
+
+def get_chained_blocks(n_blocks: int) -> list[BoundBlock]:
+    # Each block adds a new parameter to the output of the previous block
+    add = Block("add", add_function)
+    l_blocks = [BoundBlock(add, ["p_0", "p_1"], "out_1")]
+    for idx in range(2, n_blocks + 1):
+        l_blocks.append(BoundBlock(add, [f"out_{idx-1}", f"p_{idx}"], f"out_{idx}"))
+    return l_blocks
+
+
+if __name__ == "__main__":
+    print(
+        f"{'n_blocks':>10} {'parameters [ms]':>16} {'function str [ms]':>18} {'per block [us]':>15}"
+    )
+    for n_blocks in [50, 100, 200, 400, 800]:
+        l_blocks = get_chained_blocks(n_blocks)
+        n_repeat = max(1, 4000 // n_blocks)
+        time_parameters = (
+            timeit.timeit(lambda: _get_multiple_merge_parameters(l_blocks), number=n_repeat)
+            / n_repeat
+        )
+        time_str = (
+            timeit.timeit(lambda: get_multiple_merge_str(l_blocks, "merged"), number=n_repeat)
+            / n_repeat
+        )
+        print(
+            f"{n_blocks:>10} {time_parameters*1e3:>16.3f} {time_str*1e3:>18.3f}"
+            f" {time_str/n_blocks*1e6:>15.2f}"
+        )
@@ -5,11 +5,25 @@
 import importlib.metadata
 
 # Local imports
-from .block import Block
+from .block import Block, BoundBlock
+from .executor import StudyExecutor
+from .job import StudyJob
 from .merge import merge_blocks, merge_imports
+from .scan_space import ScanSpace
+from .skeleton import GenerationSkeleton
 from .study_gen import StudyGen
 
-__all__ = ["Block", "merge_blocks", "merge_imports", "StudyGen"]
+__all__ = [
+    "Block",
+    "BoundBlock",
+    "GenerationSkeleton",
+    "merge_blocks",
+    "merge_imports",
+    "ScanSpace",
+    "StudyExecutor",
+    "StudyGen",
+    "StudyJob",
+]
 
 # ==================================================================================================
 # --- Package version
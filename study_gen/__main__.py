@@ -0,0 +1,81 @@
+# ==================================================================================================
+# --- Imports
+# ==================================================================================================
+# Standard library imports
+import argparse
+import sys
+
+# Local imports
+from ._resources import dict_memory_units, parse_quantity
+from .executor import StudyExecutor
+
+
+# ==================================================================================================
+# --- Command line interface
+# ==================================================================================================
+def main(l_args: list[str] | None = None) -> int:
+    """
+    Runs the study-gen command line interface.
+
+    Args:
+        l_args (list[str] | None, optional): The command line arguments. Defaults to None, in
+            which case the arguments of the current process are used.
+
+    Returns:
+        int: The exit code, 1 if some jobs failed or were not run.
+    """
+    parser = argparse.ArgumentParser(prog="python -m study_gen")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    parser_run = subparsers.add_parser("run", help="Run a generated study on the local machine.")
+    parser_run.add_argument("study", help="The path to the study folder.")
+    parser_run.add_argument(
+        "--cpus",
+        type=int,
+        default=None,
+        help="The number of CPUs used to run the jobs. Defaults to all the CPUs of the machine.",
+    )
+    parser_run.add_argument(
+        "--memory",
+        default=None,
+        help="The memory used to run the jobs, in GB or with a unit (e.g. 64G). Defaults to the"
+        " memory available on the machine.",
+    )
+    parser_run.add_argument(
+        "--warm",
+        action="store_true",
+        help="Run the jobs of each generation in long-lived workers, which import the modules of"
+        " the generation once.",
+    )
+    parser_run.add_argument(
+        "--fork",
+        action="store_true",
+        help="Run the code shared by the sibling jobs of each generation once (e.g. loading a"
+        " collider), and fork a process for each job.",
+    )
+    args = parser.parse_args(l_args)
+
+    memory = None
+    if args.memory is not None:
+        memory = parse_quantity(args.memory, dict_memory_units, "memory")
+    executor = StudyExecutor(
+        args.study, n_cpus=args.cpus, memory=memory, warm=args.warm, fork=args.fork
+    )
+    dict_returncodes = executor.run()
+    n_failed = sum(returncode not in (0, None) for returncode in dict_returncodes.values())
+    n_skipped = sum(returncode is None for returncode in dict_returncodes.values())
+    for (file, index), returncode in dict_returncodes.items():
+        if returncode not in (0, None):
+            job = executor.dict_jobs[(file, index)]
+            print(
+                f"Job {file} failed with exit code {returncode}, see {executor.get_log_path(job)}"
+            )
+    n_completed = len(executor.set_completed)
+    print(
+        f"{len(dict_returncodes) - n_failed - n_skipped - n_completed} jobs succeeded,"
+        f" {n_failed} failed, {n_skipped} not run, {n_completed} already complete."
+    )
+    return 1 if n_failed or n_skipped else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,144 @@
+import hashlib
+import importlib.metadata
+import inspect
+import json
+import os
+import tempfile
+from collections import OrderedDict
+from typing import Any
+
+from .block import Block, BoundBlock
+
+try:
+    _version = importlib.metadata.version("study-gen")
+except importlib.metadata.PackageNotFoundError:
+    _version = "unknown"
+
+
+class BlockCache:
+    """An on-disk cache of merged blocks, persistent across StudyGen runs.
+
+    Each merged block is stored as a JSON file named after a content hash of everything the merge
+    depends on: the sources, imports, arguments and outputs of the merged blocks, the merged block
+    specification, and the version of study-gen. The cached function source is compiled again when
+    loaded, which is much cheaper than merging the blocks.
+
+    Args:
+        path_cache (str): The path to the cache directory.
+
+    Attributes:
+        path_cache (str): The path to the cache directory.
+
+    Methods:
+        get_key: Get the content hash of a merge.
+        load: Load a merged block from the cache.
+        dump: Dump a merged block to the cache.
+    """
+
+    def __init__(self, path_cache: str):
+        self.path_cache = path_cache
+        os.makedirs(path_cache, exist_ok=True)
+
+    @staticmethod
+    def get_key(
+        name_merged_block: str,
+        l_blocks: list[Block | BoundBlock],
+        name_merged_function: str,
+        docstring: str = "",
+        dict_output: OrderedDict[str, type] = OrderedDict(),
+    ) -> str:
+        """Get the content hash of a merge.
+
+        Args:
+            name_merged_block (str): The name of the merged Block.
+            l_blocks (list[Block | BoundBlock]): A list of Block objects (or bound views) to be merged.
+            name_merged_function (str): The name of the merged function.
+            docstring (str, optional): The docstring for the merged function. Defaults to "".
+            dict_output (OrderedDict[str, type], optional): A dictionary of output names and types for the merged function. Defaults to OrderedDict().
+
+        Returns:
+            str: The content hash of the merge.
+
+        """
+        l_content = [
+            _version,
+            name_merged_block,
+            name_merged_function,
+            docstring,
+            list(dict_output),
+        ]
+        for block in l_blocks:
+            reference_block = block.block if isinstance(block, BoundBlock) else block
+            l_content.append(
+                [
+                    block.name,
+                    reference_block.get_str(),
+                    list(block.dict_imports.items()),
+                    sorted(block.set_deps),
+                    block.get_arguments_names(),
+                    list(block.dict_output),
+                ]
+            )
+        return hashlib.sha256(json.dumps(l_content).encode()).hexdigest()
+
+    def load(self, key: str) -> Block | None:
+        """Load a merged block from the cache.
+
+        Args:
+            key (str): The content hash of the merge.
+
+        Returns:
+            Block | None: The merged Block, or None if it is not in the cache.
+
+        """
+        path_entry = f"{self.path_cache}/{key}.json"
+        if not os.path.exists(path_entry):
+            return None
+        with open(path_entry, "r") as f:
+            entry = json.load(f)
+
+        # Compile the cached function
+        dict_imports = OrderedDict(entry["dict_imports"])
+        function = Block.write_and_load_temp_block(
+            entry["function_str"], entry["name_function"], dict_imports
+        )
+
+        # Get the output types back from the signature
+        l_outputs = entry["l_outputs"]
+        return_annotation = inspect.signature(function).return_annotation
+        if len(l_outputs) > 1:
+            l_types = return_annotation.__args__
+        else:
+            l_types = [return_annotation]
+
+        return Block(
+            entry["name"],
+            function=function,
+            dict_imports=dict_imports,
+            set_deps=set(entry["set_deps"]),
+            dict_output=OrderedDict(zip(l_outputs, l_types)),
+        )
+
+    def dump(self, key: str, block: Block):
+        """Dump a merged block to the cache.
+
+        Args:
+            key (str): The content hash of the merge.
+            block (Block): The merged Block.
+
+        """
+        entry: dict[str, Any] = {
+            "name": block.name,
+            "name_function": block.get_name_function_str(),
+            "function_str": block.get_str(),
+            "dict_imports": list(block.dict_imports.items()),
+            "set_deps": sorted(block.set_deps),
+            "l_outputs": block.get_outputs_names(),
+        }
+
+        # Write atomically, as several processes may share the cache
+        with tempfile.NamedTemporaryFile(
+            "w", dir=self.path_cache, suffix=".tmp", delete=False
+        ) as f:
+            json.dump(entry, f)
+        os.replace(f.name, f"{self.path_cache}/{key}.json")
@@ -0,0 +1,134 @@
+from typing import Any
+
+
+class ConfigurationIndex:
+    """A flat index of the configuration, mapping each leaf name to its value.
+
+    The configuration is traversed once, such that parameter lookups are done in constant time,
+    instead of recursively searching the whole configuration for every parameter. The precedence
+    between identical names is the one of a depth-first search in which the keys of a given
+    dictionnary are checked before its sub-dictionnaries. Dependencies (dictionnaries with a
+    "value" and an "internal_dependency" or "external_dependency" key) are considered as leaves.
+
+    Args:
+        configuration (dict[str, Any]): The configuration dictionary.
+
+    Attributes:
+        dict_entries (dict[str, list[tuple[Any, tuple[str, ...], str | None]]]): For each name,
+            the list of (value, full key path, dependency kind) of all its occurrences, in order of
+            precedence.
+
+    Methods:
+        get_value: Get the value of a name.
+        get_keys: Get the full key path of a name.
+        get_dependency: Get the dependency kind of a name.
+        is_ambiguous: Check if a name is defined several times in the configuration.
+        get_ambiguous_names: Get all the names defined several times in the configuration.
+    """
+
+    def __init__(self, configuration: dict[str, Any]):
+        self.dict_entries = {}
+        self._dict_resolved = {}
+        self._index(configuration, ())
+
+        # Resolve each name to its first non-None occurrence
+        for name, l_entries in self.dict_entries.items():
+            for entry in l_entries:
+                if entry[0] is not None:
+                    self._dict_resolved[name] = entry
+                    break
+
+    @staticmethod
+    def get_dependency_kind(value: Any) -> str | None:
+        """Get the kind of dependency of a value.
+
+        Args:
+            value (Any): The value.
+
+        Returns:
+            str | None: "external_dependency", "internal_dependency", or None if the value is not
+                a dependency.
+
+        """
+        if isinstance(value, dict):
+            if "external_dependency" in value:
+                return "external_dependency"
+            elif "internal_dependency" in value:
+                return "internal_dependency"
+        return None
+
+    def _index(self, dic: dict[str, Any], keys: tuple[str, ...]):
+        """Index the keys of a dictionnary, and then recursively its sub-dictionnaries.
+
+        Args:
+            dic (dict[str, Any]): The dictionnary to index.
+            keys (tuple[str, ...]): The key path of the dictionnary in the configuration.
+
+        """
+        for key, value in dic.items():
+            self.dict_entries.setdefault(key, []).append(
+                (value, keys + (key,), self.get_dependency_kind(value))
+            )
+        for key, value in dic.items():
+            if isinstance(value, dict) and self.get_dependency_kind(value) is None:
+                self._index(value, keys + (key,))
+
+    def __contains__(self, name: Any) -> bool:
+        return name in self._dict_resolved
+
+    def get_value(self, name: str) -> Any:
+        """Get the value of a name.
+
+        Args:
+            name (str): The name to look for.
+
+        Returns:
+            Any: The value, or None if the name is not defined in the configuration.
+
+        """
+        return self._dict_resolved[name][0] if name in self._dict_resolved else None
+
+    def get_keys(self, name: str) -> tuple[str, ...] | None:
+        """Get the full key path of a name.
+
+        Args:
+            name (str): The name to look for.
+
+        Returns:
+            tuple[str, ...] | None: The key path, or None if the name is not defined.
+
+        """
+        return self._dict_resolved[name][1] if name in self._dict_resolved else None
+
+    def get_dependency(self, name: str) -> str | None:
+        """Get the dependency kind of a name.
+
+        Args:
+            name (str): The name to look for.
+
+        Returns:
+            str | None: The dependency kind, or None if the name is not a dependency.
+
+        """
+        return self._dict_resolved[name][2] if name in self._dict_resolved else None
+
+    def is_ambiguous(self, name: str) -> bool:
+        """Check if a name is defined several times in the configuration.
+
+        Args:
+            name (str): The name to look for.
+
+        Returns:
+            bool: True if the name is defined several times.
+
+        """
+        return len(self.dict_entries.get(name, [])) > 1
+
+    def get_ambiguous_names(self) -> list[str]:
+        """Get all the names defined several times in the configuration.
+
+        Returns:
+            list[str]: The ambiguous names.
+
+        """
+        return [name for name in self.dict_entries if self.is_ambiguous(name)]
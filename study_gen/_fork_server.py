@@ -0,0 +1,627 @@
+import ast
+import copy
+import inspect
+import multiprocessing
+import os
+import signal
+import sys
+import tempfile
+import threading
+import traceback
+import types
+from concurrent.futures import Future
+from multiprocessing.connection import Connection, wait
+from typing import Any
+
+from ._resources import l_thread_variables
+
+# Statements which can be run once for all the jobs of a group, if they don't use the parameters
+# specific to each job
+l_prefix_statement_types = (
+    ast.Assign,
+    ast.AnnAssign,
+    ast.AugAssign,
+    ast.Expr,
+    ast.Import,
+    ast.ImportFrom,
+)
+
+
+def get_loaded_names(node: ast.AST) -> set[str]:
+    """Get the names read by a piece of code.
+
+    Args:
+        node (ast.AST): The code.
+
+    Returns:
+        set[str]: The names read by the code, including the targets of augmented assignments.
+
+    """
+    set_names = set()
+    for child in ast.walk(node):
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Load):
+            set_names.add(child.id)
+        elif isinstance(child, ast.AugAssign) and isinstance(child.target, ast.Name):
+            set_names.add(child.target.id)
+    return set_names
+
+
+def get_stored_names(node: ast.AST) -> set[str]:
+    """Get the names assigned by a piece of code.
+
+    Args:
+        node (ast.AST): The code.
+
+    Returns:
+        set[str]: The names assigned by the code.
+
+    """
+    return {
+        child.id
+        for child in ast.walk(node)
+        if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store)
+    }
+
+
+def is_local_path(value: Any) -> bool:
+    """Check if a value is a path inside the folder of the study file (e.g. "result.pkl"), which
+    points to a different file for each job even if its value is the same.
+
+    Args:
+        value (Any): The value.
+
+    Returns:
+        bool: True if the value looks like a relative path which doesn't leave the folder.
+
+    """
+    if not isinstance(value, str) or value == "" or os.path.isabs(value):
+        return False
+    if os.path.normpath(value).startswith(".."):
+        return False
+    return os.sep in value or os.path.splitext(value)[1] != ""
+
+
+def has_local_path(node: ast.AST) -> bool:
+    """Check if a piece of code contains a path inside the folder of the study file.
+
+    Args:
+        node (ast.AST): The code.
+
+    Returns:
+        bool: True if a constant of the code is a path inside the folder of the study file.
+
+    """
+    return any(
+        isinstance(child, ast.Constant) and is_local_path(child.value) for child in ast.walk(node)
+    )
+
+
+def is_main_guard(node: ast.stmt) -> bool:
+    """Check if a statement is the 'if __name__ == "__main__": main(...)' block of a study file.
+
+    Args:
+        node (ast.stmt): The statement.
+
+    Returns:
+        bool: True if the statement only calls the main function of the study file.
+
+    """
+    return (
+        isinstance(node, ast.If)
+        and not node.orelse
+        and isinstance(node.test, ast.Compare)
+        and isinstance(node.test.left, ast.Name)
+        and node.test.left.id == "__name__"
+        and len(node.test.comparators) == 1
+        and isinstance(node.test.comparators[0], ast.Constant)
+        and node.test.comparators[0].value == "__main__"
+        and len(node.body) == 1
+        and isinstance(node.body[0], ast.Expr)
+        and isinstance(node.body[0].value, ast.Call)
+        and isinstance(node.body[0].value.func, ast.Name)
+        and not any(isinstance(arg, ast.Starred) for arg in node.body[0].value.args)
+        and all(keyword.arg is not None for keyword in node.body[0].value.keywords)
+    )
+
+
+class ScriptSplit:
+    """A class representing the study files of a group of jobs, split between the code shared by
+    all the jobs and the code specific to each job.
+
+    The study files of the group must be identical, except for the assignments of their
+    parameters. The parameters with different values, or holding paths inside the folder of the
+    study file, are specific to each job. The main function is split into a prefix, made of the
+    leading statements which don't use these parameters nor paths inside the folder of the study
+    file, and a suffix, made of the remaining statements.
+
+    Args:
+        file (str): The path of the study file of the first job, from which the shared code is run.
+        module (ast.Module): The code of the study file of the first job.
+        set_parameter_indices (set[int]): The positions of the assignments of the parameters
+            specific to each job, among the top-level statements.
+        main (ast.FunctionDef): The main function.
+        call (ast.Call): The call of the main function.
+        set_dependent_arguments (set[str]): The arguments of the main function which are
+            specific to each job.
+        n_prefix (int): The number of statements of the prefix of the main function.
+
+    Attributes:
+        file (str): The path of the study file of the first job.
+        l_shared (list[ast.stmt]): The top-level statements, without the call of the main function.
+        l_parameter_indices (list[int]): The positions of the assignments of the parameters
+            specific to each job, among the top-level statements.
+        main (ast.FunctionDef): The main function.
+        call (ast.Call): The call of the main function.
+        set_dependent_arguments (set[str]): The arguments of the main function which are specific
+            to each job.
+        l_prefix (list[ast.stmt]): The statements of the prefix of the main function.
+        l_suffix (list[ast.stmt]): The statements of the suffix of the main function.
+
+    Methods:
+        get_arguments: Get the arguments of the main function.
+        get_function: Build a function running a part of the main function.
+    """
+
+    def __init__(
+        self,
+        file: str,
+        module: ast.Module,
+        set_parameter_indices: set[int],
+        main: ast.FunctionDef,
+        call: ast.Call,
+        set_dependent_arguments: set[str],
+        n_prefix: int,
+    ):
+        self.file = file
+        self.l_shared = module.body[:-1]
+        self.l_parameter_indices = sorted(set_parameter_indices)
+        self.main = main
+        self.call = call
+        self.set_dependent_arguments = set_dependent_arguments
+        self.l_prefix = main.body[:n_prefix]
+        self.l_suffix = main.body[n_prefix:]
+
+    def get_arguments(self, namespace: dict[str, Any]) -> dict[str, Any]:
+        """Get the arguments of the main function, as called at the end of the study file.
+
+        Args:
+            namespace (dict[str, Any]): The namespace of the study file, in which the arguments of
+                the call are evaluated.
+
+        Returns:
+            dict[str, Any]: The value of each argument of the main function, including defaults.
+
+        """
+        l_args = [
+            eval(compile(ast.Expression(arg), self.file, "eval"), namespace)
+            for arg in self.call.args
+        ]
+        dict_kwargs = {
+            keyword.arg: eval(compile(ast.Expression(keyword.value), self.file, "eval"), namespace)
+            for keyword in self.call.keywords
+        }
+        arguments = inspect.signature(namespace[self.main.name]).bind(*l_args, **dict_kwargs)
+        arguments.apply_defaults()
+        return dict(arguments.arguments)
+
+    def get_function(
+        self,
+        l_statements: list[ast.stmt],
+        l_arguments: list[str],
+        namespace: dict[str, Any],
+        return_locals: bool = False,
+    ) -> types.FunctionType:
+        """Build a function running a part of the main function, with the line numbers of the
+        study file such that tracebacks point to the original code.
+
+        Args:
+            l_statements (list[ast.stmt]): The statements of the function.
+            l_arguments (list[str]): The arguments of the function.
+            namespace (dict[str, Any]): The namespace of the study file, used as globals.
+            return_locals (bool, optional): Whether the function returns its local variables.
+                Defaults to False.
+
+        Returns:
+            types.FunctionType: The function.
+
+        """
+        l_body = list(l_statements)
+        if return_locals:
+            l_body.append(
+                ast.Return(ast.Call(ast.Name("locals", ast.Load()), args=[], keywords=[]))
+            )
+        function = copy.copy(self.main)
+        function.args = ast.arguments(
+            posonlyargs=[],
+            args=[ast.arg(argument) for argument in l_arguments],
+            kwonlyargs=[],
+            kw_defaults=[],
+            defaults=[],
+        )
+        function.body = l_body or [ast.Pass()]
+        function.returns = None
+        module = ast.fix_missing_locations(ast.Module([function], type_ignores=[]))
+        dict_functions = {}
+        exec(compile(module, self.file, "exec"), namespace, dict_functions)
+        return dict_functions[self.main.name]
+
+
+def get_script_split(l_files: list[str]) -> ScriptSplit | None:
+    """Split the study files of a group of jobs between the code shared by all the jobs and the
+    code specific to each job.
+
+    Args:
+        l_files (list[str]): The paths of the study files of the jobs.
+
+    Returns:
+        ScriptSplit | None: The split of the study files, or None if they can't be split, e.g. if
+            they differ by more than the values of their parameters, or if the main function
+            doesn't start with code shared by all the jobs.
+
+    """
+    l_modules = []
+    for file in l_files:
+        try:
+            with open(file, "r") as f:
+                l_modules.append(ast.parse(f.read(), file))
+        except (OSError, SyntaxError, ValueError):
+            return None
+    module = l_modules[0]
+    if not module.body or not is_main_guard(module.body[-1]):
+        return None
+    call = module.body[-1].body[0].value  # type: ignore
+
+    # The study files may only differ by the assignments of their parameters
+    set_parameter_indices = set()
+    l_dumps = [ast.dump(node) for node in module.body]
+    for module_other in l_modules[1:]:
+        if len(module_other.body) != len(module.body):
+            return None
+        for idx, node in enumerate(module_other.body):
+            if ast.dump(node) == l_dumps[idx]:
+                continue
+            node_ref = module.body[idx]
+            if not (
+                isinstance(node, ast.Assign)
+                and isinstance(node_ref, ast.Assign)
+                and [ast.dump(target) for target in node.targets]
+                == [ast.dump(target) for target in node_ref.targets]
+            ):
+                return None
+            set_parameter_indices.add(idx)
+
+    # Paths inside the folder of the study file point to a different file for each job
+    for idx, node in enumerate(module.body[:-1]):
+        if isinstance(node, ast.Assign) and has_local_path(node.value):
+            set_parameter_indices.add(idx)
+    set_dependent = set()
+    for idx in set_parameter_indices:
+        set_dependent |= get_stored_names(module.body[idx])
+
+    # The shared code must not use the parameters specific to each job, except in the main
+    # function, which is split below
+    main = None
+    for idx, node in enumerate(module.body[:-1]):
+        if idx in set_parameter_indices:
+            continue
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            if node.name == call.func.id:
+                main = node
+                continue
+            set_local = get_stored_names(node)
+            if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                set_local |= {arg.arg for arg in ast.walk(node.args) if isinstance(arg, ast.arg)}
+            if (get_loaded_names(node) - set_local) & set_dependent:
+                return None
+        elif get_loaded_names(node) & set_dependent:
+            return None
+    if (
+        not isinstance(main, ast.FunctionDef)
+        or main.decorator_list
+        or main.args.vararg is not None
+        or main.args.kwarg is not None
+        or get_loaded_names(main.args) & set_dependent
+    ):
+        return None
+
+    # Arguments of the main function depending on the parameters specific to each job
+    l_positional = [arg.arg for arg in main.args.posonlyargs + main.args.args]
+    if len(call.args) > len(l_positional):
+        return None
+    dict_call_arguments = dict(zip(l_positional, call.args))
+    dict_call_arguments.update({keyword.arg: keyword.value for keyword in call.keywords})
+    set_dependent_arguments = {
+        argument
+        for argument, node in dict_call_arguments.items()
+        if get_loaded_names(node) & set_dependent
+    }
+
+    # The prefix of the main function stops at the first statement using them, or using a path
+    # inside the folder of the study file, as the prefix only runs in the folder of the first job
+    n_prefix = 0
+    for node in main.body:
+        if (
+            not isinstance(node, l_prefix_statement_types)
+            or get_loaded_names(node) & (set_dependent | set_dependent_arguments)
+            or has_local_path(node)
+        ):
+            break
+        n_prefix += 1
+    if n_prefix == len(main.body) or not any(
+        isinstance(child, ast.Call) for node in main.body[:n_prefix] for child in ast.walk(node)
+    ):
+        return None
+
+    return ScriptSplit(
+        l_files[0], module, set_parameter_indices, main, call, set_dependent_arguments, n_prefix
+    )
+
+
+def run_forked_job(
+    split: ScriptSplit,
+    file: str,
+    path_log: str,
+    output_prefix: bytes,
+    namespace: dict[str, Any],
+    function_suffix: types.FunctionType,
+    dict_locals: dict[str, Any],
+) -> int:
+    """Run the suffix of the main function of a study file, in a child process forked after the
+    prefix ran, from the folder of the study file and with its output written to its log file.
+
+    Args:
+        split (ScriptSplit): The split of the study files of the group of the job.
+        file (str): The path of the study file.
+        path_log (str): The path of the log file.
+        output_prefix (bytes): The output of the shared code, written at the start of the log.
+        namespace (dict[str, Any]): The namespace of the study file.
+        function_suffix (types.FunctionType): The suffix of the main function.
+        dict_locals (dict[str, Any]): The local variables of the main function after the prefix.
+
+    Returns:
+        int: The exit code of the job.
+
+    """
+    directory = os.path.dirname(file)
+    with open(path_log, "wb") as log_file:
+        log_file.write(output_prefix)
+        log_file.flush()
+        os.dup2(log_file.fileno(), 1)
+        os.dup2(log_file.fileno(), 2)
+    os.chdir(directory)
+    sys.argv = [file]
+    sys.path[0] = directory
+    try:
+        # Assign the parameters of the job, and call the suffix with the local variables of the
+        # prefix, which take precedence as in the main function
+        with open(file, "r") as f:
+            module = ast.parse(f.read(), file)
+        exec(
+            compile(
+                ast.Module([module.body[idx] for idx in split.l_parameter_indices], []),
+                file,
+                "exec",
+            ),
+            namespace,
+        )
+        namespace["__file__"] = file
+        arguments = split.get_arguments(namespace)
+        function_suffix(
+            **{argument: arguments[argument] for argument in split.set_dependent_arguments}
+            | dict_locals
+        )
+        returncode = 0
+    except SystemExit as e:
+        if e.code is None or isinstance(e.code, int):
+            returncode = e.code or 0
+        else:
+            print(e.code, file=sys.stderr)
+            returncode = 1
+    except BaseException:
+        traceback.print_exc()
+        returncode = 1
+    finally:
+        sys.stdout.flush()
+        sys.stderr.flush()
+    return returncode
+
+
+def serve(connection: Connection, split: ScriptSplit, n_cpus: int):
+    """Run the shared code of a group of jobs once, then fork a child process for each job
+    requested through the connection, and send back its exit code.
+
+    The readiness of the server is sent first, as False if the shared code failed, in which case
+    the jobs are run without the server. Requests are tuples (request_id, file, path_log), and
+    None stops the server.
+
+    Args:
+        connection (Connection): The connection to the executor.
+        split (ScriptSplit): The split of the study files of the group.
+        n_cpus (int): The number of CPUs allocated to each job.
+
+    """
+    for variable in l_thread_variables:
+        os.environ[variable] = str(n_cpus)
+    directory = os.path.dirname(split.file)
+
+    # Run the shared code from the folder of the first job, capturing its output to replay it in
+    # the log of each job
+    ready = False
+    with tempfile.TemporaryFile() as output_file:
+        sys.stdout.flush()
+        sys.stderr.flush()
+        fd_stdout, fd_stderr = os.dup(1), os.dup(2)
+        os.dup2(output_file.fileno(), 1)
+        os.dup2(output_file.fileno(), 2)
+        try:
+            os.chdir(directory)
+            sys.argv = [split.file]
+            sys.path.insert(0, directory)
+            module = types.ModuleType("__main__")
+            module.__file__ = split.file
+            sys.modules["__main__"] = module
+            namespace = module.__dict__
+            exec(compile(ast.Module(split.l_shared, []), split.file, "exec"), namespace)
+            arguments = split.get_arguments(namespace)
+            l_independent = [
+                argument for argument in arguments if argument not in split.set_dependent_arguments
+            ]
+            dict_locals = split.get_function(
+                split.l_prefix, l_independent, namespace, return_locals=True
+            )(**{argument: arguments[argument] for argument in l_independent})
+            function_suffix = split.get_function(
+                split.l_suffix,
+                list(dict.fromkeys(list(arguments) + list(dict_locals))),
+                namespace,
+            )
+            ready = True
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(fd_stdout, 1)
+            os.dup2(fd_stderr, 2)
+            os.close(fd_stdout)
+            os.close(fd_stderr)
+        output_file.seek(0)
+        output_prefix = output_file.read()
+    connection.send(ready)
+    if not ready:
+        return
+
+    # The end of each child is detected through a pipe, closed when the child exits
+    dict_children = {}
+    while True:
+        for ready_object in wait([connection] + list(dict_children)):
+            if ready_object is connection:
+                try:
+                    request = connection.recv()
+                except EOFError:
+                    request = None
+                if request is None:
+                    for pid, _ in dict_children.values():
+                        os.kill(pid, signal.SIGTERM)
+                        os.waitpid(pid, 0)
+                    return
+                request_id, file, path_log = request
+                fd_read, fd_write = os.pipe()
+                pid = os.fork()
+                if pid == 0:
+                    returncode = 1
+                    try:
+                        os.close(fd_read)
+                        returncode = run_forked_job(
+                            split,
+                            file,
+                            path_log,
+                            output_prefix,
+                            namespace,
+                            function_suffix,
+                            dict_locals,
+                        )
+                    finally:
+                        os._exit(returncode)
+                os.close(fd_write)
+                dict_children[fd_read] = (pid, request_id)
+            else:
+                pid, request_id = dict_children.pop(ready_object)
+                os.close(ready_object)
+                _, status = os.waitpid(pid, 0)
+                connection.send((request_id, os.waitstatus_to_exitcode(status)))
+
+
+class ForkServer:
+    """A class representing a process which runs the code shared by a group of jobs once, and
+    forks a child process for each job, which inherits the state of the shared code (e.g. a loaded
+    collider and its trackers) through copy-on-write memory.
+
+    Jobs can be requested from several threads at once.
+
+    Args:
+        split (ScriptSplit): The split of the study files of the group.
+        n_cpus (int): The number of CPUs allocated to each job.
+
+    Attributes:
+        process (multiprocessing.Process): The server process.
+        connection (Connection): The connection to the server process.
+        ready (bool): Whether the shared code ran successfully.
+        dict_futures (dict[int, Future]): The exit codes of the jobs running, indexed by request.
+
+    Methods:
+        run: Run a job in a child process of the server.
+        stop: Stop the server.
+    """
+
+    def __init__(self, split: ScriptSplit, n_cpus: int):
+        context = multiprocessing.get_context("spawn")
+        self.connection, connection_server = context.Pipe()
+        self.process = context.Process(
+            target=serve, args=(connection_server, split, n_cpus), daemon=True
+        )
+        self.process.start()
+        connection_server.close()
+        try:
+            self.ready = bool(self.connection.recv())
+        except (EOFError, OSError):
+            self.ready = False
+        self.dict_futures = {}
+        self._n_requests = 0
+        self._broken = not self.ready
+        self._lock = threading.Lock()
+        self._thread = threading.Thread(target=self._receive, daemon=True)
+        if self.ready:
+            self._thread.start()
+
+    def _receive(self):
+        while True:
+            try:
+                request_id, returncode = self.connection.recv()
+            except (EOFError, OSError):
+                break
+            with self._lock:
+                future = self.dict_futures.pop(request_id)
+            future.set_result(returncode)
+
+        # The server stopped, the jobs still running have no exit code
+        with self._lock:
+            self._broken = True
+            for future in self.dict_futures.values():
+                future.set_result(None)
+            self.dict_futures = {}
+
+    def run(self, file: str, path_log: str) -> int | None:
+        """Run a job in a child process of the server, and wait for it to finish.
+
+        Args:
+            file (str): The path of the study file of the job.
+            path_log (str): The path of the log file of the job.
+
+        Returns:
+            int | None: The exit code of the job, or None if the server stopped before the job
+                finished.
+
+        """
+        future = Future()
+        with self._lock:
+            if self._broken:
+                return None
+            self._n_requests += 1
+            self.dict_futures[self._n_requests] = future
+            try:
+                self.connection.send((self._n_requests, file, path_log))
+            except OSError:
+                del self.dict_futures[self._n_requests]
+                return None
+        return future.result()
+
+    def stop(self):
+        """Stop the server, terminating the jobs still running."""
+        try:
+            self.connection.send(None)
+        except OSError:
+            pass
+        self.process.join()
+        if self._thread.is_alive():
+            self._thread.join()
+        self.connection.close()
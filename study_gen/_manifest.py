@@ -0,0 +1,135 @@
+import hashlib
+import json
+import os
+import tempfile
+
+
+class Manifest:
+    """A manifest of the generated study files, used for incremental regeneration.
+
+    For each generated file, the manifest stores the hash of its inputs (the rendered study file,
+    which depends on the configuration, blocks and template) and the hash of its output (the file
+    as written to disk). A file whose inputs did not change and whose output is still on disk does
+    not need to be written again, which leaves its modification time untouched.
+
+    Args:
+        path_manifest (str): The path to the manifest file.
+
+    Attributes:
+        path_manifest (str): The path to the manifest file.
+        dict_entries (dict[str, dict[str, str]]): The input and output hashes of each file
+            recorded in the manifest.
+        set_visited (set[str]): The files generated (or found up to date) during the current run.
+
+    Methods:
+        get_hash: Get the hash of a string.
+        is_up_to_date: Check if a file is up to date.
+        get_output_hash: Get the output hash of a file recorded in the manifest.
+        record: Record a file in the manifest.
+        prune: Remove the files that were not generated during the current run.
+        save: Save the manifest to disk.
+    """
+
+    def __init__(self, path_manifest: str):
+        self.path_manifest = path_manifest
+        self.dict_entries = {}
+        self.set_visited = set()
+        if os.path.exists(path_manifest):
+            with open(path_manifest, "r") as f:
+                self.dict_entries = json.load(f)
+
+    @staticmethod
+    def get_hash(string: str) -> str:
+        """Get the hash of a string.
+
+        Args:
+            string (str): The string to hash.
+
+        Returns:
+            str: The sha256 hash of the string.
+
+        """
+        return hashlib.sha256(string.encode()).hexdigest()
+
+    def is_up_to_date(self, file_path: str, input_hash: str) -> bool:
+        """Check if a file is up to date, i.e. if its inputs did not change and if it was not
+        modified on disk since it was written.
+
+        Args:
+            file_path (str): The path of the file.
+            input_hash (str): The hash of the inputs of the file.
+
+        Returns:
+            bool: True if the file is up to date.
+
+        """
+        entry = self.dict_entries.get(file_path)
+        if entry is None or entry["input"] != input_hash or not os.path.exists(file_path):
+            return False
+        with open(file_path, "rb") as f:
+            if hashlib.sha256(f.read()).hexdigest() != entry["output"]:
+                return False
+        self.set_visited.add(file_path)
+        return True
+
+    def get_output_hash(self, file_path: str) -> str:
+        """Get the output hash of a file recorded in the manifest.
+
+        Args:
+            file_path (str): The path of the file.
+
+        Returns:
+            str: The hash of the file as written to disk.
+
+        """
+        return self.dict_entries[file_path]["output"]
+
+    def record(self, file_path: str, input_hash: str, output_hash: str):
+        """Record a file in the manifest.
+
+        Args:
+            file_path (str): The path of the file.
+            input_hash (str): The hash of the inputs of the file.
+            output_hash (str): The hash of the file as written to disk.
+
+        """
+        self.dict_entries[file_path] = {"input": input_hash, "output": output_hash}
+        self.set_visited.add(file_path)
+
+    def prune(self) -> list[str]:
+        """Remove the files recorded in the manifest that were not generated during the current
+        run (e.g. scan points that disappeared), along with the directories left empty.
+
+        Returns:
+            list[str]: The removed files.
+
+        """
+        l_removed = [
+            file_path for file_path in self.dict_entries if file_path not in self.set_visited
+        ]
+        for file_path in l_removed:
+            del self.dict_entries[file_path]
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+            # Remove directories left empty, up to the study folder
+            folder = os.path.dirname(file_path)
+            root = os.path.dirname(self.path_manifest)
+            while folder not in ("", root) and os.path.isdir(folder) and not os.listdir(folder):
+                os.rmdir(folder)
+                folder = os.path.dirname(folder)
+
+        return l_removed
+
+    def save(self):
+        """Save the manifest to disk."""
+        folder = os.path.dirname(self.path_manifest)
+        if folder != "":
+            os.makedirs(folder, exist_ok=True)
+
+        # Write atomically, such that an interrupted generation doesn't corrupt the manifest
+        with tempfile.NamedTemporaryFile(
+            "w", dir=folder if folder != "" else ".", suffix=".tmp", delete=False
+        ) as f:
+            json.dump(self.dict_entries, f, indent=1)
+        os.replace(f.name, self.path_manifest)
@@ -48,3 +48,21 @@ def nested_del(dic, keys):
     for key in keys[:-1]:
         dic = dic[key]
     del dic[keys[-1]]
+
+
+def nested_update(dic, dic_other):
+    """Recursively update a nested dictionary with the content of another one.
+
+    Args:
+        dic (dict): The nested dictionary to update.
+        dic_other (dict): The nested dictionary whose content is added.
+
+    Returns:
+        None
+
+    """
+    for key, value in dic_other.items():
+        if isinstance(value, dict) and isinstance(dic.get(key), dict):
+            nested_update(dic[key], value)
+        else:
+            dic[key] = value
@@ -0,0 +1,118 @@
+import ast
+import json
+from typing import Any
+
+# Environment variables holding the index of a job in a scheduler job array, by order of priority
+l_index_variables = ["STUDY_GEN_INDEX", "SLURM_ARRAY_TASK_ID", "PBS_ARRAYID", "PBS_ARRAY_INDEX"]
+
+# Reserved columns of the parameter table
+l_reserved_columns = ["index", "directory"]
+
+
+def get_table_value(param: str, value: Any) -> Any:
+    """Convert the value of a parameter, as assigned in a study file, to a value that can be stored
+    in a parameter table.
+
+    Args:
+        param (str): The name of the parameter.
+        value (Any): The value of the parameter, as returned by StudyGen.get_parameters.
+
+    Returns:
+        Any: The value to store in the parameter table.
+
+    Raises:
+        ValueError: If the value can't be stored in a parameter table.
+
+    """
+    try:
+        value = ast.literal_eval(str(value))
+        json.dumps(value)
+    except (ValueError, TypeError, SyntaxError) as e:
+        raise ValueError(
+            f"Parameter {param} has value {value}, which can't be stored in a parameter table."
+        ) from e
+    return value
+
+
+def get_table_str(l_rows: list[dict[str, Any]]) -> str:
+    """Get the JSON-lines representation of a parameter table.
+
+    Args:
+        l_rows (list[dict[str, Any]]): The rows of the parameter table.
+
+    Returns:
+        str: The parameter table, with one JSON object per line.
+
+    """
+    return "".join(f"{json.dumps(row)}\n" for row in l_rows)
+
+
+def get_selection_str(
+    table_name: str, l_parameters: list[str], points_per_job: int | None = None
+) -> str:
+    """Get the code selecting the row of the parameter table corresponding to the current job.
+
+    The job index is read from the "--index" command line argument if present, and otherwise from
+    the first job array environment variable defined. The generated code then moves to the
+    directory of the selected point, such that relative paths are the same as with one study file
+    per point. If several points are run per job, the rows of the job are instead gathered in
+    l_points, and the study file is expected to loop over them.
+
+    Args:
+        table_name (str): The name of the parameter table file, in the folder of the study file.
+        l_parameters (list[str]): The names of the parameters stored in the table.
+        points_per_job (int | None, optional): The number of points run per job. Defaults to None,
+            in which case each job runs a single point.
+
+    Returns:
+        str: The code selecting the parameters of the current job.
+
+    """
+    str_selection = get_index_str()
+    str_selection += f"""path_folder = os.path.dirname(os.path.abspath(__file__))
+with open(os.path.join(path_folder, "{table_name}")) as f:
+"""
+    if points_per_job is not None:
+        return (
+            str_selection
+            + f"""    l_lines = f.readlines()[{points_per_job} * idx_job : {points_per_job} * (idx_job + 1)]
+l_points = [json.loads(line) for line in l_lines]
+"""
+        )
+
+    str_assignation = "".join(f'{param} = dict_point["{param}"]\n' for param in l_parameters)
+    return (
+        str_selection
+        + f"""    dict_point = json.loads(f.readlines()[idx_job])
+{str_assignation}
+# Run from the folder of the current point
+os.makedirs(os.path.join(path_folder, dict_point["directory"]), exist_ok=True)
+os.chdir(os.path.join(path_folder, dict_point["directory"]))
+"""
+    )
+
+
+def get_index_str() -> str:
+    """Get the code reading the index of the current job.
+
+    Returns:
+        str: The code reading the index of the current job.
+
+    """
+    return f"""
+# Select the parameters of the current job in the parameter table
+import json
+import os
+import sys
+
+l_index = [os.environ[var] for var in {l_index_variables} if var in os.environ]
+if "--index" in sys.argv:
+    idx_job = int(sys.argv[sys.argv.index("--index") + 1])
+elif l_index:
+    idx_job = int(l_index[0])
+else:
+    raise ValueError(
+        "The index of the job must be provided with --index or through one of the following"
+        " environment variables: {", ".join(l_index_variables)}."
+    )
+"""
@@ -0,0 +1,146 @@
+import glob
+import os
+from typing import Any, Callable
+
+import numpy as np
+
+
+def read_metric(
+    path_folder: str, file: str, column: str | None = None, reduce: str = "mean"
+) -> float | None:
+    """Read the metric of a finished job from its output files.
+
+    Args:
+        path_folder (str): The folder of the job.
+        file (str): The output file(s) containing the metric, relative to the folder of the job.
+            Glob patterns are allowed, in which case the values of all the files are gathered.
+        column (str | None, optional): The column containing the metric, for tabular files
+            (parquet, csv, pickled dataframes). Defaults to None.
+        reduce (str, optional): The NumPy function used to reduce the values to a single metric.
+            Defaults to "mean".
+
+    Returns:
+        float | None: The metric, or None if the job has no output file yet.
+
+    """
+    l_files = sorted(glob.glob(os.path.join(path_folder, file)))
+    if not l_files:
+        return None
+
+    l_values = []
+    for path_file in l_files:
+        extension = os.path.splitext(path_file)[1]
+        if extension == ".npy":
+            values = np.load(path_file)
+        elif extension in [".txt", ".dat"]:
+            values = np.loadtxt(path_file)
+        else:
+            import pandas as pd
+
+            if extension == ".parquet":
+                values = pd.read_parquet(path_file)
+            elif extension == ".csv":
+                values = pd.read_csv(path_file)
+            else:
+                values = pd.read_pickle(path_file)
+            if column is not None:
+                values = values[column]
+        l_values.append(np.ravel(np.asarray(values, dtype=float)))
+
+    return float(getattr(np, reduce)(np.concatenate(l_values)))
+
+
+def get_refined_points(
+    l_points: list[dict[str, Any]],
+    l_parameters: list[str],
+    get_metric: Callable[[dict[str, Any]], float | None],
+    gradient_quantile: float | None = None,
+    threshold: float | None = None,
+    max_depth: int = 1,
+) -> list[dict[str, Any]]:
+    """Get the points refining a scan around the regions of interest.
+
+    Along each refined parameter, neighbouring points (i.e. points which only differ by the value
+    of this parameter) whose metrics are both known are compared. If the metric changes sharply
+    between them, or crosses the threshold, their midpoint is added to the scan. Since the new
+    points can only be compared once their own metric is known, the refinement deepens by one level
+    each time the study is generated again, up to the maximum depth.
+
+    Args:
+        l_points (list[dict[str, Any]]): The points of the scan, with the value of each scanned
+            parameter.
+        l_parameters (list[str]): The parameters along which the scan is refined.
+        get_metric (Callable[[dict[str, Any]], float | None]): A function returning the metric
+            of a point, or None if it is not known yet.
+        gradient_quantile (float | None, optional): Refine between the neighbours whose absolute
+            metric difference is above this quantile of all the differences. Defaults to None.
+        threshold (float | None, optional): Refine between the neighbours whose metrics are on
+            each side of this threshold. Defaults to None.
+        max_depth (int, optional): The maximum number of successive refinements. Defaults to 1.
+
+    Returns:
+        list[dict[str, Any]]: The new points, in a deterministic order.
+
+    Raises:
+        ValueError: If neither a gradient quantile nor a threshold is provided.
+
+    """
+    if gradient_quantile is None and threshold is None:
+        raise ValueError("A refinement requires a gradient_quantile or a threshold.")
+    l_names = list(l_points[0]) if l_points else []
+
+    # Depth of each point, indexed by its coordinates
+    dict_depth = {tuple(point[name] for name in l_names): 0 for point in l_points}
+    dict_metric = {}
+    l_points_new = []
+    l_points_to_compare = list(l_points)
+    while l_points_to_compare:
+        for point in l_points_to_compare:
+            dict_metric[tuple(point[name] for name in l_names)] = get_metric(point)
+
+        # Compare neighbours along each refined parameter
+        l_pairs = []
+        for parameter in l_parameters:
+            idx_parameter = l_names.index(parameter)
+            dict_lines = {}
+            for key, metric in dict_metric.items():
+                if metric is not None:
+                    key_line = key[:idx_parameter] + key[idx_parameter + 1 :]
+                    dict_lines.setdefault(key_line, []).append(key)
+            for l_keys in dict_lines.values():
+                l_keys.sort(key=lambda key: key[idx_parameter])
+                l_pairs.extend(
+                    (idx_parameter, key_1, key_2) for key_1, key_2 in zip(l_keys[:-1], l_keys[1:])
+                )
+        if not l_pairs:
+            break
+        array_diff = np.array(
+            [abs(dict_metric[key_2] - dict_metric[key_1]) for _, key_1, key_2 in l_pairs]
+        )
+        mask = np.zeros(len(l_pairs), dtype=bool)
+        if gradient_quantile is not None:
+            mask |= (array_diff >= np.quantile(array_diff, gradient_quantile)) & (array_diff > 0)
+        if threshold is not None:
+            mask |= np.array(
+                [
+                    (dict_metric[key_1] - threshold) * (dict_metric[key_2] - threshold) < 0
+                    for _, key_1, key_2 in l_pairs
+                ]
+            )
+
+        # Add the midpoints of the flagged neighbours
+        l_points_to_compare = []
+        for (idx_parameter, key_1, key_2), flagged in zip(l_pairs, mask):
+            depth = max(dict_depth[key_1], dict_depth[key_2]) + 1
+            if not flagged or depth > max_depth:
+                continue
+            value = round((key_1[idx_parameter] + key_2[idx_parameter]) / 2, 5)
+            key_new = key_1[:idx_parameter] + (value,) + key_1[idx_parameter + 1 :]
+            if key_new in dict_depth:
+                continue
+            dict_depth[key_new] = depth
+            point_new = dict(zip(l_names, key_new))
+            l_points_new.append(point_new)
+            l_points_to_compare.append(point_new)
+
+    return l_points_new
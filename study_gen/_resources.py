@@ -0,0 +1,89 @@
+import os
+import re
+from typing import Any
+
+# Environment variables limiting the number of threads of the numerical libraries
+l_thread_variables = [
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+]
+
+# Units of the memory (in GB) and runtime (in seconds) declarations
+dict_memory_units = {"": 1, "K": 1e-6, "M": 1e-3, "G": 1, "T": 1e3}
+dict_runtime_units = {"": 1, "s": 1, "m": 60, "h": 3600, "d": 86400}
+
+
+def parse_quantity(value: Any, dict_units: dict[str, float], name: str) -> float:
+    """Parse a quantity given as a number or as a string with a unit (e.g. "4G" or "2h").
+
+    Args:
+        value (Any): The quantity.
+        dict_units (dict[str, float]): The factor of each unit.
+        name (str): The name of the quantity, for error messages.
+
+    Returns:
+        float: The quantity, in the reference unit.
+
+    Raises:
+        ValueError: If the quantity can't be parsed.
+
+    """
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    match = re.fullmatch(r"\s*([0-9.]+)\s*([a-zA-Z]?)[bB]?\s*", str(value))
+    if match is None or match.group(2) not in dict_units:
+        raise ValueError(f"Resource {name} has value {value}, which can't be parsed.")
+    return float(match.group(1)) * dict_units[match.group(2)]
+
+
+def get_resources(dic_resources: dict[str, Any] | None) -> dict[str, float]:
+    """Get the resources required by the jobs of a generation, with default values for the
+    resources which are not declared.
+
+    Args:
+        dic_resources (dict[str, Any] | None): The resources declared in the master file, with
+            keys "cpus", "memory" (in GB, or with a unit such as "512M") and "runtime" (in
+            seconds, or with a unit such as "2h").
+
+    Returns:
+        dict[str, float]: The number of CPUs, the memory in GB and the expected runtime in
+            seconds of each job.
+
+    Raises:
+        ValueError: If a resource is unknown or can't be parsed.
+
+    """
+    dic_resources = {} if dic_resources is None else dic_resources
+    for name in dic_resources:
+        if name not in ["cpus", "memory", "runtime"]:
+            raise ValueError(f"Resource {name} is not recognized.")
+    cpus = int(dic_resources.get("cpus", 1))
+    if cpus < 1:
+        raise ValueError(f"Resource cpus has value {cpus}, but jobs need at least one CPU.")
+    return {
+        "cpus": cpus,
+        "memory": parse_quantity(dic_resources.get("memory", 0), dict_memory_units, "memory"),
+        "runtime": parse_quantity(dic_resources.get("runtime", 0), dict_runtime_units, "runtime"),
+    }
+
+
+def get_available_memory() -> float:
+    """Get the memory available on the machine.
+
+    Returns:
+        float: The available memory in GB, or infinity if it can't be determined.
+
+    """
+    try:
+        with open("/proc/meminfo", "r") as f:
+            for line in f:
+                if line.startswith("MemAvailable:"):
+                    return int(line.split()[1]) * 1e-6
+    except OSError:
+        pass
+    try:
+        return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_AVPHYS_PAGES") * 1e-9
+    except (ValueError, OSError, AttributeError):
+        return float("inf")
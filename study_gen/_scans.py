@@ -0,0 +1,179 @@
+from typing import Any
+
+import numpy as np
+
+# Keys of the scans dictionnary which are not scanned parameters
+l_reserved_scan_keys = ["zip", "points", "filter", "sampling", "refine"]
+
+# Methods drawing points jointly over several parameters
+l_sampling_methods = ["latin_hypercube", "sobol", "uniform", "normal"]
+
+
+def get_zip_groups(dic_scans: dict[str, Any]) -> list[list[str]]:
+    """Get the groups of parameters scanned together, from the "zip", "points" and "sampling" keys
+    of a scan.
+
+    Args:
+        dic_scans (dict[str, Any]): The scans dictionnary of a layer.
+
+    Returns:
+        list[list[str]]: The groups of parameters scanned together.
+
+    """
+    l_zip_groups = []
+    if "zip" in dic_scans:
+        l_zip = dic_scans["zip"]
+        # A single group can be given as a flat list
+        if all(isinstance(name, str) for name in l_zip):
+            l_zip = [l_zip]
+        l_zip_groups.extend(list(group) for group in l_zip)
+    if "points" in dic_scans and len(dic_scans["points"]) > 0:
+        l_zip_groups.append(list(dic_scans["points"][0]))
+    if "sampling" in dic_scans:
+        l_zip_groups.append(list(dic_scans["sampling"]["parameters"]))
+    return l_zip_groups
+
+
+def get_samples(dic_sampling: dict[str, Any]) -> dict[str, np.ndarray]:
+    """Draw points jointly over several parameters.
+
+    The bounds of each parameter are given as [low, high], except for the "normal" method, for
+    which they are given as [mean, standard deviation]. Samples are reproducible for a given seed.
+
+    Args:
+        dic_sampling (dict[str, Any]): The sampling specification, with keys "method",
+            "n_samples", "parameters" (the bounds of each parameter), and optionally "seed".
+
+    Returns:
+        dict[str, np.ndarray]: The values of each parameter at each point, rounded to 5 decimals.
+
+    Raises:
+        ValueError: If the sampling method is unknown.
+        ImportError: If the "sobol" method is used without scipy installed.
+
+    """
+    method = dic_sampling["method"]
+    n_samples = int(dic_sampling["n_samples"])
+    seed = dic_sampling.get("seed")
+    l_parameters = list(dic_sampling["parameters"])
+    array_bounds = np.array([dic_sampling["parameters"][p] for p in l_parameters], dtype=float)
+    n_dimensions = len(l_parameters)
+    rng = np.random.default_rng(seed)
+
+    # Draw samples in the unit hypercube (or as standard normal variables)
+    if method == "latin_hypercube":
+        # One sample per stratum along each dimension, strata shuffled independently
+        array_strata = np.argsort(rng.random((n_dimensions, n_samples)), axis=1).T
+        array_samples = (array_strata + rng.random((n_samples, n_dimensions))) / n_samples
+    elif method == "sobol":
+        try:
+            from scipy.stats import qmc
+        except ImportError as e:
+            raise ImportError("The sobol sampling method requires scipy to be installed.") from e
+        array_samples = qmc.Sobol(d=n_dimensions, scramble=True, seed=seed).random(n_samples)
+    elif method in ["uniform", "normal"]:
+        array_samples = (
+            rng.random((n_samples, n_dimensions))
+            if method == "uniform"
+            else rng.standard_normal((n_samples, n_dimensions))
+        )
+    else:
+        raise ValueError(
+            f"Sampling method {method} is not recognized. Expected one of {l_sampling_methods}."
+        )
+
+    # Scale the samples to the bounds of each parameter
+    if method == "normal":
+        array_samples = array_bounds[:, 0] + array_samples * array_bounds[:, 1]
+    else:
+        array_samples = array_bounds[:, 0] + array_samples * (
+            array_bounds[:, 1] - array_bounds[:, 0]
+        )
+    array_samples = np.round(array_samples, 5)
+
+    return {parameter: array_samples[:, idx] for idx, parameter in enumerate(l_parameters)}
+
+
+def get_axes(l_parameters: list[str], l_zip_groups: list[list[str]]) -> list[list[str]]:
+    """Get the axes of a scan, i.e. the groups of parameters varying together. Each parameter is an
+    axis on its own, except the parameters of a zip group, which share the axis of the first
+    parameter of the group.
+
+    Args:
+        l_parameters (list[str]): The scanned parameters, in order.
+        l_zip_groups (list[list[str]]): The groups of parameters scanned together.
+
+    Returns:
+        list[list[str]]: The parameters of each axis.
+
+    Raises:
+        ValueError: If a zip group contains a parameter which is not scanned, or if a parameter
+            belongs to several zip groups.
+
+    """
+    dict_group = {}
+    for idx_group, group in enumerate(l_zip_groups):
+        for parameter in group:
+            if parameter not in l_parameters:
+                raise ValueError(f"Parameter {parameter} is zipped but not scanned.")
+            if parameter in dict_group:
+                raise ValueError(f"Parameter {parameter} belongs to several zip groups.")
+            dict_group[parameter] = idx_group
+
+    l_axes = []
+    dict_axis_group = {}
+    for parameter in l_parameters:
+        if parameter not in dict_group:
+            l_axes.append([parameter])
+        elif dict_group[parameter] not in dict_axis_group:
+            dict_axis_group[dict_group[parameter]] = len(l_axes)
+            l_axes.append([parameter])
+        else:
+            l_axes[dict_axis_group[dict_group[parameter]]].append(parameter)
+    return l_axes
+
+
+def get_filter_indices(
+    l_axes: list[list[str]],
+    l_shape: list[int],
+    dic_parameter_lists: dict[str, Any],
+    filter: str | list[str],
+) -> np.ndarray:
+    """Get the indices of the points of a grid which satisfy the filters of a scan. The filters are
+    evaluated with NumPy on all the points at once, before any study file is generated.
+
+    Args:
+        l_axes (list[list[str]]): The parameters of each axis.
+        l_shape (list[int]): The number of values along each axis.
+        dic_parameter_lists (dict[str, Any]): The values of each scanned parameter, on which the
+            filters are evaluated.
+        filter (str | list[str]): One or several expressions evaluated with NumPy over all the
+            points, with the scanned parameters as arrays (e.g. "qy < qx - 0.005"). Points are kept
+            if all the expressions are True.
+
+    Returns:
+        np.ndarray: The indices of the kept points, in the order of a cartesian product of the axes.
+
+    Raises:
+        ValueError: If a filter doesn't evaluate to a boolean for each point.
+
+    """
+    n_points = int(np.prod(l_shape))
+    array_indices = np.unravel_index(np.arange(n_points), l_shape) if l_axes else ()
+
+    # Evaluate the filters on all the points at once
+    dic_arrays = {}
+    for idx_axis, axis in enumerate(l_axes):
+        for parameter in axis:
+            dic_arrays[parameter] = np.asarray(dic_parameter_lists[parameter])[
+                array_indices[idx_axis]
+            ]
+    mask = np.ones(n_points, dtype=bool)
+    for expression in [filter] if isinstance(filter, str) else filter:
+        mask_expression = np.broadcast_to(
+            eval(expression, {"np": np, "__builtins__": {}}, dic_arrays), mask.shape
+        )
+        if mask_expression.dtype != bool:
+            raise ValueError(f"Scan filter {expression} doesn't evaluate to booleans.")
+        mask &= mask_expression
+    return np.flatnonzero(mask)
@@ -0,0 +1,314 @@
+import json
+import os
+import sqlite3
+from typing import Any
+
+import numpy as np
+
+from ._nested_dicts import nested_set
+
+# Columns of the jobs table, which can't be used as scanned parameter names
+l_reserved_index_columns = [
+    "job_id",
+    "layer",
+    "generation",
+    "path",
+    "parent_id",
+    "file",
+    "table_index",
+    "hash",
+    "outputs",
+    "status",
+    "returncode",
+    "start_time",
+    "end_time",
+    "output_hashes",
+]
+
+# Columns of the jobs table describing the execution of the jobs
+l_status_columns = ["status", "returncode", "start_time", "end_time", "output_hashes"]
+
+
+def get_column_value(value: Any) -> Any:
+    """Convert the value of a scanned parameter to a value that can be stored in the index.
+
+    Args:
+        value (Any): The value of the scanned parameter.
+
+    Returns:
+        Any: The value to store, as a number or a string. Values which are not scalars (e.g. the
+            values of both beams) are stored as JSON strings.
+
+    """
+    if isinstance(value, np.generic):
+        value = value.item()
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    return json.dumps(value, default=str)
+
+
+def get_column_type(value: Any) -> str:
+    """Get the SQLite type of the column storing a scanned parameter.
+
+    Args:
+        value (Any): The first value of the scanned parameter, as stored in the index.
+
+    Returns:
+        str: The SQLite type of the column.
+
+    """
+    if isinstance(value, (bool, int)):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    return "TEXT"
+
+
+def get_insert_str(l_columns: list[str]) -> str:
+    """Get the statement inserting rows in the jobs table.
+
+    Args:
+        l_columns (list[str]): The columns of the rows.
+
+    Returns:
+        str: The SQL statement, with one placeholder per column.
+
+    """
+    str_columns = ", ".join(f'"{column}"' for column in l_columns)
+    return f"INSERT INTO jobs ({str_columns}) VALUES ({', '.join('?' * len(l_columns))})"
+
+
+class StudyIndex:
+    """A SQLite index of the study files, written incrementally during generation.
+
+    Each study file (or each point of a parameter table) is a row of the jobs table, with its
+    layer, generation, folder, file, the job of the previous layer it depends on, and the values
+    of its scanned parameters as typed columns. The index is rebuilt at each generation, and can
+    be queried while the study runs, e.g. "SELECT path FROM jobs WHERE layer = 'layer_3' AND
+    qx = 62.31".
+
+    The execution of each job (status, exit code, timestamps and hashes of its outputs) is
+    recorded by the executor. When the index is rebuilt, the execution of the jobs whose study
+    file did not change is kept, and the jobs whose study file changed are stale, such that their
+    previous outputs are not reused.
+
+    Args:
+        path_index (str): The path to the index file.
+        batch_size (int, optional): The number of rows inserted at once. Defaults to 1000.
+
+    Attributes:
+        path_index (str): The path to the index file.
+        batch_size (int): The number of rows inserted at once.
+        connection (sqlite3.Connection): The connection to the index.
+        set_columns (set[str]): The columns of the jobs table.
+        l_rows (list[dict[str, Any]]): The rows waiting to be inserted.
+        dict_status_previous (dict[tuple[str, str], tuple[str, tuple]]): The hash of the study
+            file and the execution of the jobs recorded before the index was rebuilt, indexed by
+            folder and generation.
+
+    Methods:
+        add_generation: Add a generation to the index.
+        add_job: Add a job to the index.
+        flush: Insert the pending rows.
+        get_tree: Get the study tree structure from the index.
+        merge: Add the jobs of another index.
+        close: Write the pending rows and close the index.
+    """
+
+    def __init__(self, path_index: str, batch_size: int = 1000):
+        self.path_index = path_index
+        self.batch_size = batch_size
+        folder = os.path.dirname(path_index)
+        if folder != "":
+            os.makedirs(folder, exist_ok=True)
+
+        # The index is rebuilt from scratch, and can be rebuilt again if generation is interrupted
+        self.connection = sqlite3.connect(path_index)
+        self.connection.execute("PRAGMA synchronous = OFF")
+        self.dict_status_previous = {}
+        try:
+            for path, gen, hash, *status in self.connection.execute(
+                f"SELECT path, generation, hash, {', '.join(l_status_columns)} FROM jobs"
+            ):
+                self.dict_status_previous[(path, gen)] = (hash, tuple(status))
+        except sqlite3.OperationalError:
+            # No previous index, or an index without execution records
+            pass
+        self.connection.execute("DROP TABLE IF EXISTS jobs")
+        self.connection.execute("DROP TABLE IF EXISTS generations")
+        self.connection.execute(
+            "CREATE TABLE jobs (job_id INTEGER PRIMARY KEY, layer TEXT, generation TEXT, path TEXT,"
+            " parent_id INTEGER, file TEXT, table_index INTEGER, hash TEXT, outputs TEXT,"
+            " status TEXT, returncode INTEGER, start_time REAL, end_time REAL, output_hashes TEXT)"
+        )
+        self.connection.execute(
+            "CREATE TABLE generations (generation TEXT, layer TEXT, position INTEGER,"
+            " template_name TEXT, template_path TEXT, resources TEXT)"
+        )
+        self.set_columns = set(l_reserved_index_columns)
+        self.l_rows = []
+
+    def add_generation(
+        self,
+        gen: str,
+        layer: str,
+        position: int,
+        template_name: str,
+        template_path: str,
+        resources: dict[str, float] | None = None,
+    ):
+        """Add a generation to the index.
+
+        Args:
+            gen (str): The generation name.
+            layer (str): The layer name.
+            position (int): The position of the generation in its layer.
+            template_name (str): The name of the template file.
+            template_path (str): The path to the template folder.
+            resources (dict[str, float] | None, optional): The resources required by each job of
+                the generation. Defaults to None.
+
+        """
+        self.connection.execute(
+            "INSERT INTO generations VALUES (?, ?, ?, ?, ?, ?)",
+            (gen, layer, position, template_name, template_path, json.dumps(resources)),
+        )
+
+    def add_job(
+        self,
+        job_id: int,
+        layer: str,
+        gen: str,
+        path: str,
+        parent_id: int | None,
+        file: str,
+        table_index: int | None = None,
+        hash: str | None = None,
+        dic_mutated_parameters: dict[str, Any] | None = None,
+        outputs: list[str] | None = None,
+    ):
+        """Add a job to the index. Rows are inserted by batches. If the job was recorded with the
+        same study file, its execution is kept. If it was recorded with a different study file, it
+        is stale, and otherwise it is pending.
+
+        Args:
+            job_id (int): The identifier of the job, unique in the study.
+            layer (str): The layer name.
+            gen (str): The generation name.
+            path (str): The folder of the job.
+            parent_id (int | None): The identifier of the job of the previous layer the job
+                depends on, if any.
+            file (str): The path of the study file.
+            table_index (int | None, optional): The row of the job in the parameter table of the
+                study file, if any. Defaults to None.
+            hash (str | None, optional): The sha256 hash of the study file. Defaults to None.
+            dic_mutated_parameters (dict[str, Any] | None, optional): The values of the scanned
+                parameters. Defaults to None.
+            outputs (list[str] | None, optional): The outputs of the job, relative to its folder,
+                used to check if it completed. Defaults to None.
+
+        Raises:
+            ValueError: If a scanned parameter uses a reserved column name.
+
+        """
+        row = {
+            "job_id": job_id,
+            "layer": layer,
+            "generation": gen,
+            "path": path,
+            "parent_id": parent_id,
+            "file": file,
+            "table_index": table_index,
+            "hash": hash,
+            "outputs": None if outputs is None else json.dumps(outputs),
+            "status": "pending",
+        }
+        if hash is not None and (path, gen) in self.dict_status_previous:
+            hash_previous, status_previous = self.dict_status_previous[(path, gen)]
+            if hash_previous == hash:
+                row.update(zip(l_status_columns, status_previous))
+            else:
+                # The outputs of the job, if any, were produced by a previous study file
+                row["status"] = "stale"
+        if dic_mutated_parameters is None:
+            dic_mutated_parameters = {}
+        for parameter, value in dic_mutated_parameters.items():
+            if parameter in l_reserved_index_columns:
+                raise ValueError(
+                    f"Parameter {parameter} can't be stored in the study index, as {parameter} is a"
+                    " reserved column name."
+                )
+            value = get_column_value(value)
+            if parameter not in self.set_columns:
+                self.connection.execute(
+                    f'ALTER TABLE jobs ADD COLUMN "{parameter}" {get_column_type(value)}'
+                )
+                self.set_columns.add(parameter)
+            row[parameter] = value
+        self.l_rows.append(row)
+        if len(self.l_rows) >= self.batch_size:
+            self.flush()
+
+    def flush(self):
+        """Insert the pending rows, grouped by set of columns."""
+        dict_groups = {}
+        for row in self.l_rows:
+            dict_groups.setdefault(tuple(row), []).append(tuple(row.values()))
+        for l_columns, l_values in dict_groups.items():
+            self.connection.executemany(get_insert_str(l_columns), l_values)
+        self.connection.commit()
+        self.l_rows = []
+
+    def get_tree(self) -> dict:
+        """Get the study tree structure from the index.
+
+        Returns:
+            dict: The dictionary representing the study tree structure, as in tree.yaml.
+
+        """
+        self.flush()
+        dictionary_tree = {}
+        for path, gen, file, table_index in self.connection.execute(
+            "SELECT path, generation, file, table_index FROM jobs ORDER BY job_id"
+        ):
+            entry = {"file": file}
+            if table_index is not None:
+                entry["index"] = table_index
+            nested_set(dictionary_tree, path.split("/")[1:-1] + [gen], entry)
+        return dictionary_tree
+
+    def merge(self, path_index: str):
+        """Add the jobs of another index (e.g. of a shard of the study).
+
+        Args:
+            path_index (str): The path to the other index file.
+
+        """
+        self.flush()
+        connection = sqlite3.connect(path_index)
+        l_columns = []
+        for column, column_type in connection.execute(
+            "SELECT name, type FROM pragma_table_info('jobs')"
+        ).fetchall():
+            if column not in self.set_columns:
+                self.connection.execute(f'ALTER TABLE jobs ADD COLUMN "{column}" {column_type}')
+                self.set_columns.add(column)
+            l_columns.append(column)
+        self.connection.executemany(
+            get_insert_str(l_columns), connection.execute("SELECT * FROM jobs")
+        )
+        if not self.connection.execute("SELECT 1 FROM generations LIMIT 1").fetchall():
+            self.connection.executemany(
+                "INSERT INTO generations VALUES (?, ?, ?, ?, ?, ?)",
+                connection.execute("SELECT * FROM generations"),
+            )
+        connection.close()
+        self.connection.commit()
+
+    def close(self):
+        """Write the pending rows, index the most queried columns and close the index."""
+        self.flush()
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_layer ON jobs (layer)")
+        self.connection.execute("CREATE INDEX IF NOT EXISTS idx_parent ON jobs (parent_id)")
+        self.connection.commit()
+        self.connection.close()
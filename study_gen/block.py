@@ -1,8 +1,7 @@
-import importlib.util
+import hashlib
 import inspect
+import linecache
 import logging
-import sys
-import tempfile
 from collections import OrderedDict
 from typing import Callable, Self
 
@@ -27,6 +26,11 @@ class Block:
         set_deps (set[str]): A set of dependencies required by the function.
         _l_arguments (list[tuple[str, type]]): A list of argument names and types.
         _dict_output (OrderedDict[str, type]): A dictionary specifying the expected output of the function.
+        _signature (inspect.Signature | None): The cached signature of the function.
+        _dict_parameters (OrderedDict[str, type] | None): The cached parameters of the function.
+        _str (str | None): The cached source of the function.
+        _body_str (str | None): The cached body of the function.
+        _docstring (str | None): The cached docstring of the function.
 
     Methods:
         function: Get the function to be executed by the block.
@@ -42,6 +46,12 @@ class Block:
         get_arguments_as_dict
     """
 
+    # Functions compiled in memory, indexed by the hash of their source (including imports)
+    _dict_compiled_functions: dict[str, Callable] = {}
+
+    # Sources of the functions compiled in memory, indexed by their (virtual) filename
+    _dict_compiled_sources: dict[str, str] = {}
+
     def __init__(
         self,
         name: str,
@@ -52,6 +62,7 @@ class Block:
     ):
         self.name = name
         self._function = function
+        self.reset_introspection_cache()
         self.dict_imports = dict_imports
         self.set_deps = set_deps
         self._l_arguments = []
@@ -83,6 +94,19 @@ class Block:
 
         """
         self._function = function
+        self.reset_introspection_cache()
+
+    def reset_introspection_cache(self):
+        """Reset the cached signature, source, body and docstring of the function.
+
+        They are computed again the next time they are needed.
+
+        """
+        self._signature = None
+        self._dict_parameters = None
+        self._str = None
+        self._body_str = None
+        self._docstring = None
 
     @property
     def dict_output(self) -> OrderedDict[str, type]:
@@ -231,6 +255,27 @@ class Block:
         # Update output
         self._dict_output = dict_output
 
+    @staticmethod
+    def get_l_names(l_names: list[str] | str | None) -> list[str]:
+        """Get a list of names, provided as a list, a (comma-separated) string, or None.
+
+        Args:
+            l_names (list[str] | str | None): The names.
+
+        Returns:
+            list[str]: The list of names.
+
+        """
+        if isinstance(l_names, list):
+            return l_names
+        # Ensure the user did not provide a string with a comma
+        if l_names is None:
+            return []
+        elif "," in l_names:
+            return [x.strip() for x in l_names.split(",")]
+        else:
+            return [l_names]
+
     def set_outputs_names(self, l_outputs_names: list[str] | str | None):
         """Set the names of the outputs.
 
@@ -239,14 +284,7 @@ class Block:
 
         """
         # Ensure that l_outputs_names is not just a string
-        if not isinstance(l_outputs_names, list):
-            # Ensure the user did not provide a string with a comma
-            if l_outputs_names is None:
-                l_outputs_names = []
-            elif "," in l_outputs_names:
-                l_outputs_names = [x.strip() for x in l_outputs_names.split(",")]
-            else:
-                l_outputs_names = [l_outputs_names]
+        l_outputs_names = self.get_l_names(l_outputs_names)
 
         # Only update the names of the outputs, not types
         self.dict_output = OrderedDict(list(zip(l_outputs_names, self.dict_output.values())))
@@ -268,13 +306,15 @@ class Block:
             OrderedDict[str, type]: The dictionary specifying the parameters.
 
         """
-        signature = self.get_signature()
-        return OrderedDict(
-            [
-                (parameter, signature.parameters[parameter].annotation)
-                for parameter in signature.parameters
-            ]
-        )
+        if self._dict_parameters is None:
+            signature = self.get_signature()
+            self._dict_parameters = OrderedDict(
+                [
+                    (parameter, signature.parameters[parameter].annotation)
+                    for parameter in signature.parameters
+                ]
+            )
+        return OrderedDict(self._dict_parameters)
 
     def get_dict_parameters_names(self) -> list[str]:
         """Get the names of the parameters.
@@ -381,25 +421,18 @@ class Block:
         # Update list of arguments
         self._l_arguments = l_arguments
 
-    def set_arguments_names(self, l_arguments_names: list[str] | None):
+    def set_arguments_names(self, l_arguments_names: list[str] | str | None):
         """Set the names of the arguments.
 
         Args:
-            l_arguments_names (list[str] | None): The names of the arguments.
+            l_arguments_names (list[str] | str | None): The names of the arguments.
 
         """
         # Ensure that l_arguments_names is not just a string (from bad yaml parsing)
-        if not isinstance(l_arguments_names, list):
-            # Ensure the user did not provide a string with a comma
-            if l_arguments_names is None:
-                l_arguments_names = []
-            elif "," in l_arguments_names:
-                l_arguments_names = [x.strip() for x in l_arguments_names.split(",")]  # type: ignore
-            else:
-                l_arguments_names = [l_arguments_names]
+        l_arguments_names = self.get_l_names(l_arguments_names)
 
         # Ensure that arguments_names has not more elements than the number of parameters
-        if l_arguments_names is not None and len(l_arguments_names) > len(self.dict_parameters):
+        if len(l_arguments_names) > len(self.dict_parameters):
             raise ValueError(
                 "Number of arguments is different from number of parameters. Number of parameters:"
                 f" {len(self.dict_parameters)}. Number of arguments: {len(l_arguments_names)}"
@@ -433,7 +466,11 @@ class Block:
             str: The string representation of the function.
 
         """
-        return "" if self.function is None else inspect.getsource(self.function)
+        if self.function is None:
+            return ""
+        if self._str is None:
+            self._str = self.getsource(self.function)
+        return self._str
 
     def get_name_function_str(self) -> str:
         """Get the name of the function.
@@ -453,8 +490,10 @@ class Block:
         """
         if self.function is None:
             return ""
-        doc = inspect.getdoc(self.function)
-        return "" if doc is None else doc
+        if self._docstring is None:
+            doc = inspect.getdoc(self.function)
+            self._docstring = "" if doc is None else doc
+        return self._docstring
 
     def get_body_str(self) -> str:
         """Get the body of the function.
@@ -465,17 +504,19 @@ class Block:
         """
         if self.function is None:
             return ""
-        body = inspect.getsource(self.function)
-        # Remove header
-        body = "\n".join(body.split(":\n")[1:])
-        if self.get_docstring() != "":
-            # Remove docstring
-            body = body.replace(self.get_docstring(), "")
-            # Remove remaining quotes
-            body = body.replace('"""', "")
-            body = body.replace("'''", "")
-
-        return body
+        if self._body_str is None:
+            body = self.get_str()
+            # Remove header
+            body = "\n".join(body.split(":\n")[1:])
+            if self.get_docstring() != "":
+                # Remove docstring
+                body = body.replace(self.get_docstring(), "")
+                # Remove remaining quotes
+                body = body.replace('"""', "")
+                body = body.replace("'''", "")
+            self._body_str = body
+
+        return self._body_str
 
     def get_output_str(self) -> str:
         """Get the string representation of the output.
@@ -585,7 +626,9 @@ class Block:
 
         """
         if self.function is not None:
-            return inspect.signature(self.function)
+            if self._signature is None:
+                self._signature = inspect.signature(self.function)
+            return self._signature
         logging.warning("No function defined for this block")
         return inspect.Signature()
 
@@ -715,7 +758,11 @@ class Block:
     def write_and_load_temp_block(
         cls, function_str: str, name_function: str, dict_imports: dict[str, str]
     ) -> Callable:
-        """Write the function string to a temporary file and load the function.
+        """Compile the function string in memory and load the function.
+
+        No file is written to disk: the source is registered in linecache under a virtual filename
+        such that inspect.getsource still works. Compiled functions are cached by the hash of
+        their source and imports, such that identical functions are only compiled once per process.
 
         Args:
             function_str (str): The string representation of the function.
@@ -726,20 +773,195 @@ class Block:
             Callable: The loaded function.
 
         """
-        # Write string to temporary file
-        tmp = tempfile.NamedTemporaryFile(suffix=".py", delete=False)
+        source = f"{cls.get_external_l_imports_str(dict_imports)}\n{function_str}"
+        key = hashlib.sha256(f"{name_function}\n{source}".encode()).hexdigest()
+        if key in cls._dict_compiled_functions:
+            return cls._dict_compiled_functions[key]
 
-        # Open the file for writing.
-        with open(tmp.name, "w") as f:
-            f.write(cls.get_external_l_imports_str(dict_imports))
-            f.write("\n")
-            f.write(function_str)
-            tmp.flush()
+        # Register the source for inspect
+        filename = f"<study_gen_{key[:16]}>"
+        cls._dict_compiled_sources[filename] = source
+        cls.register_source(filename)
 
         # Load the function
-        spec = importlib.util.spec_from_file_location("mod", tmp.name)
-        mod = importlib.util.module_from_spec(spec)  # type: ignore
-        sys.modules["mod"] = mod
-        spec.loader.exec_module(mod)  # type: ignore
+        namespace = {"__name__": f"study_gen_{key[:16]}"}
+        exec(compile(source, filename, "exec"), namespace)
+        function = namespace[name_function]
 
-        return getattr(mod, name_function)
+        cls._dict_compiled_functions[key] = function
+        return function
+
+    @classmethod
+    def register_source(cls, filename: str):
+        """Register (again, if the cache has been cleared) a source compiled in memory in linecache.
+
+        Args:
+            filename (str): The virtual filename of the source.
+
+        """
+        if filename in cls._dict_compiled_sources and filename not in linecache.cache:
+            source = cls._dict_compiled_sources[filename]
+            linecache.cache[filename] = (len(source), None, source.splitlines(True), filename)
+
+    @classmethod
+    def getsource(cls, function: Callable) -> str:
+        """Get the source of a function, including functions compiled in memory.
+
+        Args:
+            function (Callable): The function.
+
+        Returns:
+            str: The source of the function.
+
+        """
+        cls.register_source(function.__code__.co_filename)
+        return inspect.getsource(function)
+
+
+class BoundBlock:
+    """A class representing a lightweight view of a Block, bound to argument and output names.
+
+    Bound blocks are used when merging blocks: they share the function, imports, dependencies
+    and introspection results of the reference Block, and only hold the names used at the call
+    site, such that no copy of the reference Block is needed.
+
+    Args:
+        block (Block): The reference Block.
+        l_arguments_names (list[str] | str | None, optional): The names of the arguments. Defaults
+            to None.
+        l_outputs_names (list[str] | str | None, optional): The names of the outputs. Defaults to
+            None.
+
+    Attributes:
+        block (Block): The reference Block.
+        l_arguments (list[tuple[str, type]]): The list of argument names and types.
+        dict_output (OrderedDict[str, type]): The dictionary of output names and types.
+
+    Methods:
+        get_arguments_names: Get the names of the arguments.
+        get_arguments_as_dict: Get the arguments as a dictionary.
+        get_outputs_names: Get the names of the outputs.
+        get_output_str: Get the string representation of the output.
+        get_call_str: Get the string representation of the function call.
+        get_assignation_call_str: Get the string representation of the function call with output assignment.
+    """
+
+    __slots__ = ("block", "l_arguments", "dict_output")
+
+    def __init__(
+        self,
+        block: Block,
+        l_arguments_names: list[str] | str | None = None,
+        l_outputs_names: list[str] | str | None = None,
+    ):
+        self.block = block
+
+        # Bind arguments (types are obtained from the parameters)
+        l_arguments_names = Block.get_l_names(l_arguments_names)
+        dict_parameters = block.dict_parameters
+        if len(l_arguments_names) > len(dict_parameters):
+            raise ValueError(
+                "Number of arguments is different from number of parameters. Number of parameters:"
+                f" {len(dict_parameters)}. Number of arguments: {len(l_arguments_names)}"
+            )
+        self.l_arguments = list(zip(l_arguments_names, dict_parameters.values()))
+
+        # Bind outputs (types are obtained from the reference outputs)
+        self.dict_output = OrderedDict(
+            zip(Block.get_l_names(l_outputs_names), block.dict_output.values())
+        )
+        if len(self.dict_output) != len(block.dict_output):
+            raise ValueError(
+                f"Number of outputs is different for block {block.name}. Previous:"
+                f" {len(block.dict_output)}. New: {len(self.dict_output)}"
+            )
+
+    @property
+    def name(self) -> str:
+        """Get the name of the reference Block.
+
+        Returns:
+            str: The name of the reference Block.
+
+        """
+        return self.block.name
+
+    @property
+    def dict_imports(self) -> dict[str, str]:
+        """Get the imports of the reference Block.
+
+        Returns:
+            dict[str, str]: The dictionary of imports.
+
+        """
+        return self.block.dict_imports
+
+    @property
+    def set_deps(self) -> set[str]:
+        """Get the dependencies of the reference Block.
+
+        Returns:
+            set[str]: The set of dependencies.
+
+        """
+        return self.block.set_deps
+
+    def get_arguments_names(self) -> list[str]:
+        """Get the names of the arguments.
+
+        Returns:
+            list[str]: The names of the arguments.
+
+        """
+        return [arg for arg, _ in self.l_arguments]
+
+    def get_arguments_as_dict(self) -> OrderedDict[str, type]:
+        """Get the arguments as a dictionary.
+
+        Returns:
+            OrderedDict[str, type]: The arguments as a dictionary.
+
+        """
+        return OrderedDict(self.l_arguments)
+
+    def get_outputs_names(self) -> list[str]:
+        """Get the names of the outputs.
+
+        Returns:
+            list[str]: The names of the outputs.
+
+        """
+        return list(self.dict_output)
+
+    def get_output_str(self) -> str:
+        """Get the string representation of the output.
+
+        Returns:
+            str: The string representation of the output.
+
+        """
+        return Block.get_external_output_str(self.get_outputs_names())
+
+    def get_call_str(self) -> str:
+        """Get the string representation of the function call.
+
+        Returns:
+            str: The string representation of the function call.
+
+        """
+        return self.block.get_call_str(self.get_arguments_names())
+
+    def get_assignation_call_str(self) -> str:
+        """Get the string representation of the function call with output assignment.
+
+        Returns:
+            str: The string representation of the function call with output assignment.
+
+        """
+        function_call_str = self.get_call_str()
+        output_str = self.get_output_str()
+
+        if output_str == "":
+            return function_call_str
+        else:
+            return f"{output_str} = {function_call_str}"
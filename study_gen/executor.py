@@ -0,0 +1,765 @@
+# ==================================================================================================
+# --- Imports
+# ==================================================================================================
+# Standard library imports
+import ast
+import glob
+import hashlib
+import importlib
+import json
+import multiprocessing
+import os
+import runpy
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+import traceback
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    ThreadPoolExecutor,
+    wait,
+)
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Self
+
+# Third party imports
+from ruamel import yaml
+
+# Local imports
+from ._fork_server import ForkServer, get_script_split
+from ._resources import get_available_memory, get_resources, l_thread_variables
+from .job import StudyJob
+
+
+# ==================================================================================================
+# --- Warm workers
+# ==================================================================================================
+def _initialize_warm_worker(l_modules: list[str], n_cpus: int):
+    """
+    Initializes a warm worker, by limiting its numerical libraries to the CPUs allocated to each
+    job and importing the modules of its generation once.
+
+    Args:
+        l_modules (list[str]): The modules imported by the study files of the generation.
+        n_cpus (int): The number of CPUs allocated to each job.
+    """
+    for variable in l_thread_variables:
+        os.environ[variable] = str(n_cpus)
+    for module in l_modules:
+        try:
+            importlib.import_module(module)
+        except Exception:
+            # The study file will raise the error itself, in its log file
+            pass
+
+
+def _run_warm_job(file: str, l_args: list[str], path_log: str) -> int:
+    """
+    Runs a study file in a warm worker, as a fresh __main__ module, from the folder of the study
+    file and with its output written to its log file.
+
+    Args:
+        file (str): The path of the study file.
+        l_args (list[str]): The command line arguments of the study file.
+        path_log (str): The path of the log file.
+
+    Returns:
+        int: The exit code of the study file.
+    """
+    directory = os.path.dirname(file)
+    cwd, argv, path = os.getcwd(), sys.argv, list(sys.path)
+    sys.stdout.flush()
+    sys.stderr.flush()
+    fd_stdout, fd_stderr = os.dup(1), os.dup(2)
+    with open(path_log, "w") as log_file:
+        # Redirect at the file descriptor level, to also capture the output of compiled libraries
+        os.dup2(log_file.fileno(), 1)
+        os.dup2(log_file.fileno(), 2)
+        os.chdir(directory)
+        sys.argv = [file] + l_args
+        sys.path.insert(0, directory)
+        try:
+            runpy.run_path(file, run_name="__main__")
+            returncode = 0
+        except SystemExit as e:
+            if e.code is None or isinstance(e.code, int):
+                returncode = e.code or 0
+            else:
+                print(e.code, file=sys.stderr)
+                returncode = 1
+        except BaseException:
+            traceback.print_exc()
+            returncode = 1
+        finally:
+            sys.stdout.flush()
+            sys.stderr.flush()
+            os.dup2(fd_stdout, 1)
+            os.dup2(fd_stderr, 2)
+            os.close(fd_stdout)
+            os.close(fd_stderr)
+            os.chdir(cwd)
+            sys.argv = argv
+            sys.path[:] = path
+    return returncode
+
+
+# ==================================================================================================
+# --- Class definition
+# ==================================================================================================
+class StudyExecutor:
+    """
+    A class for running the study files of a generated study on the local machine.
+
+    The study files are read from the index of the study (index.db), or from its tree structure
+    (tree.yaml) if there is no index. Each study file runs in its own folder once all the study
+    files of the parent folder have finished successfully, such that it can use their outputs. The
+    study files of a parameter table run once per point. The output of each study file is written
+    to a log file next to it.
+
+    Jobs are packed on the CPUs and memory of the machine according to the resources declared for
+    their generation in the master file. Among the jobs ready to run, the ones with the longest
+    expected runtime start first, and jobs requiring more than the machine run alone.
+
+    The execution of each job (status, exit code, timestamps and hashes of its outputs) is recorded
+    in the index of the study, such that an interrupted run can be resumed. A job is complete if
+    it ran successfully, or if all the outputs declared for its generation exist, in which case it
+    is not run again unless one of the jobs it depends on runs again.
+
+    By default, each job runs in a new interpreter. In warm mode, the jobs of each generation run
+    in a pool of long-lived worker processes instead, which import the modules of the generation
+    once, such that the import time is paid once per worker rather than once per job. Each job
+    still runs as a fresh __main__ module, from its folder.
+
+    In fork mode, the code shared by the sibling jobs of a generation (the jobs of a same parent
+    folder) runs once in a server process: the study files are compared, and the leading
+    statements of their main function which don't use the parameters specific to each job (e.g.
+    loading a collider and building its trackers) run once. Each job then runs the rest of the main
+    function in a child process forked from the server, which shares its memory. Jobs whose study
+    files can't be split this way, and the jobs of parameter tables, run as usual.
+
+    Args:
+        path_study (str): The path to the study folder.
+        n_cpus (int | None, optional): The number of CPUs used to run the study files. Defaults to
+            None, in which case all the CPUs of the machine are used.
+        memory (float | None, optional): The memory in GB used to run the study files. Defaults to
+            None, in which case the memory available on the machine is used.
+        python (str, optional): The Python interpreter used to run the study files. Defaults to
+            the current interpreter.
+        warm (bool, optional): Whether to run the jobs in warm worker processes. Defaults to
+            False.
+        fork (bool, optional): Whether to run the code shared by sibling jobs once, and fork a
+            process for each job. Defaults to False.
+
+    Attributes:
+        path_study (str): The path to the study folder.
+        n_cpus (int): The number of CPUs used to run the study files.
+        memory (float): The memory in GB used to run the study files.
+        python (str): The Python interpreter used to run the study files.
+        warm (bool): Whether to run the jobs in warm worker processes.
+        dict_pools (dict[str, ProcessPoolExecutor]): The warm worker processes of each generation.
+        fork (bool): Whether to run the code shared by sibling jobs once, and fork a process for
+            each job.
+        dict_fork_servers (dict[tuple[str, str], ForkServer | None]): The fork server of each
+            group of sibling jobs, indexed by generation and parent folder, or None if the study
+            files of the group can't be split.
+        dict_jobs (dict[tuple[str, int | None], StudyJob]): The jobs to run, indexed by study file
+            and row of the parameter table, in the order of the study.
+        dict_dependencies (dict[tuple[str, int | None], set[tuple[str, int | None]]]): The jobs
+            each job depends on.
+        dict_resources (dict[str, dict[str, float]]): The resources required by each job of each
+            generation.
+        path_index (str | None): The path to the index of the study, if any.
+        dict_rows (dict[tuple[str, int | None], tuple[str, int | None]]): The study file and row
+            of the parameter table of each job, as recorded in the index.
+        dict_outputs (dict[tuple[str, int | None], list[str] | None]): The outputs of each job,
+            if declared.
+        dict_fork_groups (dict[tuple[str, str], list[str]]): The study files of each group of
+            sibling jobs, indexed by generation and parent folder.
+        dict_status (dict[tuple[str, int | None], set[str]]): The statuses recorded in the index
+            for the points of each job.
+        set_completed (set[tuple[str, int | None]]): The jobs found complete, and not run again.
+
+    Methods:
+        load_rows: Loads the jobs of the study, with their folder and parent folder.
+        load_rows_from_tree: Loads the jobs of the study from its tree structure.
+        load_jobs: Loads the jobs to run and their dependencies.
+        load_resources: Loads the resources required by each generation.
+        get_job_resources: Retrieves the resources allocated to a job.
+        is_complete: Checks if a job is complete.
+        get_output_hashes: Retrieves the hashes of the outputs of a job.
+        get_log_path: Retrieves the path of the log file of a job.
+        get_imports: Retrieves the modules imported by a study file.
+        get_warm_pool: Retrieves the warm worker processes of a generation.
+        shutdown_warm_pools: Stops warm worker processes.
+        get_fork_group: Retrieves the group of sibling jobs of a job.
+        get_fork_server: Retrieves the fork server of the group of a job.
+        shutdown_fork_servers: Stops fork servers.
+        run_job: Runs a single job.
+        execute_job: Runs a single job and hashes its outputs.
+        update_status: Records the execution of a job in the index.
+        run: Runs all the jobs of the study which are not complete.
+    """
+
+    def __init__(
+        self: Self,
+        path_study: str,
+        n_cpus: int | None = None,
+        memory: float | None = None,
+        python: str = sys.executable,
+        warm: bool = False,
+        fork: bool = False,
+    ):
+        self.path_study = path_study
+        self.n_cpus = (os.cpu_count() or 1) if n_cpus is None else n_cpus
+        self.memory = get_available_memory() if memory is None else memory
+        self.python = python
+        self.warm = warm
+        self.dict_pools = {}
+        self._lock_pools = threading.Lock()
+        self.fork = fork
+        self.dict_fork_servers = {}
+        self._dict_fork_locks = {}
+        self.dict_jobs = {}
+        self.dict_dependencies = {}
+        self.path_index = os.path.join(path_study, "index.db")
+        if not os.path.exists(self.path_index):
+            self.path_index = None
+        self.dict_rows = {}
+        self.dict_outputs = {}
+        self.dict_status = {}
+        self.set_completed = set()
+        self.load_jobs()
+        self.dict_resources = self.load_resources()
+        self.dict_fork_groups = {}
+        for job in self.dict_jobs.values():
+            if job.index is None:
+                self.dict_fork_groups.setdefault(self.get_fork_group(job), []).append(job.file)
+
+    def load_rows(self: Self) -> list[tuple[Any, ...]]:
+        """
+        Loads the jobs of the study, with their folder and the folder of their parent job.
+
+        Returns:
+            list[tuple[Any, ...]]: The layer, generation, study file, row of the parameter table,
+                folder, parent folder, outputs and status of each job, with the paths relative to
+                the folder the study was generated from.
+        """
+        if self.path_index is None:
+            return self.load_rows_from_tree()
+
+        with sqlite3.connect(self.path_index) as connection:
+            return connection.execute(
+                "SELECT jobs.layer, jobs.generation, jobs.file, jobs.table_index, jobs.path,"
+                " parents.path, jobs.outputs, jobs.status FROM jobs LEFT JOIN jobs AS parents"
+                " ON jobs.parent_id = parents.job_id ORDER BY jobs.job_id"
+            ).fetchall()
+
+    def load_rows_from_tree(self: Self) -> list[tuple[Any, ...]]:
+        """
+        Loads the jobs of the study from its tree structure. The parent folder of a job is the
+        closest enclosing folder containing study files.
+
+        Returns:
+            list[tuple[Any, ...]]: The layer, generation, study file, row of the parameter table,
+                folder, parent folder, outputs and status of each job. The tree doesn't store the
+                layers, outputs and statuses, which are None.
+        """
+        with open(os.path.join(self.path_study, "tree.yaml"), "r") as f:
+            dictionary_tree = yaml.YAML().load(f) or {}
+        name = os.path.basename(os.path.normpath(self.path_study))
+
+        l_rows = []
+
+        def walk(dic: dict[str, Any], path: str, path_parent: str | None):
+            l_gens = [key for key, value in dic.items() if "file" in value]
+            for gen in l_gens:
+                entry = dic[gen]
+                l_rows.append(
+                    (None, gen, entry["file"], entry.get("index"), path, path_parent, None, None)
+                )
+            for key, value in dic.items():
+                if key not in l_gens:
+                    walk(value, f"{path}{key}/", path if l_gens else path_parent)
+
+        walk(dictionary_tree, f"{name}/", None)
+        return l_rows
+
+    def load_jobs(self: Self):
+        """
+        Loads the jobs to run and their dependencies. A study file is run once, or once per row
+        of its parameter table, and depends on all the jobs of the parent folder of its points.
+        """
+        l_rows = self.load_rows()
+
+        # Paths are relative to the folder the study was generated from
+        path_root = os.path.dirname(os.path.abspath(os.path.normpath(self.path_study)))
+        if l_rows:
+            while not os.path.exists(os.path.join(path_root, l_rows[0][2])):
+                if os.path.dirname(path_root) == path_root:
+                    raise FileNotFoundError(f"Study file {l_rows[0][2]} can't be found.")
+                path_root = os.path.dirname(path_root)
+
+        # Jobs sharing a study file and a row are run once
+        dict_keys_folder = {}
+        for layer, gen, file, table_index, path, _, outputs, status in l_rows:
+            key = (os.path.join(path_root, file), table_index)
+            if key not in self.dict_jobs:
+                self.dict_jobs[key] = StudyJob(
+                    key[0], os.path.dirname(key[0]), gen, layer, index=table_index
+                )
+                self.dict_dependencies[key] = set()
+                self.dict_rows[key] = (file, table_index)
+                self.dict_outputs[key] = None
+                self.dict_status[key] = set()
+            dict_keys_folder.setdefault(path, {})[key] = None
+            if outputs is not None:
+                self.dict_outputs[key] = (self.dict_outputs[key] or []) + [
+                    os.path.join(path_root, path, output) for output in json.loads(outputs)
+                ]
+            self.dict_status[key].add(status)
+        for _, _, file, table_index, _, path_parent, _, _ in l_rows:
+            key = (os.path.join(path_root, file), table_index)
+            if path_parent is not None:
+                self.dict_dependencies[key].update(
+                    key_parent for key_parent in dict_keys_folder[path_parent] if key_parent != key
+                )
+
+    def load_resources(self: Self) -> dict[str, dict[str, float]]:
+        """
+        Loads the resources required by each generation, as recorded in the index of the study.
+        Generations without recorded resources require one CPU.
+
+        Returns:
+            dict[str, dict[str, float]]: The number of CPUs, the memory in GB and the expected
+                runtime in seconds of each job, for each generation.
+        """
+        dict_resources = {job.gen: get_resources(None) for job in self.dict_jobs.values()}
+        if self.path_index is not None:
+            with sqlite3.connect(self.path_index) as connection:
+                for gen, resources in connection.execute(
+                    "SELECT generation, resources FROM generations"
+                ):
+                    if resources is not None:
+                        dict_resources[gen] = json.loads(resources)
+        return dict_resources
+
+    def get_job_resources(self: Self, key: tuple[str, int | None]) -> tuple[int, float]:
+        """
+        Retrieves the CPUs and memory allocated to a job. Jobs requiring more than the machine are
+        allocated the whole machine.
+
+        Args:
+            key (tuple[str, int | None]): The study file and row of the parameter table of the job.
+
+        Returns:
+            tuple[int, float]: The number of CPUs and the memory in GB allocated to the job.
+        """
+        resources = self.dict_resources[self.dict_jobs[key].gen]
+        return min(int(resources["cpus"]), self.n_cpus), min(resources["memory"], self.memory)
+
+    def is_complete(self: Self, key: tuple[str, int | None]) -> bool:
+        """
+        Checks if a job is complete, i.e. if all its declared outputs exist, or if it ran
+        successfully when it declares no output. Jobs which failed or were interrupted, and stale
+        jobs (whose study file changed since they were recorded), are not complete, even if some
+        of their outputs exist.
+
+        Args:
+            key (tuple[str, int | None]): The study file and row of the parameter table of the job.
+
+        Returns:
+            bool: True if the job is complete.
+        """
+        if self.dict_status[key] & {"running", "failed", "stale"}:
+            return False
+        if self.dict_outputs[key] is None:
+            return self.dict_status[key] == {"done"}
+        return all(glob.glob(output) for output in self.dict_outputs[key])  # type: ignore
+
+    def get_output_hashes(self: Self, key: tuple[str, int | None]) -> dict[str, str] | None:
+        """
+        Retrieves the hashes of the output files of a job.
+
+        Args:
+            key (tuple[str, int | None]): The study file and row of the parameter table of the job.
+
+        Returns:
+            dict[str, str] | None: The sha256 hash of each output file, or None if the job
+                declares no output.
+        """
+        if self.dict_outputs[key] is None:
+            return None
+        dict_hashes = {}
+        for output in self.dict_outputs[key]:  # type: ignore
+            for path_output in sorted(glob.glob(output)):
+                if os.path.isfile(path_output):
+                    with open(path_output, "rb") as f:
+                        dict_hashes[path_output] = hashlib.file_digest(f, "sha256").hexdigest()
+        return dict_hashes
+
+    @staticmethod
+    def get_log_path(job: StudyJob) -> str:
+        """
+        Retrieves the path of the log file of a job, next to its study file.
+
+        Args:
+            job (StudyJob): The job.
+
+        Returns:
+            str: The path of the log file.
+        """
+        path_log = os.path.splitext(job.file)[0]
+        if job.index is not None:
+            path_log += f"_{job.index}"
+        return f"{path_log}.log"
+
+    @staticmethod
+    def get_imports(file: str) -> list[str]:
+        """
+        Retrieves the modules imported at the top level of a study file.
+
+        Args:
+            file (str): The path of the study file.
+
+        Returns:
+            list[str]: The imported modules, in order.
+        """
+        with open(file, "r") as f:
+            module = ast.parse(f.read())
+        l_modules = []
+        for node in module.body:
+            if isinstance(node, ast.Import):
+                l_modules.extend(alias.name for alias in node.names)
+            elif isinstance(node, ast.ImportFrom) and node.level == 0 and node.module is not None:
+                l_modules.append(node.module)
+        return list(dict.fromkeys(l_modules))
+
+    def get_warm_pool(self: Self, job: StudyJob, n_cpus: int) -> ProcessPoolExecutor:
+        """
+        Retrieves the warm worker processes of the generation of a job, starting them if needed.
+        The workers import the modules of the first study file of the generation, and are as many
+        as the jobs of the generation which can run at the same time.
+
+        Args:
+            job (StudyJob): The job.
+            n_cpus (int): The number of CPUs allocated to each job of the generation.
+
+        Returns:
+            ProcessPoolExecutor: The warm worker processes of the generation.
+        """
+        with self._lock_pools:
+            if job.gen not in self.dict_pools:
+                self.dict_pools[job.gen] = ProcessPoolExecutor(
+                    max_workers=max(1, self.n_cpus // n_cpus),
+                    mp_context=multiprocessing.get_context("spawn"),
+                    initializer=_initialize_warm_worker,
+                    initargs=(self.get_imports(job.file), n_cpus),
+                )
+            return self.dict_pools[job.gen]
+
+    def shutdown_warm_pools(self: Self, l_gens: list[str] | None = None):
+        """
+        Stops warm worker processes.
+
+        Args:
+            l_gens (list[str] | None, optional): The generations whose workers are stopped.
+                Defaults to None, in which case all the workers are stopped.
+        """
+        with self._lock_pools:
+            for gen in list(self.dict_pools) if l_gens is None else l_gens:
+                if gen in self.dict_pools:
+                    self.dict_pools.pop(gen).shutdown(wait=False, cancel_futures=True)
+
+    @staticmethod
+    def get_fork_group(job: StudyJob) -> tuple[str, str]:
+        """
+        Retrieves the group of sibling jobs of a job, which share their code in fork mode. Sibling
+        jobs belong to the same generation and parent folder, such that the paths leaving their
+        folder (e.g. "../collider.json") point to the same files.
+
+        Args:
+            job (StudyJob): The job.
+
+        Returns:
+            tuple[str, str]: The generation and the parent folder of the job.
+        """
+        return job.gen, os.path.dirname(job.directory)
+
+    def get_fork_server(self: Self, job: StudyJob, n_cpus: int) -> ForkServer | None:
+        """
+        Retrieves the fork server of the group of sibling jobs of a job, starting it if needed. The
+        server runs the code shared by the jobs of the group from the folder of the first job.
+
+        Args:
+            job (StudyJob): The job.
+            n_cpus (int): The number of CPUs allocated to each job of the generation.
+
+        Returns:
+            ForkServer | None: The fork server, or None if the job is alone in its group, or if
+                the study files of the group can't be split or their shared code failed.
+        """
+        group = self.get_fork_group(job)
+        with self._lock_pools:
+            lock = self._dict_fork_locks.setdefault(group, threading.Lock())
+
+        # The jobs of the group wait for the shared code to run once
+        with lock:
+            if group not in self.dict_fork_servers:
+                server = None
+                if len(self.dict_fork_groups[group]) > 1:
+                    split = get_script_split(self.dict_fork_groups[group])
+                    if split is not None:
+                        server = ForkServer(split, n_cpus)
+                        if not server.ready:
+                            server.stop()
+                            server = None
+                self.dict_fork_servers[group] = server
+            return self.dict_fork_servers[group]
+
+    def shutdown_fork_servers(self: Self, l_groups: list[tuple[str, str]] | None = None):
+        """
+        Stops fork servers.
+
+        Args:
+            l_groups (list[tuple[str, str]] | None, optional): The groups whose servers are
+                stopped. Defaults to None, in which case all the servers are stopped.
+        """
+        for group in list(self.dict_fork_servers) if l_groups is None else l_groups:
+            with self._lock_pools:
+                lock = self._dict_fork_locks.setdefault(group, threading.Lock())
+            with lock:
+                server = self.dict_fork_servers.get(group)
+                if server is not None:
+                    server.stop()
+                    self.dict_fork_servers[group] = None
+
+    def run_job(self: Self, job: StudyJob, n_cpus: int = 1) -> int:
+        """
+        Runs a single job in the folder of its study file, writing its output to its log file. The
+        numerical libraries of the job are limited to the CPUs allocated to it.
+
+        Args:
+            job (StudyJob): The job to run.
+            n_cpus (int, optional): The number of CPUs allocated to the job. Defaults to 1.
+
+        Returns:
+            int: The exit code of the job.
+        """
+        l_args = [] if job.index is None else ["--index", str(job.index)]
+        if self.fork and job.index is None:
+            server = self.get_fork_server(job, n_cpus)
+            if server is not None:
+                returncode = server.run(job.file, self.get_log_path(job))
+                if returncode is not None:
+                    return returncode
+                with open(self.get_log_path(job), "a") as log_file:
+                    log_file.write("\nThe fork server running the job died unexpectedly.\n")
+                return 1
+        if self.warm:
+            pool = self.get_warm_pool(job, n_cpus)
+            try:
+                return pool.submit(_run_warm_job, job.file, l_args, self.get_log_path(job)).result()
+            except BrokenProcessPool:
+                # A worker died (e.g. killed by a signal), the pool is restarted for the next jobs
+                with self._lock_pools:
+                    if self.dict_pools.get(job.gen) is pool:
+                        del self.dict_pools[job.gen]
+                with open(self.get_log_path(job), "a") as log_file:
+                    log_file.write("\nThe warm worker running the job died unexpectedly.\n")
+                return 1
+
+        env = dict(os.environ, **{variable: str(n_cpus) for variable in l_thread_variables})
+        with open(self.get_log_path(job), "w") as log_file:
+            return subprocess.run(
+                [self.python, job.file] + l_args,
+                cwd=job.directory,
+                env=env,
+                stdout=log_file,
+                stderr=subprocess.STDOUT,
+            ).returncode
+
+    def execute_job(
+        self: Self, key: tuple[str, int | None], n_cpus: int = 1
+    ) -> tuple[int, dict[str, str] | None]:
+        """
+        Runs a single job, and hashes its outputs if it succeeded.
+
+        Args:
+            key (tuple[str, int | None]): The study file and row of the parameter table of the job.
+            n_cpus (int, optional): The number of CPUs allocated to the job. Defaults to 1.
+
+        Returns:
+            tuple[int, dict[str, str] | None]: The exit code of the job, and the hashes of its
+                outputs.
+        """
+        returncode = self.run_job(self.dict_jobs[key], n_cpus)
+        return returncode, self.get_output_hashes(key) if returncode == 0 else None
+
+    def update_status(
+        self: Self, connection: sqlite3.Connection | None, key: tuple[str, int | None], **values
+    ):
+        """
+        Records the execution of a job in the index of the study.
+
+        Args:
+            connection (sqlite3.Connection | None): The connection to the index, if any.
+            key (tuple[str, int | None]): The study file and row of the parameter table of the job.
+            **values: The values of the execution columns to update (status, returncode,
+                start_time, end_time, output_hashes).
+        """
+        self.dict_status[key] = {values["status"]}
+        if connection is None:
+            return
+        connection.execute(
+            f"UPDATE jobs SET {', '.join(f'{column} = ?' for column in values)}"
+            " WHERE file = ? AND table_index IS ?",
+            (*values.values(), *self.dict_rows[key]),
+        )
+        connection.commit()
+
+    def run(self: Self) -> dict[tuple[str, int | None], int | None]:
+        """
+        Runs all the jobs of the study which are not complete, each job starting as soon as the
+        jobs it depends on have finished and enough CPUs and memory are free. The jobs depending on
+        a failed job are not run.
+
+        Returns:
+            dict[tuple[str, int | None], int | None]: The exit code of each job, indexed by study
+                file and row of the parameter table, 0 if the job was already complete, or None if
+                the job was not run.
+        """
+        dict_returncodes = {key: None for key in self.dict_jobs}
+        dict_n_dependencies = {key: len(deps) for key, deps in self.dict_dependencies.items()}
+        dict_children = {key: [] for key in self.dict_jobs}
+        for key, set_dependencies in self.dict_dependencies.items():
+            for key_parent in set_dependencies:
+                dict_children[key_parent].append(key)
+
+        # Jobs ready to run, by generation, the generations with the longest jobs first
+        dict_ready = {
+            gen: deque()
+            for gen in sorted(
+                self.dict_resources, key=lambda gen: -self.dict_resources[gen]["runtime"]
+            )
+        }
+
+        # The execution is recorded in the index, which can be queried during the run
+        connection = None
+        if self.path_index is not None:
+            connection = sqlite3.connect(self.path_index)
+            connection.execute("PRAGMA journal_mode = WAL")
+
+        # Complete jobs are skipped, unless one of the jobs they depend on runs again
+        set_rerun = set()
+        self.set_completed = set()
+
+        # Warm workers are stopped once all the jobs of their generation finished, and fork
+        # servers once all the jobs of their group finished
+        dict_n_remaining = {gen: 0 for gen in self.dict_resources}
+        for job in self.dict_jobs.values():
+            dict_n_remaining[job.gen] += 1
+        dict_n_remaining_group = {
+            group: len(l_files) for group, l_files in self.dict_fork_groups.items()
+        }
+
+        def set_finished(key: tuple[str, int | None]):
+            job = self.dict_jobs[key]
+            dict_n_remaining[job.gen] -= 1
+            if dict_n_remaining[job.gen] == 0:
+                self.shutdown_warm_pools([job.gen])
+            if job.index is None:
+                group = self.get_fork_group(job)
+                dict_n_remaining_group[group] -= 1
+                if dict_n_remaining_group[group] == 0:
+                    self.shutdown_fork_servers([group])
+
+        def set_ready(key: tuple[str, int | None]):
+            l_keys = [key]
+            while l_keys:
+                key = l_keys.pop()
+                if key in set_rerun or not self.is_complete(key):
+                    dict_ready[self.dict_jobs[key].gen].append(key)
+                    continue
+                self.set_completed.add(key)
+                set_finished(key)
+                dict_returncodes[key] = 0
+                if self.dict_status[key] != {"done"}:
+                    self.update_status(connection, key, status="done")
+                for key_child in reversed(dict_children[key]):
+                    dict_n_dependencies[key_child] -= 1
+                    if dict_n_dependencies[key_child] == 0:
+                        l_keys.append(key_child)
+
+        for key, n_dependencies in dict_n_dependencies.items():
+            if n_dependencies == 0:
+                set_ready(key)
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.n_cpus) as pool:
+                dict_futures: dict[Future, tuple[str, int | None]] = {}
+                n_cpus_free, memory_free = 0, 0.0
+
+                # Start the ready jobs which fit on the free CPUs and memory
+                while True:
+                    if not dict_futures:
+                        n_cpus_free, memory_free = self.n_cpus, self.memory
+                    for deque_ready in dict_ready.values():
+                        while deque_ready:
+                            n_cpus, memory = self.get_job_resources(deque_ready[0])
+                            if n_cpus > n_cpus_free or memory > memory_free:
+                                break
+                            key = deque_ready.popleft()
+                            n_cpus_free -= n_cpus
+                            memory_free -= memory
+                            self.update_status(
+                                connection,
+                                key,
+                                status="running",
+                                returncode=None,
+                                start_time=time.time(),
+                                end_time=None,
+                                output_hashes=None,
+                            )
+                            dict_futures[pool.submit(self.execute_job, key, n_cpus)] = key
+                    if not dict_futures:
+                        break
+
+                    # Start the children of each job once all their parents succeeded
+                    set_done, _ = wait(dict_futures, return_when=FIRST_COMPLETED)
+                    for future in set_done:
+                        key = dict_futures.pop(future)
+                        n_cpus, memory = self.get_job_resources(key)
+                        n_cpus_free += n_cpus
+                        memory_free += memory
+                        returncode, dict_output_hashes = future.result()
+                        set_finished(key)
+                        dict_returncodes[key] = returncode
+                        if dict_output_hashes is not None:
+                            dict_output_hashes = json.dumps(dict_output_hashes)
+                        self.update_status(
+                            connection,
+                            key,
+                            status="done" if returncode == 0 else "failed",
+                            returncode=returncode,
+                            end_time=time.time(),
+                            output_hashes=dict_output_hashes,
+                        )
+                        if returncode != 0:
+                            continue
+                        for key_child in dict_children[key]:
+                            set_rerun.add(key_child)
+                            dict_n_dependencies[key_child] -= 1
+                            if dict_n_dependencies[key_child] == 0:
+                                set_ready(key_child)
+        finally:
+            self.shutdown_warm_pools()
+            self.shutdown_fork_servers()
+            if connection is not None:
+                connection.close()
+
+        return dict_returncodes
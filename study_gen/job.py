@@ -0,0 +1,70 @@
+from typing import Any
+
+
+class StudyJob:
+    """A class representing a lightweight record of a generated study file.
+
+    Args:
+        file (str): The path of the study file.
+        directory (str): The directory of the study file, where the children generations are
+            written.
+        gen (str): The generation name.
+        layer (str): The layer name.
+        dic_mutated_parameters (dict[str, Any] | None, optional): The dictionary of mutated
+            parameters. Defaults to None.
+        hash (str | None, optional): The sha256 hash of the written study file. Defaults to None.
+        study_str (str | None, optional): The study file string. Defaults to None.
+        index (int | None, optional): The row of the point in the parameter table of the study
+            file, if the layer uses a parameter table. Defaults to None.
+
+    Attributes:
+        file (str): The path of the study file.
+        directory (str): The directory of the study file.
+        gen (str): The generation name.
+        layer (str): The layer name.
+        dic_mutated_parameters (dict[str, Any]): The dictionary of mutated parameters.
+        hash (str | None): The sha256 hash of the written study file, if computed.
+        study_str (str | None): The study file string, if retained.
+        index (int | None): The row of the point in the parameter table of the study file, if any.
+    """
+
+    __slots__ = (
+        "file",
+        "directory",
+        "gen",
+        "layer",
+        "dic_mutated_parameters",
+        "hash",
+        "study_str",
+        "index",
+    )
+
+    def __init__(
+        self,
+        file: str,
+        directory: str,
+        gen: str,
+        layer: str,
+        dic_mutated_parameters: dict[str, Any] | None = None,
+        hash: str | None = None,
+        study_str: str | None = None,
+        index: int | None = None,
+    ):
+        self.file = file
+        self.directory = directory
+        self.gen = gen
+        self.layer = layer
+        self.dic_mutated_parameters = (
+            {} if dic_mutated_parameters is None else dic_mutated_parameters
+        )
+        self.hash = hash
+        self.study_str = study_str
+        self.index = index
+
+    def __repr__(self) -> str:
+        if self.index is None:
+            return f"StudyJob(file={self.file!r}, gen={self.gen!r}, layer={self.layer!r})"
+        return (
+            f"StudyJob(file={self.file!r}, gen={self.gen!r}, layer={self.layer!r},"
+            f" index={self.index!r})"
+        )
@@ -1,43 +1,48 @@
-import copy
 from collections import OrderedDict
 
-from ..block import Block
+from ..block import Block, BoundBlock
 
 
-def _get_multiple_merge_parameters(l_blocks: list[Block]) -> OrderedDict[str, type]:
+def _get_multiple_merge_parameters(l_blocks: list[Block | BoundBlock]) -> OrderedDict[str, type]:
     """
     Merges the parameters of multiple blocks.
 
     Args:
-        l_blocks (list[Block]): A list of Block objects to be merged.
+        l_blocks (list[Block | BoundBlock]): A list of Block objects (or bound views) to be merged.
 
     Returns:
         OrderedDict[str, type]: A dictionary of merged parameters.
 
     Raises:
-        ValueError: If identical parameters have different types in the blocks.
+        ValueError: If identical parameters have different types in the blocks (all conflicts are
+            reported at once).
     """
-    # Start with empty dictionnary of parameters
+    # Merge all parameters in a single pass, recording the first type seen for each of them
     dict_parameters = OrderedDict()
-
-    # Progressively merge all parameters (two by two)
-    for idx, block1 in enumerate(l_blocks):
-        for block2 in l_blocks[idx + 1 :]:
-            # Check that identical parameters have identical type
-            dict_arguments_block1 = block1.get_arguments_as_dict()
-            dict_arguments_block2 = block2.get_arguments_as_dict()
-            for key in set(dict_arguments_block1).intersection(dict_arguments_block2):
-                if dict_arguments_block1[key] != dict_arguments_block2[key]:
-                    raise ValueError(f"Parameter {key} has different types in the two blocks")
-
-            # Add to dictionnary of parameters
-            dict_parameters = dict_parameters | dict_arguments_block1 | dict_arguments_block2
+    l_conflicts = []
+    for block in l_blocks:
+        for key, type_key in block.get_arguments_as_dict().items():
+            if key not in dict_parameters:
+                dict_parameters[key] = type_key
+            elif dict_parameters[key] != type_key:
+                l_conflicts.append(
+                    f"{key} ({getattr(dict_parameters[key], '__name__', dict_parameters[key])}"
+                    f" previously, {getattr(type_key, '__name__', type_key)} in block"
+                    f" {block.name})"
+                )
+
+    # Report all type conflicts at once
+    if l_conflicts:
+        raise ValueError(
+            "Some parameters have different types in the blocks: " + ", ".join(l_conflicts)
+        )
 
     # If an output has been provided, remove it from the list of parameters
     # Except if it's modified inplace (inside of a block)
     for block in l_blocks:
+        set_arguments_names = set(block.get_arguments_names())
         for key in block.dict_output:
-            if key not in block.get_arguments_names() and key in dict_parameters:
+            if key not in set_arguments_names and key in dict_parameters:
                 del dict_parameters[key]
 
     # Return the merged parameters
@@ -45,7 +50,7 @@ def _get_multiple_merge_parameters(l_blocks: list[Block]) -> OrderedDict[str, ty
 
 
 def _check_external_merge_output(
-    l_blocks: list[Block],
+    l_blocks: list[Block | BoundBlock],
     dict_parameters: OrderedDict[str, type],
     dict_output: OrderedDict[str, type],
 ):
@@ -53,7 +58,7 @@ def _check_external_merge_output(
     Checks the consistency of the output in the merged blocks.
 
     Args:
-        l_blocks (list[Block]): A list of Block objects to be merged.
+        l_blocks (list[Block | BoundBlock]): A list of Block objects (or bound views) to be merged.
         dict_parameters (OrderedDict[str, type]): A dictionary of merged parameters.
         dict_output (OrderedDict[str, type]): A dictionary of output names and types.
 
@@ -65,18 +70,18 @@ def _check_external_merge_output(
     # - in the outputs
     if len(dict_output) > 0:
         # Merge all output and parameters
-        dic_block_parameters_and_outputs = copy.deepcopy(dict_parameters)
+        set_block_parameters_and_outputs = set(dict_parameters)
         for block in l_blocks:
-            dic_block_parameters_and_outputs = dic_block_parameters_and_outputs | block.dict_output
+            set_block_parameters_and_outputs.update(block.dict_output)
 
         # Check that all outputs are in the parameters or the outputs
         for key in dict_output:
-            if key not in dic_block_parameters_and_outputs:
+            if key not in set_block_parameters_and_outputs:
                 raise ValueError(f"Output {key} is not in the parameters nor the outputs")
 
 
 def _build_external_merge_str(
-    l_blocks: list[Block],
+    l_blocks: list[Block | BoundBlock],
     name_function: str,
     docstring: str = "",
     dict_output: OrderedDict[str, type] = OrderedDict(),
@@ -86,7 +91,7 @@ def _build_external_merge_str(
     Builds the string representation of the merged function.
 
     Args:
-        l_blocks (list[Block]): A list of Block objects to be merged.
+        l_blocks (list[Block | BoundBlock]): A list of Block objects (or bound views) to be merged.
         name_function (str): The name of the merged function.
         docstring (str, optional): The docstring for the merged function. Defaults to "".
         dict_output (OrderedDict[str, type], optional): A dictionary of output names and types for the merged function. Defaults to OrderedDict().
@@ -113,7 +118,7 @@ def _build_external_merge_str(
 
 
 def get_multiple_merge_str(
-    l_blocks: list[Block],
+    l_blocks: list[Block | BoundBlock],
     name_function: str,
     docstring: str = "",
     dict_output: OrderedDict[str, type] = OrderedDict(),
@@ -122,7 +127,7 @@ def get_multiple_merge_str(
     Generates the string representation of a merged function.
 
     Args:
-        l_blocks (list[Block]): A list of Block objects to be merged.
+        l_blocks (list[Block | BoundBlock]): A list of Block objects (or bound views) to be merged.
         name_function (str): The name of the merged function.
         docstring (str, optional): The docstring for the merged function. Defaults to "".
         dict_output (OrderedDict[str, type], optional): A dictionary of output names and types for the merged function. Defaults to OrderedDict().
@@ -142,12 +147,12 @@ def get_multiple_merge_str(
     )
 
 
-def merge_dependencies(l_blocks: list[Block]) -> set[str]:
+def merge_dependencies(l_blocks: list[Block | BoundBlock]) -> set[str]:
     """
     Merges the dependencies from multiple blocks into a set.
 
     Args:
-        l_blocks (list[Block]): A list of Block objects to be merged.
+        l_blocks (list[Block | BoundBlock]): A list of Block objects (or bound views) to be merged.
 
     Returns:
         set[str]: A set of merged dependencies.
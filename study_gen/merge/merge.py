@@ -1,15 +1,15 @@
 from collections import OrderedDict
 
-from ..block import Block
+from ..block import Block, BoundBlock
 from ._merge_blocks import get_multiple_merge_str, merge_dependencies
 
 
-def merge_imports(l_blocks: list[Block]) -> OrderedDict[str, str]:
+def merge_imports(l_blocks: list[Block | BoundBlock]) -> OrderedDict[str, str]:
     """
     Merges the imports from multiple blocks, ensuring there are no conflicts.
 
     Args:
-        l_blocks (list[Block]): A list of Block objects to be merged.
+        l_blocks (list[Block | BoundBlock]): A list of Block objects (or bound views) to be merged.
 
     Returns:
         OrderedDict[str, str]: A dictionary of merged imports, where the keys are module names and the values are import statements.
@@ -34,7 +34,7 @@ def merge_imports(l_blocks: list[Block]) -> OrderedDict[str, str]:
 
 def merge_blocks(
     name_merged_block: str,
-    l_blocks: list[Block],
+    l_blocks: list[Block | BoundBlock],
     name_merged_function: str,
     docstring: str = "",
     dict_output: OrderedDict[str, type] = OrderedDict(),
@@ -44,7 +44,7 @@ def merge_blocks(
 
     Args:
         name_merged_block (str): The name of the merged Block.
-        l_blocks (list[Block]): A list of Block objects to be merged.
+        l_blocks (list[Block | BoundBlock]): A list of Block objects (or bound views) to be merged.
         name_merged_function (str): The name of the merged function.
         docstring (str, optional): The docstring for the merged function. Defaults to "".
         dict_output (OrderedDict[str, type], optional): A dictionary of output names and types for the merged function. Defaults to OrderedDict().
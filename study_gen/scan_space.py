@@ -0,0 +1,245 @@
+from typing import Any, Iterator
+
+import numpy as np
+
+from ._scans import get_axes, get_filter_indices
+
+
+class ScanSpace:
+    """A class representing the points of a scan, addressable by index without being materialized.
+
+    The points are ordered as in a cartesian product of the axes of the scan (each axis being a
+    parameter, or a group of zipped parameters), such that the parameters of a point are decoded
+    from its index in constant time, as the digits of a mixed-radix number. Filtered scans only keep
+    the indices of the remaining points, and additional points (e.g. from a refinement) are appended
+    after the grid.
+
+    Args:
+        dic_parameter_lists (dict[str, Any]): The values of each scanned parameter.
+        dic_parameter_lists_for_naming (dict[str, Any] | None, optional): The values of each
+            scanned parameter, used for naming the folders. Defaults to None, in which case the
+            values themselves are used.
+        l_zip_groups (list[list[str]] | None, optional): The groups of parameters scanned
+            together. Defaults to None.
+        filter (str | list[str] | None, optional): One or several expressions evaluated with NumPy
+            on the naming values of all the points. Only the points for which all the expressions
+            are true are kept. Defaults to None.
+
+    Attributes:
+        dic_parameter_lists (dict[str, Any]): The values of each scanned parameter.
+        dic_parameter_lists_for_naming (dict[str, Any]): The values of each scanned parameter,
+            used for naming the folders.
+        l_parameters (list[str]): The scanned parameters.
+        l_axes (list[list[str]]): The parameters of each axis.
+        l_shape (list[int]): The number of values along each axis.
+        array_indices_kept (np.ndarray | None): The indices in the grid of the points kept by the
+            filter, if any.
+        l_points_extra (list[tuple[dict[str, Any], dict[str, Any]]]): The points appended after the
+            grid, with their values and naming values.
+
+    Methods:
+        get_point_path: Get the folder of a point from its naming values.
+        get_grid_size: Get the number of points of the grid, before filtering.
+        extend: Append points after the grid.
+        get_axis_indices: Get the index of a point along each axis.
+        get_path: Get the folder of a point.
+        index: Get the index of a point from its parameters.
+    """
+
+    def __init__(
+        self,
+        dic_parameter_lists: dict[str, Any],
+        dic_parameter_lists_for_naming: dict[str, Any] | None = None,
+        l_zip_groups: list[list[str]] | None = None,
+        filter: str | list[str] | None = None,
+    ):
+        self.dic_parameter_lists = dic_parameter_lists
+        self.dic_parameter_lists_for_naming = (
+            dic_parameter_lists
+            if dic_parameter_lists_for_naming is None
+            else dic_parameter_lists_for_naming
+        )
+        self.l_parameters = list(dic_parameter_lists)
+        self.l_axes = get_axes(self.l_parameters, [] if l_zip_groups is None else l_zip_groups)
+
+        # Get the number of values along each axis
+        self.l_shape = []
+        for axis in self.l_axes:
+            l_lengths = [len(dic_parameter_lists[parameter]) for parameter in axis]
+            if len(set(l_lengths)) > 1:
+                raise ValueError(
+                    f"Zipped parameters {', '.join(axis)} must have the same number of values, got"
+                    f" {', '.join(str(length) for length in l_lengths)}."
+                )
+            self.l_shape.append(l_lengths[0])
+
+        # Axis of each parameter, and position of each naming value along its axis (values are
+        # compared through their string representation, as in the folder names)
+        self._dict_axis = {
+            parameter: idx_axis for idx_axis, axis in enumerate(self.l_axes) for parameter in axis
+        }
+        self._dict_positions = {
+            parameter: {
+                str(value): idx
+                for idx, value in enumerate(self.dic_parameter_lists_for_naming[parameter])
+            }
+            for parameter in self.l_parameters
+        }
+
+        self.array_indices_kept = None
+        if filter:
+            self.array_indices_kept = get_filter_indices(
+                self.l_axes, self.l_shape, self.dic_parameter_lists_for_naming, filter
+            )
+        self.l_points_extra = []
+        self._dict_extra = {}
+
+    @staticmethod
+    def get_point_path(layer_path: str, dic_mutated_parameters_for_naming: dict[str, Any]) -> str:
+        """Get the folder of a point from its naming values.
+
+        Args:
+            layer_path (str): The path to the layer folder.
+            dic_mutated_parameters_for_naming (dict[str, Any]): The values of the scanned
+                parameters, used for naming the folder.
+
+        Returns:
+            str: The path to the folder of the point.
+
+        """
+        return (
+            layer_path
+            + "_".join(
+                [
+                    f"{parameter}_{value}"
+                    for parameter, value in dic_mutated_parameters_for_naming.items()
+                ]
+            )
+            + "/"
+        )
+
+    def get_grid_size(self) -> int:
+        """Get the number of points of the grid, before filtering.
+
+        Returns:
+            int: The number of points of the grid.
+
+        """
+        return int(np.prod(self.l_shape))
+
+    def _get_n_grid(self) -> int:
+        if self.array_indices_kept is not None:
+            return len(self.array_indices_kept)
+        return self.get_grid_size()
+
+    def __len__(self) -> int:
+        return self._get_n_grid() + len(self.l_points_extra)
+
+    def extend(self, l_points: list[tuple[dict[str, Any], dict[str, Any]]]):
+        """Append points after the grid.
+
+        Args:
+            l_points (list[tuple[dict[str, Any], dict[str, Any]]]): The points, with the values and
+                the naming values of the scanned parameters.
+
+        """
+        for dic_mutated_parameters, dic_mutated_parameters_for_naming in l_points:
+            key = tuple(str(dic_mutated_parameters_for_naming[p]) for p in self.l_parameters)
+            self._dict_extra[key] = len(self)
+            self.l_points_extra.append((dic_mutated_parameters, dic_mutated_parameters_for_naming))
+
+    def get_axis_indices(self, idx: int) -> list[int]:
+        """Get the index of a point of the grid along each axis.
+
+        Args:
+            idx (int): The index of the point, among the points of the grid kept by the filter.
+
+        Returns:
+            list[int]: The index of the point along each axis.
+
+        """
+        if self.array_indices_kept is not None:
+            idx = int(self.array_indices_kept[idx])
+
+        # Mixed-radix decoding, the last axis varying the fastest
+        l_indices = [0] * len(self.l_shape)
+        for idx_axis in range(len(self.l_shape) - 1, -1, -1):
+            idx, l_indices[idx_axis] = divmod(idx, self.l_shape[idx_axis])
+        return l_indices
+
+    def __getitem__(self, idx: int | slice) -> Any:
+        if isinstance(idx, slice):
+            return [self[i] for i in range(*idx.indices(len(self)))]
+        if idx < 0:
+            idx += len(self)
+        if not 0 <= idx < len(self):
+            raise IndexError(f"Scan point index {idx} out of range.")
+        if idx >= self._get_n_grid():
+            return self.l_points_extra[idx - self._get_n_grid()]
+
+        l_indices = self.get_axis_indices(idx)
+        dic_mutated_parameters = {}
+        dic_mutated_parameters_for_naming = {}
+        for parameter in self.l_parameters:
+            idx_value = l_indices[self._dict_axis[parameter]]
+            dic_mutated_parameters[parameter] = self.dic_parameter_lists[parameter][idx_value]
+            dic_mutated_parameters_for_naming[parameter] = self.dic_parameter_lists_for_naming[
+                parameter
+            ][idx_value]
+        return dic_mutated_parameters, dic_mutated_parameters_for_naming
+
+    def __iter__(self) -> Iterator[tuple[dict[str, Any], dict[str, Any]]]:
+        for idx in range(len(self)):
+            yield self[idx]
+
+    def get_path(self, idx: int, layer_path: str) -> str:
+        """Get the folder of a point.
+
+        Args:
+            idx (int): The index of the point.
+            layer_path (str): The path to the layer folder.
+
+        Returns:
+            str: The path to the folder of the point.
+
+        """
+        return self.get_point_path(layer_path, self[idx][1])
+
+    def index(self, dic_mutated_parameters_for_naming: dict[str, Any]) -> int:
+        """Get the index of a point from its parameters.
+
+        Args:
+            dic_mutated_parameters_for_naming (dict[str, Any]): The naming values of the scanned
+                parameters at the point.
+
+        Returns:
+            int: The index of the point.
+
+        Raises:
+            ValueError: If the point is not part of the scan.
+
+        """
+        key = tuple(str(dic_mutated_parameters_for_naming.get(p)) for p in self.l_parameters)
+        if key in self._dict_extra:
+            return self._dict_extra[key]
+
+        # Mixed-radix encoding, checking that zipped parameters are consistent
+        l_indices: list[int | None] = [None] * len(self.l_axes)
+        for parameter, value in zip(self.l_parameters, key):
+            idx_axis = self._dict_axis[parameter]
+            idx_value = self._dict_positions[parameter].get(value)
+            if idx_value is None or l_indices[idx_axis] not in (None, idx_value):
+                raise ValueError(f"Point {dic_mutated_parameters_for_naming} is not in the scan.")
+            l_indices[idx_axis] = idx_value
+        idx = 0
+        for idx_value, n_values in zip(l_indices, self.l_shape):
+            idx = idx * n_values + idx_value  # type: ignore
+
+        if self.array_indices_kept is None:
+            return idx
+        idx_kept = int(np.searchsorted(self.array_indices_kept, idx))
+        if idx_kept == len(self.array_indices_kept) or self.array_indices_kept[idx_kept] != idx:
+            raise ValueError(
+                f"Point {dic_mutated_parameters_for_naming} is filtered out of the scan."
+            )
+        return idx_kept
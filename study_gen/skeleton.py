@@ -0,0 +1,220 @@
+# Standard library imports
+import functools
+import hashlib
+
+# Third party imports
+from black import FileMode, InvalidInput, format_str
+
+# Formatting strategies of the study files
+l_formatting = ["black", "skeleton", "none"]
+
+
+@functools.lru_cache(maxsize=65536)
+def format_line(line: str) -> str:
+    """Format a single parameter assignment with black. The formatted assignments are memoized
+    with a bounded cache shared by all skeletons, since they repeat across scan points.
+
+    Args:
+        line (str): The parameter assignment.
+
+    Returns:
+        str: The formatted parameter assignment.
+
+    """
+    return format_str(line, mode=FileMode())
+
+
+def format_parameters(str_parameters: str) -> str:
+    """Format a parameters section with black, one assignment at a time.
+
+    Each assignment is formatted independently, which gives the same result as formatting the
+    whole file since they are simple top-level statements. The formatted assignments are memoized,
+    as most of them (e.g. the parameters that are not scanned) are identical across scan points.
+
+    Args:
+        str_parameters (str): The string representation of parameters.
+
+    Returns:
+        str: The formatted string representation of parameters.
+
+    """
+    l_lines_formatted = []
+    try:
+        for line in str_parameters.splitlines(keepends=True):
+            l_lines_formatted.append(format_line(line))
+    except InvalidInput:
+        # An assignment spans several lines, format the section as a whole
+        return format_str(str_parameters, mode=FileMode())
+    return "".join(l_lines_formatted)
+
+
+class GenerationSkeleton:
+    """A class representing the compiled skeleton of a generation.
+
+    The imports, blocks and main sections of a generation do not depend on the scan point, only
+    the parameters section does. The skeleton is therefore built (blocks merged, template rendered)
+    only once per generation and template, and then bound to the parameters of each scan point with
+    a simple string substitution. Likewise, the template can be formatted once, such that only the
+    parameters section needs to be formatted for each scan point.
+
+    Args:
+        gen (str): The generation name.
+        l_parameters (list[str]): The names of the parameters of the main function.
+        str_imports (str): The string representation of imports.
+        str_blocks (str): The string representation of blocks.
+        str_main (str): The string representation of the main block.
+        str_main_call (str): The string representation of the main block call.
+        l_template_parts (list[str], optional): The rendered template, split around the parameters
+            section. Defaults to None, in which case the skeleton can't be bound.
+
+    Attributes:
+        gen (str): The generation name.
+        l_parameters (list[str]): The names of the parameters of the main function.
+        str_imports (str): The string representation of imports.
+        str_blocks (str): The string representation of blocks.
+        str_main (str): The string representation of the main block.
+        str_main_call (str): The string representation of the main block call.
+        l_template_parts (list[str] | None): The rendered template, split around the parameters
+            section.
+        l_template_parts_formatted (list[str] | None): The rendered template formatted with black,
+            split around the parameters section, if computed. An empty list means that the
+            template can't be split once formatted.
+
+    Methods:
+        get_sections: Get the fixed sections of the generation.
+        get_hash: Get the hash of the rendered template.
+        bind: Bind a parameters section to the skeleton.
+        get_template_parts_formatted: Get the formatted template, split around the parameters
+            section.
+        bind_and_format: Bind a parameters section to the skeleton, and format the result.
+    """
+
+    # Placeholder used to render the template without parameters
+    parameters_placeholder = "__study_gen_parameters_placeholder__"
+
+    def __init__(
+        self,
+        gen: str,
+        l_parameters: list[str],
+        str_imports: str,
+        str_blocks: str,
+        str_main: str,
+        str_main_call: str,
+        l_template_parts: list[str] | None = None,
+    ):
+        self.gen = gen
+        self.l_parameters = l_parameters
+        self.str_imports = str_imports
+        self.str_blocks = str_blocks
+        self.str_main = str_main
+        self.str_main_call = str_main_call
+        self.l_template_parts = l_template_parts
+        self.l_template_parts_formatted = None
+        self._hash = None
+
+    def get_sections(self) -> tuple[str, str, str, str]:
+        """Get the fixed sections of the generation.
+
+        Returns:
+            tuple[str, str, str, str]: The string representations of imports, blocks, main, and
+                main call.
+
+        """
+        return self.str_imports, self.str_blocks, self.str_main, self.str_main_call
+
+    def get_hash(self) -> str:
+        """Get the hash of the rendered template, such that the inputs of a study file can be
+        hashed from its parameters section without binding it.
+
+        Returns:
+            str: The sha256 hash of the rendered template.
+
+        Raises:
+            ValueError: If the template has not been rendered for this skeleton.
+
+        """
+        if self.l_template_parts is None:
+            raise ValueError(f"The template has not been rendered for generation {self.gen}.")
+        if self._hash is None:
+            self._hash = hashlib.sha256(
+                self.parameters_placeholder.join(self.l_template_parts).encode()
+            ).hexdigest()
+        return self._hash
+
+    def bind(self, str_parameters: str) -> str:
+        """Bind a parameters section to the skeleton.
+
+        Args:
+            str_parameters (str): The string representation of parameters.
+
+        Returns:
+            str: The rendered study file.
+
+        Raises:
+            ValueError: If the template has not been rendered for this skeleton.
+
+        """
+        if self.l_template_parts is None:
+            raise ValueError(f"The template has not been rendered for generation {self.gen}.")
+        return str_parameters.join(self.l_template_parts)
+
+    def get_template_parts_formatted(self) -> list[str]:
+        """Get the rendered template formatted with black, split around the parameters section.
+
+        The parameters section is replaced by a placeholder statement spanning the same lines
+        before formatting, such that black handles the blank lines around it identically.
+
+        Returns:
+            list[str]: The formatted template parts, or an empty list if the template can't be split
+                once formatted.
+
+        Raises:
+            ValueError: If the template has not been rendered for this skeleton.
+
+        """
+        if self.l_template_parts is None:
+            raise ValueError(f"The template has not been rendered for generation {self.gen}.")
+        if self.l_template_parts_formatted is None:
+            placeholder = f"{self.parameters_placeholder}\n"
+            l_template_parts_formatted = format_str(
+                placeholder.join(self.l_template_parts), mode=FileMode()
+            ).split(placeholder)
+
+            # Black may have moved the placeholder (e.g. indented template), fall back to a
+            # full formatting in this case
+            if len(l_template_parts_formatted) != len(self.l_template_parts):
+                l_template_parts_formatted = []
+            self.l_template_parts_formatted = l_template_parts_formatted
+        return self.l_template_parts_formatted
+
+    def bind_and_format(
+        self, str_parameters: str, formatting: str = "black", study_str: str | None = None
+    ) -> str:
+        """Bind a parameters section to the skeleton, and format the result.
+
+        Args:
+            str_parameters (str): The string representation of parameters.
+            formatting (str, optional): The formatting strategy. "black" formats the whole study
+                file, "skeleton" only formats the parameters section and splices it into the
+                formatted template, and "none" doesn't format the study file. Defaults to "black".
+            study_str (str | None, optional): The study file already bound to the parameters, if
+                any, such that it is not bound again. Defaults to None.
+
+        Returns:
+            str: The formatted study file.
+
+        Raises:
+            ValueError: If the formatting strategy is unknown.
+
+        """
+        if formatting == "skeleton" and self.get_template_parts_formatted():
+            return format_parameters(str_parameters).join(self.get_template_parts_formatted())
+        if formatting not in l_formatting:
+            raise ValueError(
+                f"Unknown formatting strategy {formatting}. Expected one of {l_formatting}."
+            )
+        if study_str is None:
+            study_str = self.bind(str_parameters)
+        if formatting == "none":
+            return study_str
+        return format_str(study_str, mode=FileMode())
@@ -1,22 +1,74 @@
 # Standard library imports
-import contextlib
-import copy
+import hashlib
 import itertools
 import os
 import shutil
+import zlib
 from collections import OrderedDict
-from typing import Any, Self
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Iterator, Self
 
 # Third party imports
 import numpy as np
 from black import FileMode, format_str
-from jinja2 import Environment, FileSystemLoader
+from jinja2 import Environment, FileSystemBytecodeCache, FileSystemLoader, Template
 from ruamel import yaml
 
 # Local imports
 from . import merge
-from ._nested_dicts import nested_set
-from .block import Block
+from ._block_cache import BlockCache
+from ._configuration_index import ConfigurationIndex
+from ._manifest import Manifest
+from ._nested_dicts import nested_set, nested_update
+from ._parameter_table import get_selection_str, get_table_str, get_table_value, l_reserved_columns
+from ._refine import get_refined_points, read_metric
+from ._resources import get_resources
+from ._scans import get_samples, get_zip_groups, l_reserved_scan_keys
+from ._study_index import StudyIndex
+from .block import Block, BoundBlock
+from .job import StudyJob
+from .scan_space import ScanSpace
+from .skeleton import GenerationSkeleton, l_formatting
+
+# Number of study files bound, written and yielded at once by iter_bind_and_write
+n_jobs_per_chunk = 1000
+
+# Skeletons shipped once to each worker of the process pool
+_dict_worker_skeletons: dict[tuple[str, str, str], GenerationSkeleton] = {}
+
+
+def _initialize_worker(dict_skeletons: dict[tuple[str, str, str], GenerationSkeleton]):
+    """
+    Initializes a worker of the process pool with the compiled skeletons of the study.
+
+    Args:
+        dict_skeletons (dict[tuple[str, str, str], GenerationSkeleton]): The compiled skeletons,
+            indexed by generation, template path and template name.
+    """
+    _dict_worker_skeletons.update(dict_skeletons)
+
+
+def _bind_and_write(
+    key_skeleton: tuple[str, str, str],
+    str_parameters: str,
+    file_path: str,
+    formatting: str = "black",
+) -> str:
+    """
+    Binds the parameters to a skeleton shipped to the worker, and writes the study file.
+
+    Args:
+        key_skeleton (tuple[str, str, str]): The key of the skeleton.
+        str_parameters (str): The string representation of parameters.
+        file_path (str): The path to write the study file.
+        formatting (str, optional): The formatting strategy of the study file. Defaults to "black".
+
+    Returns:
+        str: The hash of the written file.
+    """
+    study_str = _dict_worker_skeletons[key_skeleton].bind_and_format(str_parameters, formatting)
+    study_str_written = StudyGen.write(study_str, file_path, format_with_black=False)
+    return hashlib.sha256(study_str_written.encode()).hexdigest()
 
 
 class StudyGen:
@@ -27,15 +79,38 @@ class StudyGen:
         path_configuration (str): The path to the configuration file.
         path_master (str): The path to the master file.
         dict_ref_blocks (dict[str, Block]): A dictionary of reference Block objects.
+        path_cache (str | None, optional): The path to a directory used to cache merged blocks
+            and compiled templates across runs. Defaults to None, in which case no cache is used.
 
     Attributes:
         configuration (dict[str, Any]): The loaded configuration dictionary.
+        configuration_index (ConfigurationIndex): The flat index of the configuration, used for
+            parameter lookups.
         master (dict[str, Any]): The loaded master dictionary.
         dict_ref_blocks (dict[str, Block]): A dictionary of reference Block objects.
+        block_cache (BlockCache | None): The persistent cache of merged blocks, if any.
+        bytecode_cache (FileSystemBytecodeCache | None): The persistent cache of compiled
+            templates, if any.
         default_template_path (str): The default path to the templates folder.
         default_template_name (str): The default name of the template file.
         set_alert_parameters (set[str]): A set of alerted parameters.
         dic_internal_external_deps (dict[str, str]): A dictionary of internal and external dependencies.
+        dict_skeletons (dict[tuple[str, str, str], GenerationSkeleton]): A dictionary of compiled
+            generation skeletons, indexed by generation, template path and template name.
+        dict_environments (dict[str, Environment]): A dictionary of template environments, indexed
+            by template path.
+        dict_templates (dict[tuple[str, str], Template]): A dictionary of compiled templates,
+            indexed by template path and template name.
+        executor (ProcessPoolExecutor | None): The process pool used to write the scan points, if any.
+        n_workers (int): The number of processes in the process pool.
+        manifest (Manifest | None): The manifest of the generated study files, used to only write
+            the files whose inputs changed since the last generation.
+        formatting (str): The formatting strategy of the study files, among "black", "skeleton"
+            and "none".
+        shard (int): The shard of the study generated by this instance.
+        n_shards (int): The number of shards the study is split into.
+        study_index (StudyIndex | None): The SQLite index of the study files, written during
+            generation.
 
     Methods:
         load_configuration: Loads the configuration file.
@@ -46,15 +121,32 @@ class StudyGen:
         generate_main_block: Generates the main Block object.
         get_parameters: Retrieves the value of a parameter.
         get_parameters_assignation: Generates the string representation of parameter assignments.
+        get_parameters_values: Retrieves the values of the parameters of the main block.
+        compile_gen: Compiles the skeleton of a generation.
+        compile_gen_grouped: Compiles the skeleton of a generation running several points.
         generate_gen: Generates the string representation of a generation.
+        get_template: Retrieves a compiled template.
         render: Renders the study file using a template.
         write: Writes the study file to disk.
+        is_in_shard: Checks if a study file belongs to the current shard.
+        iter_bind_and_write: Binds parameters to a skeleton and writes the study files.
         generate_render_write: Generates, renders, and writes the study file.
         get_dic_parametric_scans: Retrieves dictionaries of parametric scan values.
+        get_scan_space: Retrieves the points of a scan.
+        iter_scans: Creates study files for parametric scans, yielding a record for each of them.
+        iter_parameter_table: Creates a single study file and a parameter table for a scan.
+        get_parameters_shared: Retrieves the parameters shared by several points.
+        iter_grouped_points: Creates one study file per group of points of a scan.
+        write_parameter_table: Writes a parameter table to disk.
         create_scans: Creates study files for parametric scans.
         complete_tree: Completes the study tree dictionary.
+        complete_tree_with_job: Completes the study tree dictionary with a study file record.
         write_tree: Writes the study tree dictionary to a YAML file.
+        merge_tree_shards: Merges the study trees of the shards of a study.
+        merge_index_shards: Merges the indexes of the shards of a study.
+        get_outputs: Retrieves the outputs of a study file.
         create_study_for_current_gen: Creates study files for the current generation.
+        iter_study: Creates the study files, yielding a record for each of them.
         create_study: Creates the study files.
     """
 
@@ -63,14 +155,31 @@ class StudyGen:
         path_configuration: str,
         path_master: str,
         dict_ref_blocks: dict[str, Block],
+        path_cache: str | None = None,
     ):
         self.configuration = self.load_configuration(path_configuration)
+        self.configuration_index = ConfigurationIndex(self.configuration)
         self.master = self.load_master(path_master)
         self.dict_ref_blocks = dict_ref_blocks
+        self.block_cache = None if path_cache is None else BlockCache(path_cache)
+        self.bytecode_cache = None
+        if path_cache is not None:
+            os.makedirs(f"{path_cache}/jinja", exist_ok=True)
+            self.bytecode_cache = FileSystemBytecodeCache(f"{path_cache}/jinja")
         self.default_template_path = f"{os.path.dirname(__file__)}/templates/"
         self.default_template_name = "default.txt"
         self.set_alert_parameters = set()
         self.dic_internal_external_deps = {}
+        self.dict_skeletons = {}
+        self.dict_environments = {}
+        self.dict_templates = {}
+        self.executor = None
+        self.n_workers = 1
+        self.manifest = None
+        self.formatting = "black"
+        self.shard = 0
+        self.n_shards = 1
+        self.study_index = None
 
     def load_configuration(self: Self, path_configuration: str) -> dict[str, Any]:
         """
@@ -187,22 +296,17 @@ class StudyGen:
         Returns:
             Block: The merged Block object.
         """
-        # Update arguments of each block to match the merged block specification
+        # Bind each block to the arguments and outputs of the merged block specification
         l_blocks = []
         for block in new_block["blocks"]:
             true_block = block.split("__")[0] if "__" in block else block
-            block_to_update = copy.deepcopy(dict_blocks[true_block])
-
-            # Get arguments
-            l_args = new_block["blocks"][block]["args"]
-            block_to_update.set_arguments_names(l_args)
-
-            # Get outputs
-            l_outputs = new_block["blocks"][block]["output"]
-            block_to_update.set_outputs_names(l_outputs)
-
-            # Add to updated list of blocks
-            l_blocks.append(block_to_update)
+            l_blocks.append(
+                BoundBlock(
+                    dict_blocks[true_block],
+                    l_arguments_names=new_block["blocks"][block]["args"],
+                    l_outputs_names=new_block["blocks"][block]["output"],
+                )
+            )
 
         # Get the dict of final output (with undefined type for now)
         if "output" in new_block:
@@ -231,7 +335,20 @@ class StudyGen:
         if name_merged_function is None:
             name_merged_function = f"{new_block_name}_function"
 
-        return merge.merge_blocks(
+        # Load the merged block from the persistent cache if possible
+        if self.block_cache is not None:
+            key = BlockCache.get_key(
+                new_block_name,
+                l_blocks,
+                name_merged_function,
+                docstring=new_block["docstring"],
+                dict_output=dict_outputs_final,  # type: ignore
+            )
+            merged_block = self.block_cache.load(key)
+            if merged_block is not None:
+                return merged_block
+
+        merged_block = merge.merge_blocks(
             new_block_name,
             l_blocks,
             name_merged_function,
@@ -239,6 +356,11 @@ class StudyGen:
             dict_output=dict_outputs_final,  # type: ignore
         )
 
+        if self.block_cache is not None:
+            self.block_cache.dump(key, merged_block)  # type: ignore
+
+        return merged_block
+
     def incorporate_merged_blocks(
         self: Self, new_blocks: OrderedDict[str, Any], dict_blocks: OrderedDict[str, Block]
     ) -> OrderedDict[str, Block]:
@@ -360,16 +482,7 @@ class StudyGen:
             ValueError: If the parameter is not defined in the configuration or the mutated parameters.
         """
 
-        def _finditem(obj, key):
-            if key in obj:
-                return obj[key]
-            for k, v in obj.items():
-                if isinstance(v, dict):
-                    item = _finditem(v, key)
-                    if item is not None:
-                        return item
-
-        value = _finditem(self.configuration, param)
+        value = self.configuration_index.get_value(param)
         if value is None:
             if param not in dic_mutated_parameters:
                 raise ValueError(
@@ -386,19 +499,18 @@ class StudyGen:
                     )
                     self.set_alert_parameters.add(param)
                 value = dic_mutated_parameters[param]
+            elif self.configuration_index.is_ambiguous(param):
+                if param not in self.set_alert_parameters:
+                    print(
+                        f"Parameter {param} is defined several times in the configuration. The"
+                        f" value from {'/'.join(self.configuration_index.get_keys(param))} will be"  # type: ignore
+                        " used."
+                    )
+                    self.set_alert_parameters.add(param)
 
         # Handle external/internal dependencies
-        if (
-            isinstance(value, dict)
-            and ("external_dependency" in value or "internal_dependency" in value)
-            and directory_path_gen is not None
-        ):
-            dep = None
-            if "external_dependency" in value:
-                dep = "external_dependency"
-            elif "internal_dependency" in value:
-                dep = "internal_dependency"
-
+        dep = ConfigurationIndex.get_dependency_kind(value)
+        if dep is not None and directory_path_gen is not None:
             # Get the actual path value
             value = value["value"]
 
@@ -424,8 +536,8 @@ class StudyGen:
                         " path computation of the parameter."
                     )
                 if isinstance(value, dict):
-                    for key, val in value.items():
-                        value[key] = "../" * number_of_gen_above + val
+                    # Don't modify the configuration in place
+                    value = {key: "../" * number_of_gen_above + val for key, val in value.items()}
                 else:
                     # Adapt path to the current generation
                     value = "../" * number_of_gen_above + value
@@ -438,7 +550,7 @@ class StudyGen:
 
     def get_parameters_assignation(
         self: Self,
-        main_block: Block,
+        main_block: Block | list[str],
         directory_path_gen: str,
         dic_mutated_parameters: dict[str, Any] = {},
     ) -> str:  # sourcery skip: default-mutable-arg
@@ -446,7 +558,7 @@ class StudyGen:
         Generates the string representation of parameter assignments.
 
         Args:
-            main_block (Block): The main Block object.
+            main_block (Block | list[str]): The main Block object, or the names of its parameters.
             directory_path_gen (str): The directory path of the current generation.
             dic_mutated_parameters (dict[str, Any], optional): The dictionary of mutated parameters. Defaults to {}.
 
@@ -454,13 +566,194 @@ class StudyGen:
             str: The string representation of parameter assignments.
         """
         str_parameters = "# Declare parameters\n"
-        for param in main_block.dict_parameters:
-            # Look recursively for the corresponding parameter value in the configuration
-            value = self.get_parameters(param, directory_path_gen, dic_mutated_parameters)
+        for param, value in self.get_parameters_values(
+            main_block, directory_path_gen, dic_mutated_parameters
+        ).items():
             str_parameters += f"{param} = {value}\n"
 
         return str_parameters
 
+    def get_parameters_values(
+        self: Self,
+        main_block: Block | list[str],
+        directory_path_gen: str,
+        dic_mutated_parameters: dict[str, Any] = {},
+    ) -> dict[str, Any]:  # sourcery skip: default-mutable-arg
+        """
+        Retrieves the values of the parameters of the main block.
+
+        Args:
+            main_block (Block | list[str]): The main Block object, or the names of its parameters.
+            directory_path_gen (str): The directory path of the current generation.
+            dic_mutated_parameters (dict[str, Any], optional): The dictionary of mutated parameters. Defaults to {}.
+
+        Returns:
+            dict[str, Any]: The value of each parameter, as assigned in the study file.
+        """
+        if isinstance(main_block, Block):
+            l_parameters = main_block.get_dict_parameters_names()
+        else:
+            l_parameters = main_block
+
+        # Look recursively for the corresponding parameter values in the configuration
+        return {
+            param: self.get_parameters(param, directory_path_gen, dic_mutated_parameters)
+            for param in l_parameters
+        }
+
+    def compile_gen(
+        self: Self,
+        gen: str,
+        template_name: str | None = None,
+        template_path: str | None = None,
+    ) -> GenerationSkeleton:
+        """
+        Compiles the skeleton of a generation, i.e. everything but the parameters section.
+
+        The skeleton is only built once per generation and template, and then cached, such that
+        scan points only need to bind their own parameters.
+
+        Args:
+            gen (str): The generation name.
+            template_name (str | None, optional): The name of the template file. Defaults to None,
+                in which case the template is not rendered.
+            template_path (str | None, optional): The path to the template folder. Defaults to
+                None, in which case the default template path is used.
+
+        Returns:
+            GenerationSkeleton: The compiled skeleton of the generation.
+        """
+        if template_path is None:
+            template_path = self.default_template_path
+
+        # Return cached skeleton if possible
+        key = (gen, template_path, template_name)
+        if key in self.dict_skeletons:
+            return self.dict_skeletons[key]
+
+        # The fixed sections don't depend on the template
+        if (gen, None, None) in self.dict_skeletons:
+            skeleton_sections = self.dict_skeletons[(gen, None, None)]
+        else:
+            # Get dictionnary of blocks for writing the methods
+            dict_blocks = self.get_dict_blocks(gen)
+
+            # Get dictionnary of imports
+            dict_imports_merge = merge.merge_imports(list(dict_blocks.values()))
+
+            # Get string imports
+            str_imports = Block.get_external_l_imports_str(dict_imports_merge)
+
+            # Incorporate merged blocks if needed
+            if "new_blocks" in self.master[gen]:
+                dict_blocks = self.incorporate_merged_blocks(
+                    self.master[gen]["new_blocks"], dict_blocks
+                )
+
+            # Add main as ultimate block
+            main_block = self.generate_main_block(gen, dict_blocks)
+
+            # Get main block string
+            str_main = main_block.get_str()
+
+            # Get main call (use parameters as arguments, since parameters are built from arguments in this case)
+            str_main_call = main_block.get_call_str(
+                l_external_arguments=main_block.get_dict_parameters_names()
+            )
+
+            # Get corresponding block string
+            str_blocks = "\n".join([block.get_str() for block in dict_blocks.values()])
+
+            skeleton_sections = GenerationSkeleton(
+                gen,
+                main_block.get_dict_parameters_names(),
+                str_imports,
+                str_blocks,
+                str_main,
+                str_main_call,
+            )
+            self.dict_skeletons[(gen, None, None)] = skeleton_sections
+
+        if template_name is None:
+            return skeleton_sections
+
+        # Render the template once, with a placeholder for the parameters
+        study_str = self.render(
+            skeleton_sections.str_imports,
+            GenerationSkeleton.parameters_placeholder,
+            skeleton_sections.str_blocks,
+            skeleton_sections.str_main,
+            skeleton_sections.str_main_call,
+            template_path=template_path,
+            template_name=template_name,
+        )
+        skeleton = GenerationSkeleton(
+            gen,
+            skeleton_sections.l_parameters,
+            *skeleton_sections.get_sections(),
+            l_template_parts=study_str.split(GenerationSkeleton.parameters_placeholder),
+        )
+        self.dict_skeletons[key] = skeleton
+
+        return skeleton
+
+    def compile_gen_grouped(
+        self: Self,
+        gen: str,
+        template_name: str,
+        template_path: str,
+        l_parameters_point: list[str],
+    ) -> GenerationSkeleton:
+        """
+        Compiles the skeleton of a generation running several points in a single process. The
+        parameters section of the study file must define path_folder, the folder of the study
+        file, and l_points, the list of points to run, each with its folder (relative to
+        path_folder) and the values of the parameters which differ between points.
+
+        Args:
+            gen (str): The generation name.
+            template_name (str): The name of the template file.
+            template_path (str): The path to the template folder.
+            l_parameters_point (list[str]): The parameters which differ between points.
+
+        Returns:
+            GenerationSkeleton: The compiled skeleton of the generation.
+        """
+        skeleton_sections = self.compile_gen(gen)
+
+        # Call main for each point, in its own folder
+        name_main = skeleton_sections.str_main_call.split("(")[0]
+        l_arguments = [
+            f'point["{param}"]' if param in l_parameters_point else param
+            for param in skeleton_sections.l_parameters
+        ]
+        str_main_call = (
+            "for point in l_points:\n"
+            '        os.makedirs(os.path.join(path_folder, point["directory"]), exist_ok=True)\n'
+            '        os.chdir(os.path.join(path_folder, point["directory"]))\n'
+            f"        {name_main}({', '.join(l_arguments)})"
+        )
+
+        # Render the template once, with a placeholder for the parameters
+        study_str = self.render(
+            skeleton_sections.str_imports,
+            GenerationSkeleton.parameters_placeholder,
+            skeleton_sections.str_blocks,
+            skeleton_sections.str_main,
+            str_main_call,
+            template_path=template_path,
+            template_name=template_name,
+        )
+        return GenerationSkeleton(
+            gen,
+            skeleton_sections.l_parameters,
+            skeleton_sections.str_imports,
+            skeleton_sections.str_blocks,
+            skeleton_sections.str_main,
+            str_main_call,
+            l_template_parts=study_str.split(GenerationSkeleton.parameters_placeholder),
+        )
+
     def generate_gen(
         self: Self, gen: str, directory_path_gen: str, dic_mutated_parameters: dict[str, Any] = {}
     ) -> tuple[str, str, str, str, str]:  # sourcery skip: default-mutable-arg
@@ -475,44 +768,44 @@ class StudyGen:
         Returns:
             tuple[str, str, str, str, str]: The string representations of imports, parameters, blocks, main, and main call.
         """
-        # Get dictionnary of blocks for writing the methods
-        dict_blocks = self.get_dict_blocks(gen)
-
-        # Get dictionnary of imports
-        dict_imports_merge = merge.merge_imports(list(dict_blocks.values()))
-
-        # Get string imports
-        str_imports = Block.get_external_l_imports_str(dict_imports_merge)
-
-        # Incorporate merged blocks if needed
-        if "new_blocks" in self.master[gen]:
-            dict_blocks = self.incorporate_merged_blocks(
-                self.master[gen]["new_blocks"], dict_blocks
-            )
-
-        # Add main as ultimate block
-        main_block = self.generate_main_block(gen, dict_blocks)
+        # Get the fixed sections of the generation
+        skeleton = self.compile_gen(gen)
 
         # Declare parameters
         str_parameters = self.get_parameters_assignation(
-            main_block, directory_path_gen, dic_mutated_parameters
+            skeleton.l_parameters, directory_path_gen, dic_mutated_parameters
         )
 
-        # Get main block string
-        str_main = main_block.get_str()
-
-        # Get main call (use parameters as arguments, since parameters are built from arguments in this case)
-        str_main_call = main_block.get_call_str(
-            l_external_arguments=main_block.get_dict_parameters_names()
+        return (
+            skeleton.str_imports,
+            str_parameters,
+            skeleton.str_blocks,
+            skeleton.str_main,
+            skeleton.str_main_call,
         )
 
-        # Get the dictionnary of block strings
-        dict_blocks_str = {k: v.get_str() for k, v in dict_blocks.items()}
+    def get_template(self: Self, template_path: str, template_name: str) -> Template:
+        """
+        Retrieves a compiled template. Templates are only loaded and compiled once, and the template
+        environment is shared by all the templates of a given folder.
 
-        # Get corresponding block string
-        str_blocks = "\n".join([f"{k}" for k in dict_blocks_str.values()])
+        Args:
+            template_path (str): The path to the template folder.
+            template_name (str): The name of the template file.
 
-        return str_imports, str_parameters, str_blocks, str_main, str_main_call
+        Returns:
+            Template: The compiled template.
+        """
+        key = (template_path, template_name)
+        if key not in self.dict_templates:
+            if template_path not in self.dict_environments:
+                self.dict_environments[template_path] = Environment(
+                    loader=FileSystemLoader(template_path), bytecode_cache=self.bytecode_cache
+                )
+            self.dict_templates[key] = self.dict_environments[template_path].get_template(
+                template_name
+            )
+        return self.dict_templates[key]
 
     def render(
         self: Self,
@@ -540,8 +833,7 @@ class StudyGen:
             str: The rendered study file.
         """
         # Generate generations from template
-        environment = Environment(loader=FileSystemLoader(template_path))
-        template = environment.get_template(template_name)
+        template = self.get_template(template_path, template_name)
 
         return template.render(
             imports=str_imports,
@@ -551,7 +843,8 @@ class StudyGen:
             main_call=str_main_call,
         )
 
-    def write(self: Self, study_str: str, file_path: str, format_with_black: bool = True):
+    @staticmethod
+    def write(study_str: str, file_path: str, format_with_black: bool = True) -> str:
         """
         Writes the study file to disk.
 
@@ -559,6 +852,9 @@ class StudyGen:
             study_str (str): The study file string.
             file_path (str): The path to write the study file.
             format_with_black (bool, optional): Whether to format the study file with black. Defaults to True.
+
+        Returns:
+            str: The study file string, as written to disk.
         """
         if format_with_black:
             study_str = format_str(study_str, mode=FileMode())
@@ -571,6 +867,121 @@ class StudyGen:
         with open(file_path, mode="w", encoding="utf-8") as file:
             file.write(study_str)
 
+        return study_str
+
+    def is_in_shard(self: Self, file_path: str) -> bool:
+        """
+        Checks if a study file belongs to the shard of the study being generated. Study files are
+        assigned to shards from a hash of their path, such that the assignment is deterministic
+        and doesn't depend on the other files of the study.
+
+        Args:
+            file_path (str): The path of the study file.
+
+        Returns:
+            bool: True if the study file must be written by the current shard.
+        """
+        return self.n_shards == 1 or zlib.crc32(file_path.encode()) % self.n_shards == self.shard
+
+    def iter_bind_and_write(
+        self: Self,
+        skeleton: GenerationSkeleton,
+        l_jobs: list[tuple[StudyJob, str]],
+        template_name: str,
+        template_path: str,
+        with_str: bool = True,
+        with_hash: bool = False,
+        parallel: bool = True,
+    ) -> Iterator[StudyJob]:
+        """
+        Binds parameters to a compiled skeleton and writes the corresponding study files.
+
+        If a process pool is available, the files are formatted and written in parallel. If a
+        manifest is available, the files whose inputs did not change since the last generation are
+        not written again. If the study is sharded, only the files of the current shard are bound
+        and written. The jobs are processed by chunks, and always yielded in the order in which
+        they were provided, each job as soon as its file is written.
+
+        Args:
+            skeleton (GenerationSkeleton): The compiled skeleton of the generation.
+            l_jobs (list[tuple[StudyJob, str]]): The jobs to write, along with the string
+                representation of their parameters.
+            template_name (str): The name of the template file.
+            template_path (str): The path to the template folder.
+            with_str (bool, optional): Whether to retain the study file strings in the jobs. Defaults to True.
+            with_hash (bool, optional): Whether to compute the hash of the study files. Defaults to False.
+            parallel (bool, optional): Whether to use the process pool, if available. Skeletons which
+                were not compiled before the creation of the pool must be written serially.
+                Defaults to True.
+
+        Yields:
+            StudyJob: The record of each written study file.
+        """
+        # Check, write and yield the jobs by chunks, such that the study files of a generation are
+        # never all held in memory
+        for idx_chunk in range(0, len(l_jobs), n_jobs_per_chunk):
+            l_jobs_chunk = l_jobs[idx_chunk : idx_chunk + n_jobs_per_chunk]
+
+            # Skip the files whose inputs did not change since the last run. The inputs are hashed
+            # from the skeleton and the parameters, and files are only bound here if their string
+            # is retained.
+            l_jobs_stale = []
+            for job, str_parameters in l_jobs_chunk:
+                if not self.is_in_shard(job.file):
+                    continue
+                if with_str:
+                    job.study_str = skeleton.bind(str_parameters)
+                input_hash = None
+                if self.manifest is not None:
+                    input_hash = self.manifest.get_hash(
+                        f"{skeleton.get_hash()}\n{self.formatting}\n{str_parameters}"
+                    )
+                    if self.manifest.is_up_to_date(job.file, input_hash):
+                        if with_hash:
+                            job.hash = self.manifest.get_output_hash(job.file)
+                        continue
+                l_jobs_stale.append((job, str_parameters, input_hash))
+
+            # Write the remaining files, serially (from the retained strings if any) or in
+            # parallel, in which case only the parameters are sent to the workers
+            if self.executor is None or not parallel:
+                iter_output_hashes = (
+                    hashlib.sha256(
+                        self.write(
+                            skeleton.bind_and_format(
+                                str_parameters, self.formatting, job.study_str
+                            ),
+                            job.file,
+                            format_with_black=False,
+                        ).encode()
+                    ).hexdigest()
+                    for job, str_parameters, _ in l_jobs_stale
+                )
+            else:
+                key_skeleton = (skeleton.gen, template_path, template_name)
+                chunksize = max(1, len(l_jobs_stale) // (4 * self.n_workers))
+                iter_output_hashes = self.executor.map(
+                    _bind_and_write,
+                    itertools.repeat(key_skeleton, len(l_jobs_stale)),
+                    [str_parameters for _, str_parameters, _ in l_jobs_stale],
+                    [job.file for job, _, _ in l_jobs_stale],
+                    itertools.repeat(self.formatting, len(l_jobs_stale)),
+                    chunksize=chunksize,
+                )
+
+            # Record and yield each job in order, as soon as its file is written
+            iter_jobs_stale = iter(l_jobs_stale)
+            job_stale = next(iter_jobs_stale, None)
+            for job, _ in l_jobs_chunk:
+                if job_stale is not None and job is job_stale[0]:
+                    output_hash = next(iter_output_hashes)
+                    if self.manifest is not None:
+                        self.manifest.record(job.file, job_stale[2], output_hash)
+                    if with_hash:
+                        job.hash = output_hash
+                    job_stale = next(iter_jobs_stale, None)
+                yield job
+
     def generate_render_write(
         self: Self,
         gen_name: str,
@@ -599,23 +1010,12 @@ class StudyGen:
             directory_path_gen += "/"
         file_path_gen = f"{directory_path_gen}{gen_name}.py"
 
-        # Generate render write for current generation
-        (
-            str_imports,
-            str_parameters,
-            str_blocks,
-            str_main,
-            str_main_call,
-        ) = self.generate_gen(gen_name, directory_path_gen, dic_mutated_parameters)
-        study_str = self.render(
-            str_imports,
-            str_parameters,
-            str_blocks,
-            str_main,
-            str_main_call,
-            template_name=template_name,
-            template_path=template_path,
+        # Bind the parameters of the current generation to its compiled skeleton
+        skeleton = self.compile_gen(gen_name, template_name, template_path)
+        str_parameters = self.get_parameters_assignation(
+            skeleton.l_parameters, directory_path_gen, dic_mutated_parameters
         )
+        study_str = skeleton.bind(str_parameters)
 
         self.write(study_str, file_path_gen)
         return study_str, [directory_path_gen]
@@ -638,14 +1038,16 @@ class StudyGen:
 
         def convert_variables_to_values(l_values: list) -> list:
             for idx, param in enumerate(l_values):
-                with contextlib.suppress(ValueError):
-                    l_values[idx] = self.get_parameters(param)
+                if isinstance(param, str) and param in self.configuration_index:
+                    l_values[idx] = self.configuration_index.get_value(param)
             return l_values
 
         dic_parameter_lists = {}
         dic_parameter_lists_for_naming = {}
         for parameter in self.master["structure"][layer]["scans"]:
-            if "linspace" in self.master["structure"][layer]["scans"][parameter]:
+            if parameter in l_reserved_scan_keys:
+                continue
+            elif "linspace" in self.master["structure"][layer]["scans"][parameter]:
                 l_values_linspace = self.master["structure"][layer]["scans"][parameter]["linspace"]
                 l_values_linspace = convert_variables_to_values(l_values_linspace)
                 parameter_list = np.round(
@@ -695,8 +1097,419 @@ class StudyGen:
             )
             dic_parameter_lists[parameter] = parameter_list_updated
 
+        # Explicit points are scanned as zipped lists
+        l_points = self.master["structure"][layer]["scans"].get("points", [])
+        if len(l_points) > 0:
+            if any(set(point) != set(l_points[0]) for point in l_points):
+                raise ValueError(
+                    "All the explicit points of a scan must define the same parameters."
+                )
+            for parameter in l_points[0]:
+                if parameter in dic_parameter_lists:
+                    raise ValueError(
+                        f"Parameter {parameter} is scanned both individually and in explicit points."
+                    )
+                parameter_list = convert_variables_to_values(
+                    [point[parameter] for point in l_points]
+                )
+                dic_parameter_lists[parameter] = parameter_list
+                dic_parameter_lists_for_naming[parameter] = parameter_list
+
+        # Sampled points are also scanned as zipped lists
+        if "sampling" in self.master["structure"][layer]["scans"]:
+            dic_sampling = dict(self.master["structure"][layer]["scans"]["sampling"])
+            dic_sampling["parameters"] = {
+                parameter: convert_variables_to_values(list(l_bounds))
+                for parameter, l_bounds in dic_sampling["parameters"].items()
+            }
+            for parameter, parameter_list in get_samples(dic_sampling).items():
+                if parameter in dic_parameter_lists:
+                    raise ValueError(
+                        f"Parameter {parameter} is scanned both individually and in a sampling."
+                    )
+                dic_parameter_lists[parameter] = parameter_list
+                dic_parameter_lists_for_naming[parameter] = parameter_list
+
         return dic_parameter_lists, dic_parameter_lists_for_naming
 
+    def get_scan_space(self: Self, layer: str, layer_path: str | None = None) -> ScanSpace:
+        """
+        Retrieves the points of a scan. By default, the points are the cartesian product of all
+        the scanned parameters. Parameters listed together under the "zip" key (and the parameters
+        of the explicit "points" and of the "sampling") are scanned jointly instead, and the points
+        which don't satisfy the expressions under the "filter" key are skipped. Filters are
+        evaluated with NumPy, on the scanned values as they appear in the folder names.
+
+        If the scan has a "refine" key, the points are then refined around the regions of interest,
+        using a metric read from the outputs of the points which already ran.
+
+        Args:
+            layer (str): The layer name.
+            layer_path (str | None, optional): The path to the layer folder, required to read
+                the metric of refined scans. Defaults to None.
+
+        Returns:
+            ScanSpace: The points of the scan, addressable by index.
+        """
+        dic_scans = self.master["structure"][layer]["scans"]
+        dic_parameter_lists, dic_parameter_lists_for_naming = self.get_dic_parametric_scans(layer)
+        scan_space = ScanSpace(
+            dic_parameter_lists,
+            dic_parameter_lists_for_naming,
+            get_zip_groups(dic_scans),
+            dic_scans.get("filter"),
+        )
+
+        if "refine" not in dic_scans:
+            return scan_space
+        if layer_path is None:
+            raise ValueError("The path to the layer folder is required to refine a scan.")
+        dic_refine = dic_scans["refine"]
+
+        # By default, refine along all the numerical parameters which are not zipped
+        l_parameters = dic_refine.get(
+            "parameters",
+            [
+                axis[0]
+                for axis in scan_space.l_axes
+                if len(axis) == 1
+                and all(
+                    isinstance(value, (int, float, np.number)) and not isinstance(value, bool)
+                    for value in dic_parameter_lists_for_naming[axis[0]]
+                )
+            ],
+        )
+        l_points_refined = get_refined_points(
+            [point for _, point in scan_space],
+            l_parameters,
+            lambda point: read_metric(
+                ScanSpace.get_point_path(layer_path, point),
+                dic_refine["file"],
+                dic_refine.get("column"),
+                dic_refine.get("reduce", "mean"),
+            ),
+            gradient_quantile=dic_refine.get("gradient_quantile"),
+            threshold=dic_refine.get("threshold"),
+            max_depth=dic_refine.get("max_depth", 1),
+        )
+
+        # Get back the values of the parameters from their naming values
+        dic_values = {
+            parameter: dict(
+                zip(dic_parameter_lists_for_naming[parameter], dic_parameter_lists[parameter])
+            )
+            for parameter in dic_parameter_lists
+        }
+        l_points_extra = []
+        for point in l_points_refined:
+            dic_mutated_parameters = {}
+            for parameter, value in point.items():
+                if value in dic_values[parameter]:
+                    dic_mutated_parameters[parameter] = dic_values[parameter][value]
+                elif dic_scans.get(parameter, {}).get("for_each_beam", False):
+                    dic_mutated_parameters[parameter] = {"lhcb1": value, "lhcb2": value}
+                else:
+                    dic_mutated_parameters[parameter] = value
+            l_points_extra.append((dic_mutated_parameters, point))
+        scan_space.extend(l_points_extra)
+
+        return scan_space
+
+    def iter_scans(
+        self: Self,
+        gen: str,
+        layer: str,
+        layer_path: str,
+        template_name: str,
+        template_path: str,
+        with_str: bool = True,
+        with_hash: bool = False,
+    ) -> Iterator[StudyJob]:
+        """
+        Creates study files for parametric scans, yielding a record for each of them.
+
+        Args:
+            gen (str): The generation name.
+            layer (str): The layer name.
+            layer_path (str): The path to the layer folder.
+            template_name (str): The name of the template file.
+            template_path (str): The path to the template folder.
+            with_str (bool, optional): Whether to retain the study file strings in the jobs. Defaults to True.
+            with_hash (bool, optional): Whether to compute the hash of the study files. Defaults to False.
+
+        Yields:
+            StudyJob: The record of each written study file.
+        """
+        # Get the points of the scan
+        scan_space = self.get_scan_space(layer, layer_path)
+
+        # Get compiled skeleton of the generation
+        skeleton = self.compile_gen(gen, template_name, template_path)
+
+        # Bind parameters for all the points of the scan
+        parameter_table = self.master["structure"][layer].get("parameter_table", False)
+        points_per_job = self.master["structure"][layer].get("points_per_job", 1)
+        l_jobs = []
+        for dic_mutated_parameters, dic_mutated_parameters_for_naming in scan_space:
+            path = scan_space.get_point_path(layer_path, dic_mutated_parameters_for_naming)
+            job = StudyJob(f"{path}{gen}.py", path, gen, layer, dic_mutated_parameters)
+            if parameter_table or points_per_job > 1:
+                dict_values = self.get_parameters_values(
+                    skeleton.l_parameters, path, dic_mutated_parameters
+                )
+                l_jobs.append((job, dict_values))
+            else:
+                str_parameters = self.get_parameters_assignation(
+                    skeleton.l_parameters, path, dic_mutated_parameters
+                )
+                l_jobs.append((job, str_parameters))
+
+        # Render and write a single study file and its parameter table
+        if parameter_table:
+            yield from self.iter_parameter_table(
+                skeleton,
+                l_jobs,
+                layer_path,
+                template_name,
+                template_path,
+                with_str,
+                with_hash,
+                points_per_job,
+            )
+            return
+
+        # Render and write one study file per group of points
+        if points_per_job > 1:
+            yield from self.iter_grouped_points(
+                skeleton,
+                l_jobs,
+                layer_path,
+                template_name,
+                template_path,
+                with_str,
+                with_hash,
+                points_per_job,
+            )
+            return
+
+        # Render and write all scan points
+        yield from self.iter_bind_and_write(
+            skeleton, l_jobs, template_name, template_path, with_str, with_hash
+        )
+
+    def iter_parameter_table(
+        self: Self,
+        skeleton: GenerationSkeleton,
+        l_points: list[tuple[StudyJob, dict[str, Any]]],
+        layer_path: str,
+        template_name: str,
+        template_path: str,
+        with_str: bool = True,
+        with_hash: bool = False,
+        points_per_job: int = 1,
+    ) -> Iterator[StudyJob]:
+        """
+        Writes a single study file for all the points of a scan, along with a parameter table
+        containing the parameters which differ between points. The study file selects its row in
+        the table from the index of the job, and runs in the folder of the corresponding point.
+        If several points are run per job, the study file runs the consecutive rows
+        [points_per_job * index, points_per_job * (index + 1)) instead.
+
+        Args:
+            skeleton (GenerationSkeleton): The compiled skeleton of the generation.
+            l_points (list[tuple[StudyJob, dict[str, Any]]]): The jobs of the scan points, along
+                with the values of their parameters.
+            layer_path (str): The path to the layer folder, where the study file is written.
+            template_name (str): The name of the template file.
+            template_path (str): The path to the template folder.
+            with_str (bool, optional): Whether to retain the study file strings in the jobs. Defaults to True.
+            with_hash (bool, optional): Whether to compute the hash of the study files. Defaults to False.
+            points_per_job (int, optional): The number of points run per job. Defaults to 1.
+
+        Yields:
+            StudyJob: The record of each scan point, pointing to the shared study file.
+
+        Raises:
+            ValueError: If a scanned parameter uses a reserved column name of the parameter table.
+        """
+        if not l_points:
+            return
+        gen = skeleton.gen
+        file_path = f"{layer_path}{gen}.py"
+        table_name = f"{gen}_parameters.jsonl"
+
+        # Only the parameters which differ between points are stored in the table
+        l_parameters_table, str_parameters = self.get_parameters_shared(
+            skeleton.l_parameters, [dict_values for _, dict_values in l_points]
+        )
+        for param in l_parameters_table:
+            if param in l_reserved_columns:
+                raise ValueError(
+                    f"Parameter {param} can't be scanned with a parameter table, as {param} is a"
+                    " reserved column name."
+                )
+        if points_per_job > 1:
+            skeleton = self.compile_gen_grouped(
+                gen, template_name, template_path, l_parameters_table
+            )
+            str_parameters += get_selection_str(table_name, l_parameters_table, points_per_job)
+        else:
+            str_parameters += get_selection_str(table_name, l_parameters_table)
+
+        # Build the parameter table, with one row per point
+        l_rows = []
+        for idx, (job, dict_values) in enumerate(l_points):
+            row = {"index": idx, "directory": job.directory[len(layer_path) : -1]}
+            for param in l_parameters_table:
+                row[param] = get_table_value(param, dict_values[param])
+            l_rows.append(row)
+            job.file = file_path
+            job.index = idx
+        if self.is_in_shard(file_path):
+            self.write_parameter_table(l_rows, f"{layer_path}{table_name}")
+
+        # Write the study file once for all points
+        job_file = StudyJob(file_path, layer_path, gen, l_points[0][0].layer)
+        for job_file in self.iter_bind_and_write(
+            skeleton,
+            [(job_file, str_parameters)],
+            template_name,
+            template_path,
+            with_str,
+            with_hash,
+            parallel=False,
+        ):
+            pass
+        for job, _ in l_points:
+            job.hash = job_file.hash
+            job.study_str = job_file.study_str
+            yield job
+
+    def get_parameters_shared(
+        self: Self, l_parameters: list[str], l_dict_values: list[dict[str, Any]]
+    ) -> tuple[list[str], str]:
+        """
+        Retrieves the parameters which differ between several points, and the assignation of the
+        parameters shared by all the points.
+
+        Args:
+            l_parameters (list[str]): The names of the parameters.
+            l_dict_values (list[dict[str, Any]]): The values of the parameters at each point.
+
+        Returns:
+            tuple[list[str], str]: The parameters which differ between points, and the string
+                representation of the assignments of the other parameters.
+        """
+        l_parameters_point = [
+            param
+            for param in l_parameters
+            if any(
+                str(dict_values[param]) != str(l_dict_values[0][param])
+                for dict_values in l_dict_values
+            )
+        ]
+        str_parameters = "# Declare parameters\n"
+        for param in l_parameters:
+            if param not in l_parameters_point:
+                str_parameters += f"{param} = {l_dict_values[0][param]}\n"
+
+        return l_parameters_point, str_parameters
+
+    def iter_grouped_points(
+        self: Self,
+        skeleton: GenerationSkeleton,
+        l_points: list[tuple[StudyJob, dict[str, Any]]],
+        layer_path: str,
+        template_name: str,
+        template_path: str,
+        with_str: bool = True,
+        with_hash: bool = False,
+        points_per_job: int = 1,
+    ) -> Iterator[StudyJob]:
+        """
+        Writes one study file per group of consecutive points of a scan. Each study file runs its
+        points one after the other in a single process, each in its own folder, such that the
+        imports and the interpreter startup are shared.
+
+        Args:
+            skeleton (GenerationSkeleton): The compiled skeleton of the generation.
+            l_points (list[tuple[StudyJob, dict[str, Any]]]): The jobs of the scan points, along
+                with the values of their parameters.
+            layer_path (str): The path to the layer folder, where the study files are written.
+            template_name (str): The name of the template file.
+            template_path (str): The path to the template folder.
+            with_str (bool, optional): Whether to retain the study file strings in the jobs. Defaults to True.
+            with_hash (bool, optional): Whether to compute the hash of the study files. Defaults to False.
+            points_per_job (int, optional): The number of points run per study file. Defaults to 1.
+
+        Yields:
+            StudyJob: The record of each scan point, pointing to the study file of its group.
+        """
+        if not l_points:
+            return
+        gen = skeleton.gen
+        l_parameters_point, str_parameters_shared = self.get_parameters_shared(
+            skeleton.l_parameters, [dict_values for _, dict_values in l_points]
+        )
+        skeleton = self.compile_gen_grouped(gen, template_name, template_path, l_parameters_point)
+
+        # Declare the points of each group in its study file
+        n_jobs = -(-len(l_points) // points_per_job)
+        l_jobs_file = []
+        for idx_job in range(n_jobs):
+            l_points_job = l_points[points_per_job * idx_job : points_per_job * (idx_job + 1)]
+            str_parameters = (
+                f"{str_parameters_shared}\n"
+                "# Declare the points of the job\n"
+                "import os\n\n"
+                "path_folder = os.path.dirname(os.path.abspath(__file__))\n"
+                "l_points = [\n"
+            )
+            for job, dict_values in l_points_job:
+                l_items = [f'"directory": "{job.directory[len(layer_path) : -1]}"'] + [
+                    f'"{param}": {dict_values[param]}' for param in l_parameters_point
+                ]
+                str_parameters += f"    {{{', '.join(l_items)}}},\n"
+            str_parameters += "]\n"
+            file_path = f"{layer_path}{gen}_{idx_job:0{len(str(n_jobs - 1))}d}.py"
+            l_jobs_file.append(
+                (StudyJob(file_path, layer_path, gen, l_points_job[0][0].layer), str_parameters)
+            )
+
+        # Write the study files, which are not known by the workers
+        for idx_job, job_file in enumerate(
+            self.iter_bind_and_write(
+                skeleton,
+                l_jobs_file,
+                template_name,
+                template_path,
+                with_str,
+                with_hash,
+                parallel=False,
+            )
+        ):
+            for job, _ in l_points[points_per_job * idx_job : points_per_job * (idx_job + 1)]:
+                job.file = job_file.file
+                job.hash = job_file.hash
+                job.study_str = job_file.study_str
+                yield job
+
+    def write_parameter_table(self: Self, l_rows: list[dict[str, Any]], file_path: str):
+        """
+        Writes a parameter table to disk, as JSON lines, unless it is up to date in the manifest.
+
+        Args:
+            l_rows (list[dict[str, Any]]): The rows of the parameter table.
+            file_path (str): The path to write the parameter table.
+        """
+        table_str = get_table_str(l_rows)
+        table_hash = Manifest.get_hash(table_str)
+        if self.manifest is not None and self.manifest.is_up_to_date(file_path, table_hash):
+            return
+        self.write(table_str, file_path, format_with_black=False)
+        if self.manifest is not None:
+            self.manifest.record(file_path, table_hash, table_hash)
+
     def create_scans(
         self: Self,
         gen: str,
@@ -718,41 +1531,8 @@ class StudyGen:
         Returns:
             tuple[list[str], list[str]]: The list of study file strings and the list of study paths.
         """
-        # Get dictionnary of parametric values being scanned
-        dic_parameter_lists, dic_parameter_lists_for_naming = self.get_dic_parametric_scans(layer)
-        # Generate render write for cartesian product of all parameters
-        l_study_str = []
-        l_study_path = []
-        for l_values, l_values_for_naming in zip(
-            itertools.product(*dic_parameter_lists.values()),
-            itertools.product(*dic_parameter_lists_for_naming.values()),
-        ):
-            dic_mutated_parameters = dict(zip(dic_parameter_lists.keys(), l_values))
-            dic_mutated_parameters_for_naming = dict(
-                zip(dic_parameter_lists.keys(), l_values_for_naming)
-            )
-            path = (
-                layer_path
-                + "_".join(
-                    [
-                        f"{parameter}_{value}"
-                        for parameter, value in dic_mutated_parameters_for_naming.items()
-                    ]
-                )
-                + "/"
-            )
-            l_study_path.append(path)
-            l_study_str.append(
-                self.generate_render_write(
-                    gen,
-                    "",
-                    path,
-                    template_name,
-                    template_path,
-                    dic_mutated_parameters=dic_mutated_parameters,
-                )
-            )
-        return l_study_str, l_study_path
+        l_jobs = list(self.iter_scans(gen, layer, layer_path, template_name, template_path))
+        return [job.study_str for job in l_jobs], [job.directory for job in l_jobs]  # type: ignore
 
     def complete_tree(
         self: Self, dictionary_tree: dict, l_study_path_next_layer: list[str], gen: str
@@ -777,95 +1557,392 @@ class StudyGen:
 
         return dictionary_tree
 
-    def write_tree(self: Self, dictionary_tree: dict):
+    def complete_tree_with_job(self: Self, dictionary_tree: dict, job: StudyJob) -> dict:
+        """
+        Completes the tree structure of the study dictionary with a study file record.
+
+        Args:
+            dictionary_tree (dict): The dictionary representing the study tree structure.
+            job (StudyJob): The record of the study file.
+
+        Returns:
+            dict: The updated dictionary representing the study tree structure.
+        """
+        entry = {"file": job.file}
+        if job.index is not None:
+            entry["index"] = job.index
+        nested_set(dictionary_tree, job.directory.split("/")[1:-1] + [job.gen], entry)
+
+        return dictionary_tree
+
+    def write_tree(self: Self, dictionary_tree: dict, tree_name: str = "tree.yaml"):
         """
         Writes the study tree structure to a YAML file.
 
         Args:
             dictionary_tree (dict): The dictionary representing the study tree structure.
+            tree_name (str, optional): The name of the YAML file, in the study folder. Defaults to
+                "tree.yaml".
         """
         ryaml = yaml.YAML()
-        with open(self.master["name"] + "/" + "tree.yaml", "w") as yaml_file:
+        with open(self.master["name"] + "/" + tree_name, "w") as yaml_file:
             ryaml.indent(sequence=4, offset=2)
             ryaml.dump(dictionary_tree, yaml_file)
 
-    def create_study_for_current_gen(
-        self: Self, idx_layer: int, layer: str, gen: str, study_path: str, dictionary_tree: dict
-    ) -> tuple[list[str], list[str]]:
+    def merge_tree_shards(self: Self, n_shards: int) -> dict:
         """
-        Creates study files for the current generation.
+        Merges the study trees written by each shard of a study into the study tree structure,
+        once all the shards have been generated.
+
+        Args:
+            n_shards (int): The number of shards the study was split into.
+
+        Returns:
+            dict: The dictionary representing the study tree structure.
+        """
+        ryaml = yaml.YAML()
+        dictionary_tree = {}
+        for shard in range(n_shards):
+            with open(f"{self.master['name']}/tree_shard_{shard}.yaml", "r") as yaml_file:
+                nested_update(dictionary_tree, ryaml.load(yaml_file) or {})
+        self.write_tree(dictionary_tree)
+
+        return dictionary_tree
+
+    def merge_index_shards(self: Self, n_shards: int):
+        """
+        Merges the indexes written by each shard of a study into the study index, once all the
+        shards have been generated.
+
+        Args:
+            n_shards (int): The number of shards the study was split into.
+        """
+        study_index = StudyIndex(f"{self.master['name']}/index.db")
+        for shard in range(n_shards):
+            study_index.merge(f"{self.master['name']}/index_shard_{shard}.db")
+        study_index.close()
+
+    def get_outputs(self: Self, gen: str, job: StudyJob) -> list[str] | None:
+        """
+        Retrieves the outputs declared for a generation under the "outputs" key, as paths relative
+        to the folder of a job. Outputs are declared as the parameters holding their paths (e.g.
+        path_output_particles), or directly as paths (glob patterns are allowed).
+
+        Args:
+            gen (str): The generation name.
+            job (StudyJob): The record of the study file.
+
+        Returns:
+            list[str] | None: The outputs of the job, or None if the generation declares none.
+        """
+        l_outputs_declared = self.master[gen].get("outputs")
+        if l_outputs_declared is None:
+            return None
+        if isinstance(l_outputs_declared, str):
+            l_outputs_declared = [l_outputs_declared]
+
+        l_outputs = []
+        for output in l_outputs_declared:
+            if (
+                self.configuration_index.get_value(output) is None
+                and output not in job.dic_mutated_parameters
+            ):
+                l_outputs.append(output)
+                continue
+            value = self.get_parameters(output, job.directory, job.dic_mutated_parameters)
+            for path in value.values() if isinstance(value, dict) else [value]:
+                # String values are quoted, as in the study files
+                l_outputs.append(path[1:-1] if path.startswith('"') else path)
+
+        return l_outputs
+
+    def get_template_gen(self: Self, gen: str) -> tuple[str, str]:
+        """
+        Retrieves the template used for a generation.
+
+        Args:
+            gen (str): The generation name.
+
+        Returns:
+            tuple[str, str]: The name of the template file and the path to the template folder.
+        """
+        template_name = self.master[gen].get("template_name", self.default_template_name)
+        template_path = self.master[gen].get("template_path", self.default_template_path)
+        return template_name, template_path
+
+    def iter_study_for_current_gen(
+        self: Self,
+        idx_layer: int,
+        layer: str,
+        gen: str,
+        study_path: str,
+        with_str: bool = True,
+        with_hash: bool = False,
+    ) -> Iterator[StudyJob]:
+        """
+        Creates study files for the current generation, yielding a record for each of them.
 
         Args:
             idx_layer (int): The index of the current layer.
             layer (str): The name of the current layer.
             gen (str): The name of the current generation.
             study_path (str): The path to the study folder.
-            dictionary_tree (dict): The dictionary representing the study tree structure.
+            with_str (bool, optional): Whether to retain the study file strings in the jobs. Defaults to True.
+            with_hash (bool, optional): Whether to compute the hash of the study files. Defaults to False.
 
-        Returns:
-            tuple[list[str], list[str]]: The list of study file strings and the list of study paths.
+        Yields:
+            StudyJob: The record of each written study file.
         """
-        template_name = self.master[gen].get("template_name", self.default_template_name)
-        template_path = self.master[gen].get("template_path", self.default_template_path)
+        template_name, template_path = self.get_template_gen(gen)
         if "scans" in self.master["structure"][layer]:
-            l_study_scan_str, l_study_path_next_layer = self.create_scans(
-                gen, layer, study_path, template_name, template_path
+            yield from self.iter_scans(
+                gen, layer, study_path, template_name, template_path, with_str, with_hash
             )
-            return l_study_scan_str, l_study_path_next_layer
-            # l_study_str.extend(l_study_scan_str)
         else:
             # Always give the layer the name of the first generation file,
             # except if very first layer
             layer_temp = (
                 "base" if idx_layer == 0 else self.master["structure"][layer]["generations"][0]
             )
-            study_str, l_study_path_next_layer = self.generate_render_write(
-                gen,
-                layer_temp,
-                study_path,
+            directory_path_gen = f"{study_path}{layer_temp}/"
+            skeleton = self.compile_gen(gen, template_name, template_path)
+            str_parameters = self.get_parameters_assignation(
+                skeleton.l_parameters, directory_path_gen
+            )
+            job = StudyJob(f"{directory_path_gen}{gen}.py", directory_path_gen, gen, layer)
+            yield from self.iter_bind_and_write(
+                skeleton,
+                [(job, str_parameters)],
                 template_name,
                 template_path,
+                with_str,
+                with_hash,
             )
-            # l_study_str.append(study_str)
-            return [study_str], l_study_path_next_layer
 
-    def create_study(
-        self: Self, tree_file: bool = True, force_overwrite: bool = False
-    ) -> list[str]:
-        l_study_str = []
-        l_study_path = [self.master["name"] + "/"]
-        dictionary_tree = {}
+    def create_study_for_current_gen(
+        self: Self, idx_layer: int, layer: str, gen: str, study_path: str, dictionary_tree: dict
+    ) -> tuple[list[str], list[str]]:
         """
-        Creates study files for the entire study.
+        Creates study files for the current generation.
+
+        Args:
+            idx_layer (int): The index of the current layer.
+            layer (str): The name of the current layer.
+            gen (str): The name of the current generation.
+            study_path (str): The path to the study folder.
+            dictionary_tree (dict): The dictionary representing the study tree structure.
+
+        Returns:
+            tuple[list[str], list[str]]: The list of study file strings and the list of study paths.
+        """
+        l_jobs = list(self.iter_study_for_current_gen(idx_layer, layer, gen, study_path))
+        return [job.study_str for job in l_jobs], [job.directory for job in l_jobs]  # type: ignore
+
+    def iter_study(
+        self: Self,
+        tree_file: bool = True,
+        force_overwrite: bool = False,
+        n_workers: int = 1,
+        with_str: bool = False,
+        with_hash: bool = False,
+        formatting: str = "skeleton",
+        shard: int = 0,
+        n_shards: int = 1,
+        index_file: bool = True,
+    ) -> Iterator[StudyJob]:
+        """
+        Creates study files for the entire study, yielding a record for each file as it is written.
+
+        Each study file is recorded in a SQLite index of the study (index.db) as soon as it is
+        written, along with the job it depends on and the values of its scanned parameters. The
+        study tree structure (tree.yaml) is exported once the iterator is exhausted. A manifest of the
+        generated files is kept in the study folder, such that regenerating the study only writes
+        the files whose inputs changed, and removes the files which are not part of the study
+        anymore (e.g. scan points that disappeared).
+
+        The generation of a large study can be split into several shards, generated independently
+        (e.g. on several machines sharing a filesystem). Each shard goes through the whole study,
+        but only writes its own subset of the study files, along with its own manifest, index
+        (index_shard_{shard}.db) and study tree (tree_shard_{shard}.yaml). The indexes and study
+        trees of all the shards are then combined with merge_index_shards and merge_tree_shards.
 
         Args:
             tree_file (bool, optional): Whether to write the study tree structure to a YAML file. Defaults to True.
             force_overwrite (bool, optional): Whether to overwrite existing study files. Defaults to False.
+            n_workers (int, optional): The number of processes used to write the scan points. Defaults to 1.
+            with_str (bool, optional): Whether to retain the study file strings in the jobs. Defaults to False.
+            with_hash (bool, optional): Whether to compute the hash of the study files. Defaults to False.
+            formatting (str, optional): The formatting strategy of the study files. "black" formats
+                each study file, "skeleton" formats each generation once and then only the
+                parameters of each study file, and "none" doesn't format the study files. Defaults
+                to "skeleton".
+            shard (int, optional): The shard of the study to generate. Defaults to 0.
+            n_shards (int, optional): The number of shards the study is split into. Defaults to 1.
+            index_file (bool, optional): Whether to write the SQLite index of the study files.
+                Defaults to True.
+
+        Yields:
+            StudyJob: The record of each study file written by the current shard.
 
-        Returns:
-            list[str]: The list of study file strings.
+        Raises:
+            ValueError: If the formatting strategy is unknown, if the shard is not valid, or if
+                a sharded study is generated with force_overwrite.
         """
+        if formatting not in l_formatting:
+            raise ValueError(
+                f"Unknown formatting strategy {formatting}. Expected one of {l_formatting}."
+            )
+        if not 0 <= shard < n_shards:
+            raise ValueError(
+                f"Shard {shard} is not valid for a study split into {n_shards} shards."
+            )
+        if force_overwrite and n_shards > 1:
+            raise ValueError(
+                "A sharded study can't be generated with force_overwrite, as each shard would"
+                " remove the files of the others."
+            )
+        self.formatting = formatting
+        self.shard = shard
+        self.n_shards = n_shards
+        l_study_path = [self.master["name"] + "/"]
+        dictionary_tree = {}
+
         # Remove existing study if force_overwrite
         if force_overwrite and os.path.exists(self.master["name"]):
             shutil.rmtree(self.master["name"])
+        suffix_shard = "" if n_shards == 1 else f"_shard_{shard}"
+        self.manifest = Manifest(f"{self.master['name']}/manifest{suffix_shard}.json")
+        if index_file:
+            self.study_index = StudyIndex(f"{self.master['name']}/index{suffix_shard}.db")
+            for layer in self.master["structure"]:
+                for position, gen in enumerate(self.master["structure"][layer]["generations"]):
+                    self.study_index.add_generation(
+                        gen,
+                        layer,
+                        position,
+                        *self.get_template_gen(gen),
+                        get_resources(self.master[gen].get("resources")),
+                    )
 
-        for idx, layer in enumerate(sorted(self.master["structure"].keys())):
-            # Each generaration inside of a layer should yield the same l_study_path_next_layer
-            l_study_path_next_layer = []
-            for study_path in l_study_path:
+        # Compile all generations beforehand, such that the skeletons are shipped once per worker
+        self.n_workers = n_workers
+        if n_workers > 1:
+            for layer in self.master["structure"]:
                 for gen in self.master["structure"][layer]["generations"]:
-                    l_curr_study_str, l_study_path_next_layer = self.create_study_for_current_gen(
-                        idx, layer, gen, study_path, dictionary_tree
-                    )
-                    l_study_str.extend(l_curr_study_str)
-                    dictionary_tree = self.complete_tree(
-                        dictionary_tree, l_study_path_next_layer, gen
-                    )
+                    skeleton = self.compile_gen(gen, *self.get_template_gen(gen))
+                    if formatting == "skeleton":
+                        skeleton.get_template_parts_formatted()
+            self.executor = ProcessPoolExecutor(
+                max_workers=n_workers,
+                initializer=_initialize_worker,
+                initargs=(
+                    {key: skeleton for key, skeleton in self.dict_skeletons.items() if key[2]},
+                ),
+            )
 
-            # Update study path for next later
-            l_study_path = l_study_path_next_layer
+        # Jobs are identified by their position in the study, which is the same for all shards
+        job_id = 0
+        dict_job_ids = {}
+        try:
+            for idx, layer in enumerate(sorted(self.master["structure"].keys())):
+                # Each generation inside of a layer yields the same paths for the next layer
+                dict_study_path_next_layer = {}
+                for study_path in l_study_path:
+                    for gen in self.master["structure"][layer]["generations"]:
+                        for job in self.iter_study_for_current_gen(
+                            idx, layer, gen, study_path, with_str, with_hash
+                        ):
+                            dict_study_path_next_layer[job.directory] = job_id
+                            if self.is_in_shard(job.file):
+                                if tree_file and self.study_index is None:
+                                    dictionary_tree = self.complete_tree_with_job(
+                                        dictionary_tree, job
+                                    )
+                                if self.study_index is not None:
+                                    self.study_index.add_job(
+                                        job_id,
+                                        layer,
+                                        gen,
+                                        job.directory,
+                                        dict_job_ids.get(study_path),
+                                        job.file,
+                                        job.index,
+                                        self.manifest.get_output_hash(job.file),
+                                        job.dic_mutated_parameters,
+                                        self.get_outputs(gen, job),
+                                    )
+                                yield job
+                            job_id += 1
+
+                # The jobs of the last generation of each folder are the parents of the next layer
+                dict_job_ids = dict_study_path_next_layer
+
+                # Update study path for next later
+                l_study_path = list(dict_study_path_next_layer)
+
+            # Remove the files which were not generated in this run
+            self.manifest.prune()
+
+            # Export the study tree structure from the index
+            if tree_file and self.study_index is not None:
+                dictionary_tree = self.study_index.get_tree()
+        finally:
+            if self.executor is not None:
+                self.executor.shutdown()
+                self.executor = None
+            self.manifest.save()
+            self.manifest = None
+            if self.study_index is not None:
+                self.study_index.close()
+                self.study_index = None
+            self.shard = 0
+            self.n_shards = 1
 
         if tree_file:
-            self.write_tree(dictionary_tree)
+            self.write_tree(
+                dictionary_tree, "tree.yaml" if n_shards == 1 else f"tree_shard_{shard}.yaml"
+            )
+
+    def create_study(
+        self: Self,
+        tree_file: bool = True,
+        force_overwrite: bool = False,
+        n_workers: int = 1,
+        keep_str: bool = True,
+        formatting: str = "skeleton",
+        shard: int = 0,
+        n_shards: int = 1,
+        index_file: bool = True,
+    ) -> list[str]:
+        """
+        Creates study files for the entire study.
+
+        Args:
+            tree_file (bool, optional): Whether to write the study tree structure to a YAML file. Defaults to True.
+            force_overwrite (bool, optional): Whether to overwrite existing study files. Defaults to False.
+            n_workers (int, optional): The number of processes used to write the scan points. Defaults to 1.
+            keep_str (bool, optional): Whether to retain and return the study file strings. Defaults to True.
+            formatting (str, optional): The formatting strategy of the study files, among "black",
+                "skeleton" and "none". Defaults to "skeleton".
+            shard (int, optional): The shard of the study to generate. Defaults to 0.
+            n_shards (int, optional): The number of shards the study is split into. Defaults to 1.
+            index_file (bool, optional): Whether to write the SQLite index of the study files.
+                Defaults to True.
 
-        return l_study_str
+        Returns:
+            list[str]: The list of study file strings, or of study file paths if keep_str is False,
+                for the study files written by the current shard.
+        """
+        return [
+            job.study_str if keep_str else job.file  # type: ignore
+            for job in self.iter_study(
+                tree_file,
+                force_overwrite,
+                n_workers,
+                with_str=keep_str,
+                formatting=formatting,
+                shard=shard,
+                n_shards=n_shards,
+                index_file=index_file,
+            )
+        ]
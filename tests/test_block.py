@@ -10,7 +10,7 @@ import numpy as np
 import pytest
 
 # Local application imports
-from study_gen import Block
+from study_gen import Block, BoundBlock
 
 
 # ==================================================================================================
@@ -419,6 +419,57 @@ def test_prepare_function_str(example_block_with_two_outputs):
     assert docstring == """Let's test this function"""
 
 
+def test_introspection_cache(example_block_with_two_outputs):
+    # Introspection results are cached
+    assert example_block_with_two_outputs.get_signature() is (
+        example_block_with_two_outputs.get_signature()
+    )
+    assert example_block_with_two_outputs.get_docstring() == (
+        "Example function to test the block class."
+    )
+
+    # Reassigning the function invalidates the cache
+    def other_function(c: int) -> int:
+        return c
+
+    example_block_with_two_outputs.function = other_function
+    assert str(example_block_with_two_outputs.get_signature()) == "(c: int) -> int"
+    assert example_block_with_two_outputs.dict_parameters == OrderedDict([("c", int)])
+    assert example_block_with_two_outputs.get_docstring() == ""
+    assert example_block_with_two_outputs.get_body_str() == "        return c\n"
+
+
+def test_bound_block(example_block_with_two_outputs):
+    bound_block = BoundBlock(example_block_with_two_outputs, "x, y", ["out_0", "out_1"])
+    assert bound_block.get_arguments_as_dict() == OrderedDict([("x", float), ("y", float)])
+    assert bound_block.dict_output == OrderedDict([("out_0", float), ("out_1", int)])
+    assert bound_block.get_assignation_call_str() == "out_0, out_1 = example_function(x, y)"
+
+    # The reference block is left untouched
+    assert example_block_with_two_outputs.l_arguments == []
+    assert example_block_with_two_outputs.get_outputs_names() == [
+        "output_0_example_block",
+        "output_1_example_block",
+    ]
+
+    # Check for wrong number of arguments and outputs
+    with pytest.raises(ValueError):
+        BoundBlock(example_block_with_two_outputs, ["x", "y", "z"], ["out_0", "out_1"])
+    with pytest.raises(ValueError):
+        BoundBlock(example_block_with_two_outputs, ["x", "y"], "out_0")
+
+
+def test_write_and_load_temp_block():
+    function_str = "def test_function(a: float) -> float:\n    return np.power(a, 2)\n"
+    dict_imports = {"np": "import numpy as np"}
+    function = Block.write_and_load_temp_block(function_str, "test_function", dict_imports)
+    assert function(3.0) == 9.0
+
+    # Identical functions are only compiled once, and their source remains available
+    assert Block.write_and_load_temp_block(function_str, "test_function", dict_imports) is function
+    assert Block("test_block", function).get_str() == function_str
+
+
 # ? block.build_function_str()is tested in test_study_gen.py
 
 # ==================================================================================================
@@ -0,0 +1,63 @@
+# ==================================================================================================
+# --- Imports
+# ==================================================================================================
+# Standard library imports
+from collections import OrderedDict
+
+# Third party imports
+import pytest
+
+# Local application imports
+from study_gen import Block, BoundBlock, merge_blocks
+from study_gen.merge._merge_blocks import _get_multiple_merge_parameters
+
+
+# ==================================================================================================
+# --- Fixtures
+# ==================================================================================================
+@pytest.fixture(scope="function")
+def add_block():
+    def add_function(a: float, b: float) -> float:
+        return a + b
+
+    return Block("add", add_function)
+
+
+@pytest.fixture(scope="function")
+def repeat_block():
+    def repeat_function(s: str, n: int) -> str:
+        return s * n
+
+    return Block("repeat", repeat_function)
+
+
+# ==================================================================================================
+# --- Tests
+# ==================================================================================================
+def test_merge_parameters(add_block):
+    l_blocks = [
+        BoundBlock(add_block, ["x", "y"], "xy"),
+        BoundBlock(add_block, ["xy", "z"], "xyz"),
+        BoundBlock(add_block, ["xyz", "x"], "xyzx"),
+    ]
+    # Parameters are ordered by first appearance, and outputs are not parameters
+    assert _get_multiple_merge_parameters(l_blocks) == OrderedDict(
+        [("x", float), ("y", float), ("z", float)]
+    )
+
+
+def test_merge_single_block(add_block):
+    merged_block = merge_blocks(
+        "single", [BoundBlock(add_block, ["x", "y"], "xy")], "single_function"
+    )
+    assert merged_block.dict_parameters == OrderedDict([("x", float), ("y", float)])
+
+
+def test_merge_parameters_conflicts(add_block, repeat_block):
+    l_blocks = [
+        BoundBlock(add_block, ["x", "y"], "xy"),
+        BoundBlock(repeat_block, ["x", "y"], "s"),
+    ]
+    # All conflicts are reported at once
+    with pytest.raises(ValueError, match=r"x \(float previously, str.*y \(float previously, int"):
+        _get_multiple_merge_parameters(l_blocks)
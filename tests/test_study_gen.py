@@ -0,0 +1,715 @@
+# ==================================================================================================
+# --- Imports
+# ==================================================================================================
+# Standard library imports
+import hashlib
+import json
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import threading
+
+# Third party imports
+import black
+import numpy as np
+import pytest
+from ruamel import yaml
+
+# Local application imports
+from study_gen import GenerationSkeleton, StudyExecutor, StudyGen, StudyJob, merge
+from study_gen._configuration_index import ConfigurationIndex
+from study_gen._fork_server import get_script_split
+from study_gen.__main__ import main
+
+# ==================================================================================================
+# --- Fixtures
+# ==================================================================================================
+path_dummy = f"{os.path.dirname(__file__)}/../examples/dummy"
+
+
+@pytest.fixture(scope="function")
+def dummy_study(tmp_path, monkeypatch):
+    # Generate the study in a temporary folder
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(path_dummy)
+    from blocks import dict_ref_blocks  # type: ignore
+
+    return StudyGen(
+        path_configuration=f"{path_dummy}/config.yaml",
+        path_master=f"{path_dummy}/master.yaml",
+        dict_ref_blocks=dict_ref_blocks,
+    )
+
+
+# ==================================================================================================
+# --- Tests
+# ==================================================================================================
+def test_compile_gen_is_cached(dummy_study):
+    skeleton = dummy_study.compile_gen("some_more_computations", "default.txt")
+    assert isinstance(skeleton, GenerationSkeleton)
+    assert dummy_study.compile_gen("some_more_computations", "default.txt") is skeleton
+    assert skeleton.l_parameters == ["path_fact_a_bc", "b", "c", "a", "d", "path_result"]
+
+
+def test_skeleton_bind(dummy_study):
+    gen = "some_more_computations"
+    skeleton = dummy_study.compile_gen(gen, "default.txt")
+    str_parameters = dummy_study.get_parameters_assignation(
+        skeleton.l_parameters, "study_dummy/base/a_1.0_b_1/", {"a": 1.0, "b": 1}
+    )
+
+    # Binding must be equivalent to a full render of the generation
+    (
+        str_imports,
+        str_parameters_gen,
+        str_blocks,
+        str_main,
+        str_main_call,
+    ) = dummy_study.generate_gen(gen, "study_dummy/base/a_1.0_b_1/", {"a": 1.0, "b": 1})
+    assert str_parameters_gen == str_parameters
+    assert skeleton.bind(str_parameters) == dummy_study.render(
+        str_imports,
+        str_parameters,
+        str_blocks,
+        str_main,
+        str_main_call,
+        template_path=dummy_study.default_template_path,
+        template_name="default.txt",
+    )
+
+
+def test_skeleton_bind_without_template(dummy_study):
+    skeleton = dummy_study.compile_gen("some_dummy_computations")
+    with pytest.raises(ValueError):
+        skeleton.bind("# Declare parameters\n")
+
+
+def test_create_study_parallel(dummy_study):
+    l_study_str = dummy_study.create_study(force_overwrite=True)
+    with open("study_dummy/tree.yaml") as f:
+        tree_serial = f.read()
+
+    # Parallel generation must be deterministic and identical to the serial one
+    l_study_str_parallel = dummy_study.create_study(force_overwrite=True, n_workers=2)
+    with open("study_dummy/tree.yaml") as f:
+        tree_parallel = f.read()
+    assert l_study_str_parallel == l_study_str
+    assert tree_parallel == tree_serial
+
+
+def test_iter_study(dummy_study):
+    l_jobs = list(dummy_study.iter_study(force_overwrite=True, with_hash=True))
+    assert all(isinstance(job, StudyJob) for job in l_jobs)
+    assert [job.gen for job in l_jobs] == ["some_dummy_computations"] + 4 * [
+        "some_more_computations"
+    ]
+
+    # Strings are not retained by default, but hashes match the written files
+    for job in l_jobs:
+        assert job.study_str is None
+        with open(job.file, "rb") as f:
+            assert hashlib.sha256(f.read()).hexdigest() == job.hash
+    assert l_jobs[1].dic_mutated_parameters == {"a": 1.0, "b": 1}
+    assert os.path.exists("study_dummy/tree.yaml")
+
+    # create_study can return the file paths only
+    assert dummy_study.create_study(force_overwrite=True, keep_str=False) == [
+        job.file for job in l_jobs
+    ]
+
+
+def test_configuration_index(dummy_study):
+    index = dummy_study.configuration_index
+    assert index.get_value("c") == 4
+    assert index.get_keys("d") == ("a_float", "d")
+    assert index.get_dependency("path_fact_a_bc") == "internal_dependency"
+    assert index.get_dependency("path_result") is None
+    assert "value" not in index
+    assert index.get_ambiguous_names() == []
+
+    # Lookups of names defined several times follow a depth-first search
+    from study_gen._configuration_index import ConfigurationIndex
+
+    index = ConfigurationIndex({"x": {"a": 1, "y": {"a": 2}}, "z": {"a": 3, "b": None}, "b": 4})
+    assert index.get_value("a") == 1
+    assert index.get_value("b") == 4
+    assert index.is_ambiguous("a")
+    assert sorted(index.get_ambiguous_names()) == ["a", "b"]
+
+
+def test_template_cache(dummy_study, tmp_path):
+    template = dummy_study.get_template(dummy_study.default_template_path, "default.txt")
+    assert dummy_study.get_template(dummy_study.default_template_path, "default.txt") is template
+    assert list(dummy_study.dict_environments) == [dummy_study.default_template_path]
+
+    # Compiled templates are cached on disk if a cache path is provided
+    from blocks import dict_ref_blocks  # type: ignore
+
+    study = StudyGen(
+        path_configuration=f"{path_dummy}/config.yaml",
+        path_master=f"{path_dummy}/master.yaml",
+        dict_ref_blocks=dict_ref_blocks,
+        path_cache=f"{tmp_path}/cache",
+    )
+    assert study.create_study(force_overwrite=True) == dummy_study.create_study(
+        force_overwrite=True
+    )
+    assert len(os.listdir(f"{tmp_path}/cache/jinja")) == 1
+
+
+def test_block_cache(dummy_study, tmp_path, monkeypatch):
+    from blocks import dict_ref_blocks  # type: ignore
+
+    def get_study():
+        return StudyGen(
+            path_configuration=f"{path_dummy}/config.yaml",
+            path_master=f"{path_dummy}/master.yaml",
+            dict_ref_blocks=dict_ref_blocks,
+            path_cache=f"{tmp_path}/cache",
+        )
+
+    l_study_str = dummy_study.create_study(force_overwrite=True)
+    assert get_study().create_study(force_overwrite=True) == l_study_str
+    assert len([file for file in os.listdir(f"{tmp_path}/cache") if file.endswith(".json")]) == 4
+
+    # Warm regenerations don't merge any block
+    def merge_blocks(*args, **kwargs):
+        raise AssertionError("Blocks should be loaded from the cache")
+
+    monkeypatch.setattr(merge, "merge_blocks", merge_blocks)
+    assert get_study().create_study(force_overwrite=True) == l_study_str
+
+
+def test_incremental_regeneration(dummy_study):
+    l_study_str = dummy_study.create_study(force_overwrite=True)
+    l_files = dummy_study.create_study(keep_str=False)
+    dict_mtimes = {file: os.stat(file).st_mtime_ns for file in l_files}
+
+    # Files whose inputs did not change are not written again
+    os.utime(l_files[1], ns=(0, 0))
+    assert dummy_study.create_study() == l_study_str
+    assert os.stat(l_files[1]).st_mtime_ns == 0
+
+    # Files modified on disk are written again
+    with open(l_files[2], "a") as f:
+        f.write("# Modified\n")
+    dummy_study.create_study()
+    assert os.stat(l_files[2]).st_mtime_ns != dict_mtimes[l_files[2]]
+
+    # Files of scan points that disappeared are removed
+    dummy_study.master["structure"]["layer_2"]["scans"]["b"]["list"] = [1, 3]
+    l_files_new = dummy_study.create_study(keep_str=False)
+    assert sorted(set(l_files) - set(l_files_new)) == [
+        "study_dummy/base/a_1.0_b_2/some_more_computations.py",
+        "study_dummy/base/a_2.0_b_2/some_more_computations.py",
+    ]
+    assert not os.path.exists("study_dummy/base/a_1.0_b_2")
+    assert os.stat(l_files[1]).st_mtime_ns == 0
+    assert all(os.path.exists(file) for file in l_files_new)
+
+
+@pytest.mark.parametrize("template_name", ["default.txt", "with_context.txt"])
+def test_skeleton_formatting(dummy_study, template_name):
+    skeleton = dummy_study.compile_gen("some_more_computations", template_name)
+    str_parameters = dummy_study.get_parameters_assignation(
+        skeleton.l_parameters, "study_dummy/base/a_1.0_b_1/", {"a": 1.0, "b": [1] * 40}
+    )
+
+    # Formatting the skeleton once must be equivalent to formatting the whole study file
+    study_str = skeleton.bind_and_format(str_parameters, "black")
+    assert skeleton.bind_and_format(str_parameters, "skeleton") == study_str
+    assert skeleton.bind_and_format(str_parameters, "none") == skeleton.bind(str_parameters)
+    with pytest.raises(ValueError):
+        skeleton.bind_and_format(str_parameters, "yapf")
+
+
+def test_parameter_table(dummy_study):
+    dummy_study.master["structure"]["layer_2"]["parameter_table"] = True
+    l_jobs = list(dummy_study.iter_study(force_overwrite=True, with_str=True))
+
+    # A single study file is written for all the scan points
+    assert [job.index for job in l_jobs] == [None, 0, 1, 2, 3]
+    assert {job.file for job in l_jobs[1:]} == {"study_dummy/base/some_more_computations.py"}
+    assert not os.path.exists("study_dummy/base/a_1.0_b_1")
+    with open("study_dummy/base/some_more_computations_parameters.jsonl") as f:
+        l_rows = [json.loads(line) for line in f]
+    assert l_rows[1] == {"index": 1, "directory": "a_1.0_b_2", "b": 2, "a": 1.0}
+    with open("study_dummy/tree.yaml") as f:
+        assert "index: 3" in f.read()
+
+    # The study file is formatted consistently with black
+    with open(l_jobs[1].file) as f:
+        assert f.read() == black.format_str(l_jobs[1].study_str, mode=black.FileMode())
+
+    # Each job runs in the folder of its scan point
+    subprocess.run(
+        [sys.executable, "some_dummy_computations.py"], cwd="study_dummy/base", check=True
+    )
+    subprocess.run(
+        [sys.executable, "some_more_computations.py"],
+        cwd="study_dummy/base",
+        env={**os.environ, "SLURM_ARRAY_TASK_ID": "2"},
+        check=True,
+    )
+    assert os.listdir("study_dummy/base/a_2.0_b_1") == ["result.pkl"]
+
+
+@pytest.mark.parametrize(
+    "dic_scans, l_directories",
+    [
+        ({"zip": ["a", "b"]}, ["a_1.0_b_1", "a_2.0_b_2"]),
+        ({"filter": "b > a"}, ["a_1.0_b_2"]),
+        ({"filter": ["b < 2", "a < 1.5"]}, ["a_1.0_b_1"]),
+        (
+            {"points": [{"a": 1, "b": 3}, {"a": 5, "b": 6}], "a": None, "b": None},
+            ["a_1_b_3", "a_5_b_6"],
+        ),
+    ],
+)
+def test_sparse_scans(dummy_study, dic_scans, l_directories):
+    dic_scans_layer = dummy_study.master["structure"]["layer_2"]["scans"]
+    for key, value in dic_scans.items():
+        if value is None:
+            del dic_scans_layer[key]
+        else:
+            dic_scans_layer[key] = value
+    l_jobs = list(dummy_study.iter_study(force_overwrite=True))
+    assert [job.directory for job in l_jobs[1:]] == [
+        f"study_dummy/base/{directory}/" for directory in l_directories
+    ]
+    assert sorted(os.listdir("study_dummy/base")) == sorted(
+        l_directories + ["some_dummy_computations.py"]
+    )
+
+
+def test_sparse_scans_errors(dummy_study):
+    dic_scans_layer = dummy_study.master["structure"]["layer_2"]["scans"]
+    dic_scans_layer["a"]["linspace"] = [1, 2, 3]
+    dic_scans_layer["zip"] = ["a", "b"]
+    with pytest.raises(ValueError, match="same number of values"):
+        list(dummy_study.iter_study(force_overwrite=True))
+
+    del dic_scans_layer["zip"]
+    dic_scans_layer["filter"] = "a + b"
+    with pytest.raises(ValueError, match="booleans"):
+        list(dummy_study.iter_study(force_overwrite=True))
+
+
+@pytest.mark.parametrize("method", ["latin_hypercube", "uniform", "normal", "sobol"])
+def test_sampling(dummy_study, method):
+    if method == "sobol":
+        pytest.importorskip("scipy")
+    from study_gen._scans import get_samples
+
+    dic_sampling = {
+        "method": method,
+        "n_samples": 8,
+        "seed": 1,
+        "parameters": {"a": [1, 2], "b": [0, 10]},
+    }
+    dic_samples = get_samples(dic_sampling)
+    assert all(len(samples) == 8 for samples in dic_samples.values())
+    assert all(
+        np.array_equal(dic_samples[parameter], samples)
+        for parameter, samples in get_samples(dic_sampling).items()
+    )
+    if method != "normal":
+        assert np.all((dic_samples["a"] >= 1) & (dic_samples["a"] <= 2))
+    if method == "latin_hypercube":
+        # Exactly one sample per stratum along each dimension
+        assert sorted(np.floor((dic_samples["b"] - 0) / 10 * 8).astype(int)) == list(range(8))
+
+    # Sampled points replace the cartesian product of the sampled parameters
+    dic_scans_layer = dummy_study.master["structure"]["layer_2"]["scans"]
+    del dic_scans_layer["a"], dic_scans_layer["b"]
+    dic_scans_layer["sampling"] = dic_sampling
+    l_jobs = list(dummy_study.iter_study(force_overwrite=True))
+    assert len(l_jobs) == 9
+    assert [job.dic_mutated_parameters["a"] for job in l_jobs[1:]] == list(dic_samples["a"])
+
+
+@pytest.mark.parametrize(
+    "dic_refine, l_directories_refined",
+    [
+        ({"gradient_quantile": 0.75}, ["a_2.5_b_1", "a_2.5_b_2"]),
+        ({"threshold": 5, "parameters": ["a"]}, ["a_1.5_b_1", "a_1.5_b_2"]),
+    ],
+)
+def test_refine(dummy_study, dic_refine, l_directories_refined):
+    dic_scans_layer = dummy_study.master["structure"]["layer_2"]["scans"]
+    dic_scans_layer["a"]["linspace"] = [1, 3, 3]
+    dic_scans_layer["refine"] = {"file": "metric.txt", "max_depth": 2, **dic_refine}
+
+    # Nothing to refine before the jobs ran
+    l_jobs = list(dummy_study.iter_study())
+    assert len(l_jobs) == 7
+
+    # Refine where the metric of the finished jobs is steep or crosses the threshold
+    def write_metrics(l_jobs):
+        for job in l_jobs[1:]:
+            with open(f"{job.directory}metric.txt", "w") as f:
+                f.write(f"{job.dic_mutated_parameters['a'] ** 3}\n")
+
+    write_metrics(l_jobs)
+    l_jobs_refined = list(dummy_study.iter_study())
+    assert [job.directory for job in l_jobs_refined[7:]] == [
+        f"study_dummy/base/{directory}/" for directory in l_directories_refined
+    ]
+
+    # The refinement deepens with each generation, up to the maximum depth
+    for _ in range(3):
+        write_metrics(l_jobs_refined)
+        l_jobs_refined = list(dummy_study.iter_study())
+    l_a = {job.dic_mutated_parameters["a"] for job in l_jobs_refined[1:]}
+    assert len(l_a) > 4
+    assert all((4 * a).is_integer() for a in l_a)
+
+
+@pytest.mark.parametrize("parameter_table", [False, True])
+def test_points_per_job(dummy_study, parameter_table):
+    dummy_study.master["structure"]["layer_2"]["points_per_job"] = 3
+    dummy_study.master["structure"]["layer_2"]["parameter_table"] = parameter_table
+    l_jobs = list(dummy_study.iter_study(force_overwrite=True, with_str=True))
+
+    # Points are grouped in consecutive jobs, and keep their own folder
+    if parameter_table:
+        l_files = 4 * ["some_more_computations.py"]
+        l_commands = [[l_files[0], "--index", "0"], [l_files[0], "--index", "1"]]
+    else:
+        l_files = 3 * ["some_more_computations_0.py"] + ["some_more_computations_1.py"]
+        l_commands = [[l_files[0]], [l_files[3]]]
+    assert [job.file for job in l_jobs[1:]] == [f"study_dummy/base/{file}" for file in l_files]
+    assert [job.directory for job in l_jobs[1:]] == [
+        f"study_dummy/base/{directory}/"
+        for directory in ["a_1.0_b_1", "a_1.0_b_2", "a_2.0_b_1", "a_2.0_b_2"]
+    ]
+    with open(l_jobs[1].file) as f:
+        assert f.read() == black.format_str(l_jobs[1].study_str, mode=black.FileMode())
+
+    # Each job runs all its points
+    subprocess.run(
+        [sys.executable, "some_dummy_computations.py"], cwd="study_dummy/base", check=True
+    )
+    for command in l_commands:
+        subprocess.run([sys.executable] + command, cwd="study_dummy/base", check=True)
+    for job in l_jobs[1:]:
+        assert os.listdir(job.directory) == ["result.pkl"]
+
+
+@pytest.mark.parametrize("dic_scans", [{}, {"zip": ["a", "b"]}, {"filter": "b >= a"}])
+def test_scan_space(dummy_study, dic_scans):
+    dummy_study.master["structure"]["layer_2"]["scans"].update(dic_scans)
+    scan_space = dummy_study.get_scan_space("layer_2")
+    l_points = list(scan_space)
+    assert len(scan_space) == len(l_points) == len(scan_space[:])
+    assert scan_space[-1] == l_points[-1]
+    assert scan_space[::2] == l_points[::2]
+
+    # Random access matches the iteration, and the index of each point is found back
+    for idx, (_, dic_mutated_parameters_for_naming) in enumerate(l_points):
+        assert scan_space[idx] == l_points[idx]
+        assert scan_space.index(dic_mutated_parameters_for_naming) == idx
+
+    # The folders match the generated study
+    l_jobs = list(dummy_study.iter_study(force_overwrite=True))
+    assert [job.directory for job in l_jobs[1:]] == [
+        scan_space.get_path(idx, "study_dummy/base/") for idx in range(len(scan_space))
+    ]
+
+    with pytest.raises(IndexError):
+        scan_space[len(scan_space)]
+    with pytest.raises(ValueError, match="not in the scan"):
+        scan_space.index({"a": 1.5, "b": 1})
+
+
+@pytest.mark.parametrize("parameter_table", [False, True])
+def test_sharded_generation(dummy_study, parameter_table):
+    dummy_study.master["structure"]["layer_2"]["parameter_table"] = parameter_table
+    dummy_study.master["structure"]["layer_2"]["scans"]["a"]["linspace"] = [1, 3, 5]
+
+    def read_study():
+        dict_files = {}
+        for root, _, l_files in os.walk("study_dummy"):
+            for file in l_files:
+                if not file.endswith((".json", ".yaml", ".db")):
+                    with open(os.path.join(root, file)) as f:
+                        dict_files[os.path.join(root, file)] = f.read()
+        with open("study_dummy/tree.yaml") as f:
+            return dict_files, f.read()
+
+    l_files = dummy_study.create_study(keep_str=False)
+    dict_files, tree = read_study()
+    shutil.rmtree("study_dummy")
+
+    # Each file is written by exactly one shard, and the merged tree is the full study tree
+    l_files_shards = [
+        dummy_study.create_study(keep_str=False, shard=shard, n_shards=3) for shard in range(3)
+    ]
+    assert sorted(sum(l_files_shards, [])) == sorted(l_files)
+    dictionary_tree = dummy_study.merge_tree_shards(3)
+    dummy_study.merge_index_shards(3)
+    with sqlite3.connect("study_dummy/index.db") as connection:
+        assert connection.execute("SELECT job_id FROM jobs ORDER BY job_id").fetchall() == [
+            (job_id,) for job_id in range(len(l_files))
+        ]
+    dict_files_shards, _ = read_study()
+    assert dict_files_shards == dict_files
+    assert json.loads(json.dumps(dictionary_tree)) == json.loads(json.dumps(yaml.YAML().load(tree)))
+
+    with pytest.raises(ValueError, match="force_overwrite"):
+        dummy_study.create_study(force_overwrite=True, shard=1, n_shards=3)
+    with pytest.raises(ValueError, match="not valid"):
+        dummy_study.create_study(shard=3, n_shards=3)
+
+
+def test_study_index(dummy_study):
+    dummy_study.master["structure"]["layer_2"]["scans"]["b"]["for_each_beam"] = True
+    l_files = dummy_study.create_study(keep_str=False, tree_file=False)
+    assert not os.path.exists("study_dummy/tree.yaml")
+
+    with sqlite3.connect("study_dummy/index.db") as connection:
+        l_rows = connection.execute(
+            "SELECT job_id, layer, generation, path, parent_id, file, hash, status, a, b FROM jobs"
+        ).fetchall()
+        assert [row[5] for row in l_rows] == l_files
+        assert l_rows[0][:6] == (
+            0,
+            "layer_1",
+            "some_dummy_computations",
+            "study_dummy/base/",
+            None,
+            "study_dummy/base/some_dummy_computations.py",
+        )
+        with open(l_files[1], "rb") as f:
+            assert l_rows[1][6] == hashlib.sha256(f.read()).hexdigest()
+        assert all(row[4] == 0 and row[7] == "pending" for row in l_rows[1:])
+
+        # Scanned parameters are typed columns
+        assert connection.execute(
+            "SELECT path FROM jobs WHERE layer = 'layer_2' AND a = 2.0"
+        ).fetchall() == [("study_dummy/base/a_2.0_b_1/",), ("study_dummy/base/a_2.0_b_2/",)]
+        assert json.loads(l_rows[1][9]) == {"lhcb1": 1, "lhcb2": 1}
+        assert connection.execute("SELECT COUNT(*) FROM generations").fetchone() == (2,)
+
+
+@pytest.mark.parametrize("index_file", [True, False])
+@pytest.mark.parametrize("parameter_table", [False, True])
+def test_executor(dummy_study, index_file, parameter_table):
+    dummy_study.master["structure"]["layer_2"]["parameter_table"] = parameter_table
+    dummy_study.create_study(index_file=index_file)
+    executor = StudyExecutor("study_dummy", n_cpus=2)
+    assert len(executor.dict_jobs) == 5
+    assert all(
+        set_dependencies == {(os.path.abspath("study_dummy/base/some_dummy_computations.py"), None)}
+        for set_dependencies in list(executor.dict_dependencies.values())[1:]
+    )
+
+    # Each job runs in its folder, once its parent has written its outputs
+    assert set(executor.run().values()) == {0}
+    for directory in ["a_1.0_b_1", "a_1.0_b_2", "a_2.0_b_1", "a_2.0_b_2"]:
+        assert os.path.exists(f"study_dummy/base/{directory}/result.pkl")
+    assert all(os.path.exists(executor.get_log_path(job)) for job in executor.dict_jobs.values())
+
+
+def test_executor_failure(dummy_study, capsys):
+    dummy_study.create_study()
+    with open("study_dummy/base/some_dummy_computations.py", "a") as f:
+        f.write("raise RuntimeError('Failed')\n")
+
+    # The children of a failed job are not run
+    assert main(["run", "study_dummy"]) == 1
+    assert "1 failed, 4 not run" in capsys.readouterr().out
+    with open("study_dummy/base/some_dummy_computations.log") as f:
+        assert "RuntimeError: Failed" in f.read()
+    assert not os.path.exists("study_dummy/base/a_1.0_b_1/some_more_computations.log")
+    with sqlite3.connect("study_dummy/index.db") as connection:
+        assert (
+            connection.execute("SELECT status, returncode FROM jobs").fetchall()
+            == [("failed", 1)] + [("pending", None)] * 4
+        )
+
+
+@pytest.mark.parametrize("memory, n_cpus_max", [(8, 4), (5, 2)])
+def test_executor_resources(dummy_study, monkeypatch, memory, n_cpus_max):
+    dummy_study.master["some_more_computations"]["resources"] = {
+        "cpus": 2,
+        "memory": "3G",
+        "runtime": "1h",
+    }
+    dummy_study.create_study()
+    executor = StudyExecutor("study_dummy", n_cpus=4, memory=memory)
+    assert executor.dict_resources["some_more_computations"] == {
+        "cpus": 2,
+        "memory": 3.0,
+        "runtime": 3600.0,
+    }
+
+    # Jobs never use more than the CPUs and memory of the executor
+    lock = threading.Lock()
+    l_n_cpus_running, l_n_cpus_used = [], []
+    run_job = executor.run_job
+
+    def run_job_tracked(job, n_cpus=1):
+        with lock:
+            l_n_cpus_running.append(n_cpus)
+            l_n_cpus_used.append(sum(l_n_cpus_running))
+        returncode = run_job(job, n_cpus)
+        with lock:
+            l_n_cpus_running.remove(n_cpus)
+        return returncode
+
+    monkeypatch.setattr(executor, "run_job", run_job_tracked)
+    assert set(executor.run().values()) == {0}
+    assert max(l_n_cpus_used) <= n_cpus_max
+
+    dummy_study.master["some_more_computations"]["resources"] = {"memory": "4 parsecs"}
+    with pytest.raises(ValueError, match="can't be parsed"):
+        dummy_study.create_study()
+
+
+def test_executor_resume(dummy_study):
+    dummy_study.master["some_dummy_computations"]["outputs"] = ["path_fact_a_bc"]
+    dummy_study.master["some_more_computations"]["outputs"] = ["path_result", "*.log"]
+    dummy_study.create_study()
+    assert StudyExecutor("study_dummy").dict_outputs[
+        (os.path.abspath("study_dummy/base/a_1.0_b_1/some_more_computations.py"), None)
+    ] == [
+        os.path.abspath("study_dummy/base/a_1.0_b_1/result.pkl"),
+        os.path.abspath("study_dummy/base/a_1.0_b_1/*.log"),
+    ]
+
+    # The execution of each job is recorded in the index
+    assert set(StudyExecutor("study_dummy").run().values()) == {0}
+    with sqlite3.connect("study_dummy/index.db") as connection:
+        l_rows = connection.execute(
+            "SELECT path, status, returncode, start_time <= end_time, output_hashes FROM jobs"
+        ).fetchall()
+    assert all(row[1:4] == ("done", 0, 1) for row in l_rows)
+    with open("study_dummy/base/a_2.0_b_2/result.pkl", "rb") as f:
+        assert (
+            json.loads(l_rows[-1][4])[os.path.abspath("study_dummy/base/a_2.0_b_2/result.pkl")]
+            == hashlib.sha256(f.read()).hexdigest()
+        )
+
+    # Only the jobs with missing outputs run again, and the records survive regeneration
+    dummy_study.create_study()
+    os.remove("study_dummy/base/a_1.0_b_2/result.pkl")
+    executor = StudyExecutor("study_dummy")
+    assert set(executor.run().values()) == {0}
+    assert len(executor.set_completed) == 4
+    assert os.path.exists("study_dummy/base/a_1.0_b_2/result.pkl")
+
+    # Jobs depending on a job which runs again also run again
+    os.remove("study_dummy/base/fact_a_bc.npy")
+    executor = StudyExecutor("study_dummy")
+    executor.run()
+    assert not executor.set_completed
+
+
+
+def test_executor_stale(dummy_study):
+    dummy_study.master["some_dummy_computations"]["outputs"] = ["path_fact_a_bc"]
+    dummy_study.master["some_more_computations"]["outputs"] = ["path_result"]
+    dummy_study.create_study()
+    assert set(StudyExecutor("study_dummy").run().values()) == {0}
+
+    # Jobs whose study file changed run again, even though their previous outputs exist
+    dummy_study.configuration["some_ints"]["c"] = 5
+    dummy_study.configuration_index = ConfigurationIndex(dummy_study.configuration)
+    dummy_study.create_study()
+    with sqlite3.connect("study_dummy/index.db") as connection:
+        assert {row[0] for row in connection.execute("SELECT status FROM jobs")} == {"stale"}
+    executor = StudyExecutor("study_dummy")
+    assert set(executor.run().values()) == {0}
+    assert not executor.set_completed
+    with open("study_dummy/base/a_1.0_b_1/some_more_computations.py") as f:
+        assert "c = 5" in f.read()
+
+
+def test_executor_warm(dummy_study, capsys):
+    dummy_study.create_study()
+    executor = StudyExecutor("study_dummy", n_cpus=2, warm=True)
+    assert executor.get_imports("study_dummy/base/some_dummy_computations.py") == [
+        "math",
+        "numpy",
+        "typing",
+    ]
+    assert set(executor.run().values()) == {0}
+    assert not executor.dict_pools
+    for directory in ["a_1.0_b_1", "a_1.0_b_2", "a_2.0_b_1", "a_2.0_b_2"]:
+        assert os.path.exists(f"study_dummy/base/{directory}/result.pkl")
+
+    # Each job runs as a fresh module, with its output and errors in its log file
+    with open("study_dummy/base/a_1.0_b_1/some_more_computations.py", "a") as f:
+        f.write("print('Warm', __name__, os.getcwd() if 'os' in globals() else None)\n")
+        f.write("raise RuntimeError('Failed')\n")
+    with sqlite3.connect("study_dummy/index.db") as connection:
+        connection.execute("UPDATE jobs SET status = 'pending'")
+    assert main(["run", "study_dummy", "--warm", "--cpus", "2"]) == 1
+    assert "1 failed" in capsys.readouterr().out
+    with open("study_dummy/base/a_1.0_b_1/some_more_computations.log") as f:
+        log = f.read()
+    assert "Warm __main__ None" in log
+    assert "RuntimeError: Failed" in log
+
+
+def test_executor_fork(dummy_study, capsys):
+    dummy_study.create_study()
+    l_directories = ["a_1.0_b_1", "a_1.0_b_2", "a_2.0_b_1", "a_2.0_b_2"]
+    l_files = [
+        f"study_dummy/base/{directory}/some_more_computations.py" for directory in l_directories
+    ]
+    assert main(["run", "study_dummy"]) == 0
+    l_results = []
+    for directory in l_directories:
+        with open(f"study_dummy/base/{directory}/result.pkl", "rb") as f:
+            l_results.append(f.read())
+        os.remove(f"study_dummy/base/{directory}/result.pkl")
+
+    # The code loading the shared inputs runs once for all the siblings
+    for file in l_files:
+        with open(file) as f:
+            study_str = f.read()
+        with open(file, "w") as f:
+            f.write(
+                study_str.replace(
+                    "    fact_a_bc = load_npy_function(path_fact_a_bc)\n",
+                    "    fact_a_bc = load_npy_function(path_fact_a_bc)\n"
+                    "    print('Shared')\n"
+                    "    open('../count.txt', 'a').write('x')\n"
+                    "    open('marker.txt', 'w').write('m')\n",
+                )
+            )
+    split = get_script_split(l_files)
+    # Code using a path inside the folder of the study file runs for each job
+    assert len(split.l_prefix) == 3
+    assert split.set_dependent_arguments == {"a", "b", "path_result"}
+    with sqlite3.connect("study_dummy/index.db") as connection:
+        connection.execute("UPDATE jobs SET status = 'pending'")
+    executor = StudyExecutor("study_dummy", n_cpus=2, fork=True)
+    assert set(executor.run().values()) == {0}
+    assert not any(executor.dict_fork_servers.values())
+    with open("study_dummy/base/count.txt") as f:
+        assert f.read() == "x"
+
+    # Each job gets the same results and its full output, as if it ran alone
+    for directory, result in zip(l_directories, l_results):
+        with open(f"study_dummy/base/{directory}/result.pkl", "rb") as f:
+            assert f.read() == result
+        with open(f"study_dummy/base/{directory}/some_more_computations.log") as f:
+            assert f.read() == "Shared\n"
+        with open(f"study_dummy/base/{directory}/marker.txt") as f:
+            assert f.read() == "m"
+
+    # Study files which differ by more than their parameters run as usual
+    with open(l_files[0], "a") as f:
+        f.write("print('Not shared')\n")
+    assert get_script_split(l_files) is None
+    with sqlite3.connect("study_dummy/index.db") as connection:
+        connection.execute("UPDATE jobs SET status = 'pending'")
+    assert main(["run", "study_dummy", "--fork", "--cpus", "2"]) == 0
+    assert "5 jobs succeeded" in capsys.readouterr().out
+    with open("study_dummy/base/count.txt") as f:
+        assert f.read() == "xxxxx"